@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+End-to-end timing harness for the MediTalk analysis path.
+
+Runs the steps behind one "Analyze" click in the Streamlit app and prints
+the per-stage latency breakdown. Symptom extraction and validation +
+inference are what the app's loader waits for; speech synthesis (run in
+the background by the app) and PDF generation (run on download) are
+timed here as well, sequentially.
+
+Usage (from the MediTalk_AI_Agent directory):
+    python benchmarks/analysis_timing.py [--runs N] [--tts] [--no-pdf]
+
+Speech synthesis is opt-in via --tts and uses the backend chain from
+MEDITALK_TTS_BACKENDS (e.g. MEDITALK_TTS_BACKENDS=stub for offline runs).
+"""
+
+import argparse
+import os
+import statistics
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from disease_predictor import DiseasePredictor
+from nlp_symptom_extractor import SymptomExtractor
+from stage_timer import StageTimer
+
+SAMPLE_TEXTS = [
+    "I have a high fever, headache and keep vomiting",
+    "itching, skin rash and nodal skin eruptions",
+    "stomach pain with acidity and chest pain",
+    "back pain, neck pain and dizziness",
+    "continuous sneezing, shivering and chills",
+]
+
+
+def run_once(predictor, extractor, text, audio=None, with_pdf=True) -> StageTimer:
+    """Run one analysis and return its stage timings."""
+    timer = StageTimer()
+
+    with timer.stage('extract'):
+        symptoms = extractor.extract(text)
+
+    with timer.stage('predict'):
+        analysis = predictor.validate_and_predict(symptoms)
+    result = analysis['result']
+    if result is None:
+        return timer
+    valid_syms = analysis['validation']['valid_symptoms']
+
+    if audio is not None:
+        with timer.stage('speech'):
+            audio.submit_consultation(result, valid_syms).result()
+
+    if with_pdf:
+        from pdf_generator import PDFReportGenerator
+        with timer.stage('pdf'):
+            PDFReportGenerator.generate_report(result, valid_syms)
+
+    return timer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time each stage of the MediTalk analysis path")
+    parser.add_argument('--runs', type=int, default=20, help='number of analyses to time')
+    parser.add_argument('--tts', action='store_true', help='include speech synthesis')
+    parser.add_argument('--no-pdf', action='store_true', help='skip PDF generation')
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+
+    predictor = DiseasePredictor(args.model_dir, args.data_dir)
+    extractor = SymptomExtractor(predictor.get_all_symptoms())
+    audio = None
+    if args.tts:
+        from audio_response import AudioResponse
+        audio = AudioResponse()
+
+    samples = {}
+    totals = []
+    for i in range(args.runs):
+        timer = run_once(predictor, extractor, SAMPLE_TEXTS[i % len(SAMPLE_TEXTS)],
+                         audio=audio, with_pdf=not args.no_pdf)
+        for name, ms in timer.as_dict().items():
+            samples.setdefault(name, []).append(ms)
+        totals.append(timer.total * 1000)
+
+    print(f"\n=== Analysis timing ({args.runs} runs) ===")
+    print(f"{'stage':<10}{'mean ms':>10}{'p50 ms':>10}{'max ms':>10}")
+    for name, values in list(samples.items()) + [('total', totals)]:
+        print(f"{name:<10}{statistics.mean(values):>10.1f}"
+              f"{statistics.median(values):>10.1f}{max(values):>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for consultation analytics.
+
+Fills a throwaway history database with synthetic consultations, times the
+first (backfill) refresh of the rollups, an incremental refresh, and each
+analytics query.
+
+Usage (from the MediTalk_AI_Agent directory):
+    python benchmarks/analytics_bench.py [--consultations N] [--db PATH]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from history_analytics import HistoryAnalytics
+from history_store import SQLiteHistoryStore
+
+SYMPTOMS = [f"symptom_{i}" for i in range(131)]
+DISEASES = [f"Disease {i}" for i in range(41)]
+
+
+def fill(store: SQLiteHistoryStore, consultations: int, rng: random.Random, offset: int = 0) -> None:
+    """Add synthetic consultations, one per second of simulated time."""
+    for i in range(offset, offset + consultations):
+        store.add(f"session_{i % 500}", {
+            'timestamp': '2025-01-%02dT%02d:%02d:%02d' % (1 + i // 86400 % 28, i // 3600 % 24, i // 60 % 60, i % 60),
+            'symptoms': rng.sample(SYMPTOMS, rng.randint(2, 6)),
+            'primary_disease': rng.choice(DISEASES),
+            'confidence': rng.random(),
+            'alternatives': [(d, rng.random() / 2) for d in rng.sample(DISEASES, 2)],
+        })
+    store.flush()
+
+
+def time_ms(fn, repeat: int) -> float:
+    """Return the median wall time of `fn` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analytics rollups and queries")
+    parser.add_argument('--consultations', type=int, default=200000)
+    parser.add_argument('--db', default=None, help='database path (default: temporary file)')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    db_path = args.db or os.path.join(tempfile.mkdtemp(prefix='meditalk_analytics_'), 'history.db')
+    rng = random.Random(0)
+    store = SQLiteHistoryStore(db_path, batch_size=5000)
+    analytics = HistoryAnalytics(store)
+
+    start = time.perf_counter()
+    fill(store, args.consultations, rng)
+    print(f"\nInserted {args.consultations:,} consultations in {time.perf_counter() - start:.1f}s ({db_path})")
+
+    start = time.perf_counter()
+    folded = analytics.refresh()
+    print(f"Backfill refresh: {folded:,} consultations in {time.perf_counter() - start:.1f}s")
+
+    fill(store, 100, rng, offset=args.consultations)
+    start = time.perf_counter()
+    folded = analytics.refresh()
+    print(f"Incremental refresh: {folded} consultations in {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    queries = (
+        ('overview', analytics.overview),
+        ('trends (day)', lambda: analytics.disease_trends(bucket='day')),
+        ('trends (hour, 1 day)', lambda: analytics.disease_trends(since='2025-01-02T00', until='2025-01-02T23')),
+        ('symptom pairs', analytics.symptom_pairs),
+        ('symptom pairs (1 symptom)', lambda: analytics.symptom_pairs(symptom='symptom_1')),
+        ('confidence histogram', analytics.confidence_histogram),
+    )
+    print(f"\n{'query':<28}{'p50 ms':>10}")
+    for name, query in queries:
+        query()
+        print(f"{name:<28}{time_ms(query, args.repeat):>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark for prediction explanations.
+
+Times DiseasePredictor.predict_from_indices_batch with and without
+explain=True on random symptom sets at several batch sizes, and checks that
+every explanation adds up to its predicted probability.
+
+Usage (from the MediTalk_AI_Agent directory):
+    python benchmarks/explain_bench.py [--repeat N] [--model-dir DIR]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from disease_predictor import DiseasePredictor
+
+
+def time_ms(fn, repeat: int) -> float:
+    """Return the median wall time of `fn` in milliseconds."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prediction explanations")
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+
+    predictor = DiseasePredictor(args.model_dir, args.data_dir)
+    # Joblib progress output would dominate the single-row timings
+    if hasattr(predictor.model, 'verbose'):
+        predictor.model.verbose = 0
+    rng = random.Random(0)
+    n_symptoms = len(predictor.get_all_symptoms())
+
+    start = time.perf_counter()
+    predictor.get_explainer()
+    print(f"\nExplainer built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    print(f"\n{'batch':>6}{'predict ms':>12}{'explain ms':>12}{'explain ms/row':>16}{'max error':>12}")
+    for batch in (1, 10, 50):
+        rows = [rng.sample(range(n_symptoms), rng.randint(2, 6)) for _ in range(batch)]
+        symptoms = [[predictor.symptoms_list[i] for i in row] for row in rows]
+        predict = time_ms(lambda: predictor.predict_from_indices_batch(rows, symptoms), args.repeat)
+        explain = time_ms(lambda: predictor.predict_from_indices_batch(rows, symptoms, explain=True), args.repeat)
+
+        error = 0.0
+        for result in predictor.predict_from_indices_batch(rows, symptoms, explain=True):
+            for item in result['explanation']:
+                total = item['baseline'] + item['absent_symptoms'] + sum(
+                    c['contribution'] for c in item['contributions'])
+                error = max(error, abs(total - item['probability']))
+        print(f"{batch:>6}{predict:>12.2f}{explain:>12.2f}{explain / batch:>16.3f}{error:>12.1e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for per-session consultation history.
+
+Records the same consultations for many simulated sessions, once kept in
+session state as the previous list of the last 50 dicts and once written to
+the SQLite history store, and prints the traced Python memory per session
+for each. The store keeps only each session's running aggregates in memory;
+the consultations themselves live in SQLite.
+
+Usage (from the MediTalk_AI_Agent directory):
+    python benchmarks/history_memory.py [--sessions N] [--consultations N]
+"""
+
+import argparse
+import gc
+import os
+import random
+import sys
+import tempfile
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from history_store import SQLiteHistoryStore
+
+SYMPTOMS = [f"symptom_{i}" for i in range(131)]
+DISEASES = [f"Disease {i}" for i in range(41)]
+CAPACITY = 50
+
+
+def make_consultation(rng: random.Random):
+    """Return (timestamp, symptoms, disease, confidence, alternatives) like the predictor's."""
+    return (
+        datetime.now(),
+        rng.sample(SYMPTOMS, rng.randint(2, 6)),
+        rng.choice(DISEASES),
+        rng.random(),
+        [(d, rng.random()) for d in rng.sample(DISEASES, 2)],
+    )
+
+
+def list_of_dicts(history: list, consultation) -> list:
+    """Previous behaviour: dict per consultation, list re-sliced over capacity."""
+    timestamp, symptoms, disease, confidence, alternatives = consultation
+    history.append({
+        'timestamp': timestamp.isoformat(),
+        # Symptom strings arrive fresh from each request, not shared
+        'symptoms': [''.join(s) for s in symptoms],
+        'primary_disease': ''.join(disease),
+        'confidence': confidence,
+        'alternatives': list(alternatives),
+    })
+    if len(history) > CAPACITY:
+        history = history[-CAPACITY:]
+    return history
+
+
+def measure_lists(sessions: int, consultations: int) -> float:
+    """Return traced bytes per session with every session's list kept alive."""
+    rng = random.Random(0)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    all_sessions = []
+    for _ in range(sessions):
+        history = []
+        for _ in range(consultations):
+            history = list_of_dicts(history, make_consultation(rng))
+        all_sessions.append(history)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return used / sessions
+
+
+def measure_store(sessions: int, consultations: int, db_path: str) -> float:
+    """Return traced bytes per session held by the store after all writes are flushed."""
+    rng = random.Random(0)
+    store = SQLiteHistoryStore(db_path, max_cached_sessions=sessions)
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    for session in range(sessions):
+        for _ in range(consultations):
+            timestamp, symptoms, disease, confidence, alternatives = make_consultation(rng)
+            store.add(f"session-{session}", {
+                'timestamp': timestamp.isoformat(),
+                'symptoms': symptoms,
+                'primary_disease': disease,
+                'confidence': confidence,
+                'alternatives': alternatives,
+            })
+    store.flush()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    store.close()
+    return used / sessions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-session history memory")
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--consultations', type=int, default=80,
+                        help='consultations per session (more than 50 exercises eviction)')
+    args = parser.parse_args()
+
+    before = measure_lists(args.sessions, args.consultations)
+    with tempfile.TemporaryDirectory() as tmp:
+        after = measure_store(args.sessions, args.consultations, os.path.join(tmp, 'history.db'))
+
+    print(f"\n=== Session history memory ({args.sessions} sessions x {args.consultations} consultations) ===")
+    print(f"{'layout':<16}{'KiB/session':>14}{'MiB total':>12}")
+    for name, per_session in (('list of dicts', before), ('history store', after)):
+        print(f"{name:<16}{per_session / 1024:>14.1f}{per_session * args.sessions / 2**20:>12.1f}")
+    print(f"\nhistory store uses {after / before:.0%} of the list-of-dicts memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for PDF report generation.
+
+Compares building the report styles and static flowables for every report
+(the previous behaviour) with reusing the module-level template, and prints
+the per-report time and peak traced allocation for each.
+
+Usage (from the MediTalk_AI_Agent directory):
+    python benchmarks/pdf_report_bench.py [--reports N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from pdf_generator import _TEMPLATE, _build_template, _render
+
+SAMPLE_RESULT = {
+    'primary_disease': 'Common Cold',
+    'confidence': 0.62,
+    'description': 'The common cold is a viral infection of your nose and throat (upper respiratory tract).',
+    'precautions': ['drink vitamin c rich drinks', 'take vapour', 'avoid cold food', 'keep fever in check'],
+    'alternative_diseases': ['Allergy', 'Pneumonia'],
+    'alternative_probabilities': [0.21, 0.08],
+}
+SAMPLE_SYMPTOMS = ['continuous_sneezing', 'chills', 'cough', 'high_fever']
+
+
+def fresh(result, symptoms) -> bytes:
+    """Previous behaviour: styles and static flowables rebuilt per report."""
+    return _render(result, symptoms, _build_template())
+
+
+def cached(result, symptoms) -> bytes:
+    """Current behaviour: shared module-level template."""
+    return _render(result, symptoms, _TEMPLATE)
+
+
+def time_reports(variants, reports: int) -> dict:
+    """
+    Return per-report wall times in milliseconds for each variant.
+
+    Variants are interleaved report by report so that CPU frequency and
+    cache drift affect them equally.
+    """
+    timings = {name: [] for name, _ in variants}
+    for _ in range(reports):
+        for name, generate in variants:
+            start = time.perf_counter()
+            generate(SAMPLE_RESULT, SAMPLE_SYMPTOMS)
+            timings[name].append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def time_template_build(reports: int) -> float:
+    """Return the mean time to build the template alone, in milliseconds."""
+    start = time.perf_counter()
+    for _ in range(reports):
+        _build_template()
+    return (time.perf_counter() - start) * 1000 / reports
+
+
+def peak_allocation(generate, reports: int) -> float:
+    """Return the mean peak traced allocation per report in KiB."""
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(reports):
+            tracemalloc.reset_peak()
+            baseline = tracemalloc.get_traced_memory()[0]
+            generate(SAMPLE_RESULT, SAMPLE_SYMPTOMS)
+            peaks.append((tracemalloc.get_traced_memory()[1] - baseline) / 1024)
+    finally:
+        tracemalloc.stop()
+    return statistics.mean(peaks)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF report generation with and without cached styles")
+    parser.add_argument('--reports', type=int, default=1000, help='number of reports per variant')
+    parser.add_argument('--alloc-reports', type=int, default=100,
+                        help='reports traced with tracemalloc per variant (tracing is slow)')
+    args = parser.parse_args()
+
+    # Warm up imports and font metrics
+    fresh(SAMPLE_RESULT, SAMPLE_SYMPTOMS)
+    cached(SAMPLE_RESULT, SAMPLE_SYMPTOMS)
+
+    variants = (('fresh', fresh), ('cached', cached))
+    timings = time_reports(variants, args.reports)
+    rows = []
+    for name, generate in variants:
+        rows.append((name, statistics.mean(timings[name]), statistics.median(timings[name]),
+                     sum(timings[name]) / 1000, peak_allocation(generate, args.alloc_reports)))
+
+    print(f"\n=== PDF report generation ({args.reports} reports per variant) ===")
+    print(f"{'variant':<10}{'mean ms':>10}{'p50 ms':>10}{'total s':>10}{'peak KiB':>12}")
+    for name, mean, p50, total, peak in rows:
+        print(f"{name:<10}{mean:>10.2f}{p50:>10.2f}{total:>10.2f}{peak:>12.1f}")
+    print(f"\ntemplate build alone: {time_template_build(args.reports):.3f} ms "
+          f"(saved per report by the cached variant)")
+    print(f"p50 saving per report: {rows[0][2] - rows[1][2]:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Memory report for predictor sharing across sessions.
+
+Loads the predictor through the process-wide registry, opens many simulated
+Streamlit sessions, and prints the traced memory of one resident predictor
+and the per-session overhead of:
+  - the previous session layout (predictor reference plus the symptom and
+    disease lists stored in every session's state), and
+  - the registry layout (one PredictorHandle per session).
+
+Usage (from the MediTalk_AI_Agent directory):
+    python benchmarks/session_memory.py [--sessions N]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from predictor_registry import PredictorRegistry
+
+
+def traced(build):
+    """Return (result, traced bytes retained by build())."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    return result, used
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-session predictor memory")
+    parser.add_argument('--sessions', type=int, default=500)
+    parser.add_argument('--model-dir', default='models')
+    parser.add_argument('--data-dir', default='data')
+    args = parser.parse_args()
+
+    registry = PredictorRegistry()
+    pinned, predictor_bytes = traced(lambda: registry.acquire(args.model_dir, args.data_dir))
+    predictor = pinned.predictor
+
+    def previous_layout():
+        # What every session stored before: the predictor plus both lists
+        return [
+            {
+                'predictor': predictor,
+                'all_symptoms': predictor.get_all_symptoms(),
+                'all_diseases': predictor.get_all_diseases(),
+            }
+            for _ in range(args.sessions)
+        ]
+
+    def registry_layout():
+        return [
+            {'predictor_handle': registry.acquire(args.model_dir, args.data_dir)}
+            for _ in range(args.sessions)
+        ]
+
+    previous, previous_bytes = traced(previous_layout)
+    del previous
+    sessions, registry_bytes = traced(registry_layout)
+
+    print(f"\n=== Predictor memory with {args.sessions} sessions ===")
+    print(f"resident predictor (loaded once): {predictor_bytes / 2**20:.1f} MiB")
+    print(f"model loads for {args.sessions + 1} acquires: {registry.loads}")
+    print(f"\n{'layout':<34}{'bytes/session':>14}{'KiB total':>12}")
+    for name, used in (('predictor + symptom/disease lists', previous_bytes),
+                       ('registry handle', registry_bytes)):
+        print(f"{name:<34}{used / args.sessions:>14.0f}{used / 1024:>12.1f}")
+    print(f"\nwithout sharing, {args.sessions} sessions would hold "
+          f"{predictor_bytes * args.sessions / 2**30:.2f} GiB of predictors")
+
+    print(f"\nregistry: {registry.stats()}")
+    for session in sessions:
+        session['predictor_handle'].release()
+    pinned.release()
+    print(f"after releasing all handles: {registry.stats()}")
+
+
+if __name__ == "__main__":
+    main()
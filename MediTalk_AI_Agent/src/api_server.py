@@ -3,10 +3,14 @@ Flask API Server for MediTalk AI Agent
 Provides REST API endpoints for disease prediction and information
 """
 
+import hmac
 import os
 import sys
+import io
 import json
-from flask import Flask, request, jsonify
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from flask import Flask, Response, g, request, jsonify, send_file, url_for
 from werkzeug.exceptions import BadRequest
 from flask_cors import CORS
 from flask_restx import Api, Resource, fields, Namespace
@@ -14,8 +18,20 @@ from flask_restx import Api, Resource, fields, Namespace
 # Add src directory to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
-from disease_predictor import DiseasePredictor
+from predictor_registry import DEFAULT_MODEL, available_models, get_predictor_registry
 from input_validator import InputValidator, RateLimiter
+from history_export import EXPORT_FORMATS, iter_export
+from history_store import get_history_store
+from history_analytics import get_history_analytics
+from shadow_eval import create_shadow_evaluator
+from cache_utils import (get_cache, get_cached_symptoms_list, get_cached_diseases_list,
+                         cache_symptom_descriptions, cache_precautions, get_symptom_extractor,
+                         model_namespace)
+
+try:
+    from audio_response import AudioResponse
+except ImportError:
+    AudioResponse = None
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -35,13 +51,35 @@ api = Api(
 ns = api.namespace('', description='Disease prediction operations')
 
 # Define request/response models for Swagger documentation
+MODEL_PARAM = {'model': 'Model to predict with (see /api/models); also accepted as the X-Model header'}
+
+EXPLAIN_FIELD = fields.Boolean(
+    description='Add per-symptom contributions to each prediction (default: MEDITALK_EXPLAIN)',
+    example=False
+)
+
 symptom_input = api.model('SymptomInput', {
     'symptoms': fields.List(
         fields.String,
         required=True,
         description='List of symptoms (e.g., ["fever", "cough", "headache"])',
         example=["fever", "cough", "headache"]
-    )
+    ),
+    'explain': EXPLAIN_FIELD
+})
+
+symptom_contribution = api.model('SymptomContribution', {
+    'symptom': fields.String(description='Given symptom'),
+    'contribution': fields.Float(description='Probability added (negative: removed) by the symptom')
+})
+
+disease_explanation = api.model('DiseaseExplanation', {
+    'disease': fields.String(description='Reported disease'),
+    'probability': fields.Float(description='Predicted probability'),
+    'baseline': fields.Float(description='Probability before any symptom is considered'),
+    'contributions': fields.List(fields.Nested(symptom_contribution),
+                                 description='Given symptoms, largest contribution first'),
+    'absent_symptoms': fields.Float(description='Combined contribution of the symptoms not given')
 })
 
 prediction_output = api.model('PredictionOutput', {
@@ -50,7 +88,111 @@ prediction_output = api.model('PredictionOutput', {
     'description': fields.String(description='Disease description'),
     'precautions': fields.List(fields.String, description='Recommended precautions'),
     'alternative_diseases': fields.List(fields.String, description='Alternative diagnoses'),
-    'alternative_probabilities': fields.List(fields.Float, description='Alternative disease probabilities')
+    'alternative_probabilities': fields.List(fields.Float, description='Alternative disease probabilities'),
+    'explanation': fields.List(fields.Nested(disease_explanation),
+                               description='Only with "explain": baseline + contributions + absent_symptoms = probability')
+})
+
+batch_input = api.model('BatchInput', {
+    'batch': fields.List(
+        fields.List(fields.String),
+        required=True,
+        description='List of symptom lists (max 50)',
+        example=[["itching", "skin_rash"], ["high_fever", "cough"]]
+    ),
+    'explain': EXPLAIN_FIELD
+})
+
+batch_prediction_output = api.model('BatchPredictionOutput', {
+    'results': fields.List(fields.Nested(prediction_output), description='One prediction per input'),
+    'count': fields.Integer(description='Number of predictions')
+})
+
+text_input = api.model('TextInput', {
+    'text': fields.String(
+        description='Free-text symptom description',
+        example='I have a high fever, headache and keep vomiting'
+    ),
+    'texts': fields.List(
+        fields.String,
+        description='Batch of free-text descriptions (use instead of "text")'
+    )
+})
+
+extracted_span = api.model('ExtractedSpan', {
+    'symptom': fields.String(description='Recognized symptom identifier'),
+    'start': fields.Integer(description='Start offset in the input text'),
+    'end': fields.Integer(description='End offset in the input text'),
+    'text': fields.String(description='Matched input text'),
+    'method': fields.String(description='Match method: phrase, synonym or token')
+})
+
+text_prediction_output = api.model('TextPredictionOutput', {
+    'text': fields.String(description='Input text'),
+    'extracted': fields.List(fields.Nested(extracted_span), description='Recognized symptom spans'),
+    'prediction': fields.Nested(prediction_output, allow_null=True,
+                                description='Prediction (null when no symptom was recognized)')
+})
+
+speech_output = api.model('SpeechOutput', {
+    'key': fields.String(description='Content address of the consultation audio'),
+    'url': fields.String(description='URL to fetch the audio from (GET, supports Range)'),
+    'status': fields.String(description='"ready" if cached, otherwise "pending"'),
+    'prediction': fields.Nested(prediction_output, description='Prediction that is spoken')
+})
+
+analytics_overview_output = api.model('AnalyticsOverviewOutput', {
+    'total_consultations': fields.Integer(description='Consultations recorded'),
+    'unique_diseases': fields.Integer(description='Distinct predicted diseases'),
+    'first_hour': fields.String(description='First hour with consultations (YYYY-MM-DDTHH)'),
+    'last_hour': fields.String(description='Last hour with consultations (YYYY-MM-DDTHH)')
+})
+
+trend_point = api.model('TrendPoint', {
+    'period': fields.String(description='Hour (YYYY-MM-DDTHH) or day (YYYY-MM-DD)'),
+    'disease': fields.String(description='Predicted disease'),
+    'count': fields.Integer(description='Consultations in the period'),
+    'average_confidence': fields.Float(description='Mean confidence in the period')
+})
+
+trends_output = api.model('TrendsOutput', {
+    'bucket': fields.String(description='hour or day'),
+    'trends': fields.List(fields.Nested(trend_point))
+})
+
+symptom_pair = api.model('SymptomPair', {
+    'symptoms': fields.List(fields.String, description='The two symptoms'),
+    'count': fields.Integer(description='Consultations reporting both'),
+    'share': fields.Float(description='Fraction of all consultations reporting both')
+})
+
+symptom_pairs_output = api.model('SymptomPairsOutput', {
+    'pairs': fields.List(fields.Nested(symptom_pair))
+})
+
+confidence_bin = api.model('ConfidenceBin', {
+    'lower': fields.Float(description='Inclusive lower bound'),
+    'upper': fields.Float(description='Exclusive upper bound'),
+    'count': fields.Integer(description='Predictions in the bin')
+})
+
+confidence_output = api.model('ConfidenceOutput', {
+    'bins': fields.List(fields.Nested(confidence_bin)),
+    'total': fields.Integer(description='Predictions counted')
+})
+
+resident_model = api.model('ResidentModel', {
+    'model': fields.String(description='Model name'),
+    'model_version': fields.String(description='Version key (file, size, modification time)'),
+    'refs': fields.Integer(description='Handles currently held on the model'),
+    'current': fields.Boolean(description='False if the model file has since been replaced')
+})
+
+models_output = api.model('ModelsOutput', {
+    'default': fields.String(description='Model used when a request does not name one'),
+    'available': fields.List(fields.String, description='Models that can be requested'),
+    'resident': fields.List(fields.Nested(resident_model), description='Loaded models, least recently used first'),
+    'max_resident': fields.Integer(description='Idle models beyond this are unloaded')
 })
 
 health_output = api.model('HealthOutput', {
@@ -77,12 +219,128 @@ error_output = api.model('ErrorOutput', {
 # Initialize rate limiter (100 requests per minute)
 rate_limiter = RateLimiter(max_requests=100, window_seconds=60)
 
-# Initialize disease predictor
+MODEL_DIR = 'models'
+DATA_DIR = 'data'
+
+# Model served when a request does not pick one with ?model= or X-Model
+default_model = os.getenv('MEDITALK_DEFAULT_MODEL', DEFAULT_MODEL)
+
+# Whether predictions carry explanations when a request does not say
+explain_default = os.getenv('MEDITALK_EXPLAIN', '0') in ('1', 'true', 'TRUE')
+
+# Key (X-Admin-Key header) for exporting every session's history; unset
+# disables all-sessions export
+admin_key = os.getenv('MEDITALK_ADMIN_KEY', '')
+
+def extractor_for(selected):
+    """Compiled symptom extractor of a model's vocabulary, shared by all request threads."""
+    return get_symptom_extractor(model_namespace(selected), get_cached_symptoms_list(selected))
+
+
+# Load the default model and compile its extractor before the first request.
+# It stays resident in the process-wide registry; requests acquire it from
+# there, so a retrained model file is picked up without a restart
 try:
-    predictor = DiseasePredictor(model_dir='models', data_dir='data')
+    with get_predictor_registry().acquire(MODEL_DIR, DATA_DIR, f"{default_model}.pkl") as warm:
+        extractor_for(warm.predictor)
 except Exception as e:
     print(f"Error initializing predictor: {e}")
-    predictor = None
+
+# Speech synthesis for /speech (audio is content-addressed and cached on disk)
+try:
+    audio_response = AudioResponse() if AudioResponse else None
+except Exception as e:
+    print(f"Error initializing audio response: {e}")
+    audio_response = None
+
+# Longest time a GET /speech/<key> waits for in-flight synthesis
+SPEECH_WAIT_SECONDS = 30
+
+# Candidate model replayed on sampled default-model traffic (MEDITALK_SHADOW_MODEL)
+shadow = create_shadow_evaluator(MODEL_DIR, DATA_DIR)
+
+
+def acquire_predictor(name):
+    """
+    Acquire a model for the rest of this request (released at teardown).
+
+    The registry resolves the name on every call, so a model file replaced
+    on disk is loaded by the next request.
+    """
+    handle = get_predictor_registry().acquire(MODEL_DIR, DATA_DIR, f"{name}.pkl")
+    g.predictor_handle = handle
+    return handle.predictor
+
+
+def default_predictor():
+    """Acquire the default model for this request; None if it cannot be loaded."""
+    try:
+        return acquire_predictor(default_model)
+    except Exception:
+        return None
+
+
+def select_predictor():
+    """
+    Return (predictor, error response) for the model this request asks for.
+
+    The model is picked by the `model` query parameter or the X-Model
+    header, and defaults to the default model. Models are loaded on first
+    use and held for the duration of the request.
+    """
+    name = request.args.get('model') or request.headers.get('X-Model')
+    if name and name.endswith('.pkl'):
+        name = name[:-len('.pkl')]
+    if not name or name == default_model:
+        predictor = default_predictor()
+        if not predictor:
+            return None, ({'error': 'Model not initialized'}, 500)
+        g.model = default_model
+        return predictor, None
+    if name not in available_models(MODEL_DIR):
+        return None, ({'error': f"Unknown model '{name}'", 'details': 'See /api/models'}, 400)
+    try:
+        predictor = acquire_predictor(name)
+    except Exception as e:
+        return None, ({'error': f"Model '{name}' could not be loaded", 'details': str(e)}, 500)
+    g.model = name
+    return predictor, None
+
+
+def explain_flag(data):
+    """Return the request's "explain" flag (default: MEDITALK_EXPLAIN)."""
+    explain = data.get('explain', explain_default)
+    if not isinstance(explain, bool):
+        raise ValueError('"explain" must be true or false')
+    return explain
+
+
+def predict_rows(predictor, index_rows, symptoms_batch, explain=False):
+    """
+    Run the selected model on feature columns and offer the request to the
+    shadow evaluator when it was served by the default model.
+    """
+    start = time.perf_counter()
+    results = predictor.predict_from_indices_batch(index_rows, symptoms_batch, explain=explain)
+    if shadow is not None and g.get('model') == default_model:
+        shadow.submit(index_rows, symptoms_batch, results, time.perf_counter() - start, explain)
+    return results
+
+
+@app.after_request
+def add_model_header(response):
+    """Report which model served a prediction."""
+    model = g.get('model')
+    if model:
+        response.headers['X-Model'] = model
+    return response
+
+
+@app.teardown_request
+def release_predictor(exc):
+    handle = g.pop('predictor_handle', None)
+    if handle is not None:
+        handle.release()
 
 
 def check_rate_limit():
@@ -90,7 +348,7 @@ def check_rate_limit():
     identifier = request.remote_addr or 'unknown'
     
     if not rate_limiter.is_allowed(identifier):
-        return jsonify({'error': 'Rate limit exceeded', 'details': 'Too many requests. Please try again later.'}), 429
+        return {'error': 'Rate limit exceeded', 'details': 'Too many requests. Please try again later.'}, 429
     return None
 
 # API Resources
@@ -113,7 +371,7 @@ class Health(Resource):
 class Predict(Resource):
     """Disease prediction endpoint"""
     
-    @ns.doc('predict_disease')
+    @ns.doc('predict_disease', params=MODEL_PARAM)
     @ns.response(200, 'Success', prediction_output)
     @ns.response(400, 'Invalid input', error_output)
     @ns.response(429, 'Rate limit exceeded', error_output)
@@ -125,34 +383,400 @@ class Predict(Resource):
         if rl:
             return rl
         
-        if not predictor:
-            return jsonify({'error': 'Model not initialized'}), 500
+        predictor, error = select_predictor()
+        if error:
+            return error
 
         try:
             # Strict JSON parsing to catch invalid JSON
             try:
                 data = request.get_json(force=True)
             except BadRequest:
-                return jsonify({'error': 'Invalid JSON'}), 400
+                return {'error': 'Invalid JSON'}, 400
 
             # Validate payload structure
             try:
                 InputValidator.validate_json_payload(data, ['symptoms'])
+                explain = explain_flag(data)
             except ValueError as e:
-                return jsonify({'error': str(e)}), 400
+                return {'error': str(e)}, 400
 
-            # Validate and sanitize symptoms
+            # Validate, sanitize and map symptoms to feature columns in one pass
             try:
-                symptoms = InputValidator.validate_symptoms_list(data['symptoms'])
+                checked = InputValidator.normalize_symptoms(data['symptoms'], predictor.symptom_index)
             except ValueError as e:
-                return jsonify({'error': str(e), 'details': 'Invalid symptoms format'}), 400
+                return {'error': str(e), 'details': 'Invalid symptoms format'}, 400
 
             # Allow empty symptoms list; predictor should handle gracefully
-            result = predictor.predict_disease(symptoms)
-            return jsonify(result), 200
+            result = predict_rows(predictor, [checked['indices']], [checked['symptoms']], explain)[0]
+            return result, 200
+
+        except Exception as e:
+            return {'error': 'Prediction failed', 'details': str(e)}, 500
+
+
+@ns.route('/predict/batch')
+class PredictBatch(Resource):
+    """Batched disease prediction endpoint"""
+    
+    @ns.doc('predict_disease_batch', params=MODEL_PARAM)
+    @ns.expect(batch_input)
+    @ns.response(200, 'Success', batch_prediction_output)
+    @ns.response(400, 'Invalid input', error_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    @ns.response(500, 'Internal server error', error_output)
+    def post(self):
+        """Predict diseases for several symptom lists with one model call"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        
+        predictor, error = select_predictor()
+        if error:
+            return error
+
+        try:
+            try:
+                data = request.get_json(force=True)
+            except BadRequest:
+                return {'error': 'Invalid JSON'}, 400
+
+            try:
+                InputValidator.validate_json_payload(data, ['batch'])
+                explain = explain_flag(data)
+                checked = InputValidator.normalize_symptoms_batch(data['batch'], predictor.symptom_index)
+            except ValueError as e:
+                return {'error': str(e), 'details': 'Invalid batch format'}, 400
+
+            results = predict_rows(
+                predictor,
+                [c['indices'] for c in checked],
+                [c['symptoms'] for c in checked],
+                explain
+            )
+            return {'results': results, 'count': len(results)}, 200
+
+        except Exception as e:
+            return {'error': 'Prediction failed', 'details': str(e)}, 500
+
+
+@ns.route('/predict/text')
+class PredictText(Resource):
+    """Free-text disease prediction endpoint"""
+    
+    @ns.doc('predict_disease_from_text', params=MODEL_PARAM)
+    @ns.expect(text_input)
+    @ns.response(200, 'Success', text_prediction_output)
+    @ns.response(400, 'Invalid input', error_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    @ns.response(500, 'Internal server error', error_output)
+    def post(self):
+        """Extract symptoms from free text and predict disease (single or batched)"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        
+        predictor, error = select_predictor()
+        if error:
+            return error
+
+        try:
+            try:
+                data = request.get_json(force=True)
+            except BadRequest:
+                return {'error': 'Invalid JSON'}, 400
+
+            if not isinstance(data, dict) or ('text' in data) == ('texts' in data):
+                return {'error': 'Provide exactly one of "text" or "texts"'}, 400
+
+            batched = 'texts' in data
+            try:
+                texts = InputValidator.validate_texts(data['texts'] if batched else [data['text']])
+            except ValueError as e:
+                return {'error': str(e), 'details': 'Invalid text input'}, 400
+
+            # Stage 1: symptom extraction with the selected model's vocabulary
+            t0 = time.perf_counter()
+            symptom_extractor = extractor_for(predictor)
+            spans = [symptom_extractor.extract_spans(text) for text in texts]
+            t1 = time.perf_counter()
+
+            # Stage 2: one batched model call for every text with symptoms
+            recognized = [i for i, sp in enumerate(spans) if sp]
+            predictions = predictor.predict_disease_batch(
+                [[s['symptom'] for s in spans[i]] for i in recognized]
+            )
+            by_index = dict(zip(recognized, predictions))
+            t2 = time.perf_counter()
+
+            results = [
+                {'text': text, 'extracted': spans[i], 'prediction': by_index.get(i)}
+                for i, text in enumerate(texts)
+            ]
+            body = {'results': results, 'count': len(results)} if batched else results[0]
+
+            # Per-stage timings (milliseconds) in the standard Server-Timing header
+            timing = (
+                f"extract;dur={(t1 - t0) * 1000:.2f}, "
+                f"predict;dur={(t2 - t1) * 1000:.2f}, "
+                f"total;dur={(t2 - t0) * 1000:.2f}"
+            )
+            return body, 200, {'Server-Timing': timing}
+
+        except Exception as e:
+            return {'error': 'Prediction failed', 'details': str(e)}, 500
+
+
+@ns.route('/speech')
+class Speech(Resource):
+    """Spoken consultation endpoint"""
+    
+    @ns.doc('request_speech', params=MODEL_PARAM)
+    @ns.expect(symptom_input)
+    @ns.response(200, 'Audio already cached', speech_output)
+    @ns.response(202, 'Audio is being synthesized', speech_output)
+    @ns.response(400, 'Invalid input', error_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    @ns.response(500, 'Internal server error', error_output)
+    def post(self):
+        """Predict disease and start synthesizing the spoken consultation"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        
+        predictor, error = select_predictor()
+        if error:
+            return error
+        if not audio_response:
+            return {'error': 'Speech synthesis not available'}, 500
+
+        try:
+            try:
+                data = request.get_json(force=True)
+            except BadRequest:
+                return {'error': 'Invalid JSON'}, 400
+
+            try:
+                InputValidator.validate_json_payload(data, ['symptoms'])
+                checked = InputValidator.normalize_symptoms(data['symptoms'], predictor.symptom_index)
+            except ValueError as e:
+                return {'error': str(e), 'details': 'Invalid symptoms format'}, 400
+            if not checked['valid_symptoms']:
+                return {'error': 'No valid symptoms recognized'}, 400
+
+            result = predict_rows(predictor, [checked['indices']], [checked['symptoms']])[0]
+            key = audio_response.request_consultation(result, checked['valid_symptoms'])
+            url = url_for('speech_audio', key=key)
+            ready = key in audio_response.cache
+            body = {
+                'key': key,
+                'url': url,
+                'status': 'ready' if ready else 'pending',
+                'prediction': result,
+            }
+            return body, 200 if ready else 202, {'Location': url}
 
         except Exception as e:
-            return jsonify({'error': 'Prediction failed', 'details': str(e)}), 500
+            return {'error': 'Speech request failed', 'details': str(e)}, 500
+
+
+@ns.route('/speech/<string:key>', endpoint='speech_audio')
+class SpeechAudio(Resource):
+    """Consultation audio download"""
+    
+    @ns.doc('get_speech')
+    @ns.produces(['audio/mpeg', 'audio/wav'])
+    @ns.response(200, 'Audio bytes')
+    @ns.response(206, 'Partial audio (Range request)')
+    @ns.response(304, 'Not modified')
+    @ns.response(404, 'Unknown key', error_output)
+    @ns.response(503, 'Audio not ready yet', error_output)
+    def get(self, key):
+        """Fetch consultation audio (supports ETag and Range requests)"""
+        if not audio_response:
+            return {'error': 'Speech synthesis not available'}, 500
+        
+        try:
+            audio = audio_response.get_consultation(key, timeout=SPEECH_WAIT_SECONDS)
+        except FutureTimeoutError:
+            return {'error': 'Audio not ready yet'}, 503, {'Retry-After': '2'}
+        except Exception as e:
+            return {'error': 'Speech synthesis failed', 'details': str(e)}, 500
+        if audio is None:
+            return {'error': 'Unknown speech key'}, 404
+        
+        data, mime_type = audio
+        # The key is a content hash, so the audio never changes for a key
+        return send_file(
+            io.BytesIO(data),
+            mimetype=mime_type,
+            conditional=True,
+            etag=key,
+            max_age=86400,
+            download_name=key + ('.wav' if mime_type == 'audio/wav' else '.mp3'),
+        )
+
+
+@ns.route('/history/export')
+class HistoryExport(Resource):
+    """Consultation history export"""
+    
+    @ns.doc('export_history', params={
+        'format': 'ndjson (default), csv or json',
+        'session_id': 'Session to export (required unless X-Admin-Key is sent)'
+    })
+    @ns.produces([mime for mime, _ in EXPORT_FORMATS.values()])
+    @ns.response(200, 'Streamed export')
+    @ns.response(400, 'Unsupported format or missing session_id', error_output)
+    @ns.response(403, 'Invalid admin key', error_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    def get(self):
+        """Stream stored consultations as JSON Lines, CSV or compact JSON"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        
+        session_id = request.args.get('session_id')
+        if not session_id:
+            key = request.headers.get('X-Admin-Key')
+            if key is None:
+                return {'error': 'session_id is required',
+                        'details': 'Exporting all sessions requires the X-Admin-Key header'}, 400
+            if not admin_key or not hmac.compare_digest(key.encode(), admin_key.encode()):
+                return {'error': 'Invalid admin key'}, 403
+        
+        fmt = request.args.get('format', 'ndjson')
+        if fmt not in EXPORT_FORMATS:
+            return {'error': f"Unsupported format '{fmt}'",
+                    'details': f"Expected one of: {', '.join(EXPORT_FORMATS)}"}, 400
+        
+        mime_type, extension = EXPORT_FORMATS[fmt]
+        records = get_history_store().iter_records(session_id or None)
+        # Chunks are produced as the client reads, so memory stays flat
+        return Response(
+            iter_export(records, fmt),
+            mimetype=mime_type,
+            headers={'Content-Disposition': f'attachment; filename=medical_history.{extension}'},
+        )
+
+
+@ns.route('/analytics/overview')
+class AnalyticsOverview(Resource):
+    """Consultation analytics overview"""
+    
+    @ns.doc('analytics_overview')
+    @ns.response(200, 'Success', analytics_overview_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    @ns.response(500, 'Internal server error', error_output)
+    def get(self):
+        """Total consultations, distinct diseases and covered time range"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        try:
+            return get_history_analytics().overview()
+        except Exception as e:
+            return {'error': 'Analytics query failed', 'details': str(e)}, 500
+
+
+@ns.route('/analytics/trends')
+class AnalyticsTrends(Resource):
+    """Cases per disease over time"""
+    
+    @ns.doc('analytics_trends', params={
+        'bucket': 'hour (default) or day',
+        'since': 'Earliest ISO timestamp to include',
+        'until': 'Latest ISO timestamp to include (a bare date includes that day)',
+        'disease': 'Only this disease'
+    })
+    @ns.response(200, 'Success', trends_output)
+    @ns.response(400, 'Invalid parameters', error_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    @ns.response(500, 'Internal server error', error_output)
+    def get(self):
+        """Consultations per disease per hour or day"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        bucket = request.args.get('bucket', 'hour')
+        try:
+            trends = get_history_analytics().disease_trends(
+                bucket=bucket,
+                since=request.args.get('since'),
+                until=request.args.get('until'),
+                disease=request.args.get('disease'),
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except Exception as e:
+            return {'error': 'Analytics query failed', 'details': str(e)}, 500
+        return {'bucket': bucket, 'trends': trends}
+
+
+@ns.route('/analytics/symptom-pairs')
+class AnalyticsSymptomPairs(Resource):
+    """Symptom co-occurrence"""
+    
+    @ns.doc('analytics_symptom_pairs', params={
+        'limit': 'Number of pairs (default 20, max 500)',
+        'symptom': 'Only pairs including this symptom'
+    })
+    @ns.response(200, 'Success', symptom_pairs_output)
+    @ns.response(400, 'Invalid parameters', error_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    @ns.response(500, 'Internal server error', error_output)
+    def get(self):
+        """Most frequently co-reported symptom pairs"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        try:
+            limit = int(request.args.get('limit', 20))
+        except ValueError:
+            return {'error': 'limit must be an integer'}, 400
+        if not 1 <= limit <= 500:
+            return {'error': 'limit must be between 1 and 500'}, 400
+        try:
+            pairs = get_history_analytics().symptom_pairs(limit=limit, symptom=request.args.get('symptom'))
+        except Exception as e:
+            return {'error': 'Analytics query failed', 'details': str(e)}, 500
+        return {'pairs': pairs}
+
+
+@ns.route('/analytics/confidence')
+class AnalyticsConfidence(Resource):
+    """Prediction confidence distribution"""
+    
+    @ns.doc('analytics_confidence')
+    @ns.response(200, 'Success', confidence_output)
+    @ns.response(429, 'Rate limit exceeded', error_output)
+    @ns.response(500, 'Internal server error', error_output)
+    def get(self):
+        """Histogram of prediction confidence"""
+        rl = check_rate_limit()
+        if rl:
+            return rl
+        try:
+            return get_history_analytics().confidence_histogram()
+        except Exception as e:
+            return {'error': 'Analytics query failed', 'details': str(e)}, 500
+
+
+@ns.route('/models')
+class Models(Resource):
+    """Served models"""
+    
+    @ns.doc('get_models')
+    @ns.marshal_with(models_output)
+    def get(self):
+        """List the models that can be selected with ?model= or X-Model"""
+        registry = get_predictor_registry()
+        return {
+            'default': default_model,
+            'available': available_models(MODEL_DIR),
+            'resident': registry.stats(),
+            'max_resident': registry.max_resident,
+        }
 
 
 @ns.route('/symptoms')
@@ -164,11 +788,12 @@ class Symptoms(Resource):
     @ns.response(500, 'Internal server error', error_output)
     def get(self):
         """Retrieve list of all available symptoms"""
+        predictor = default_predictor()
         if not predictor:
             api.abort(500, 'Model not initialized')
         
         try:
-            symptoms = predictor.get_all_symptoms()
+            symptoms = get_cached_symptoms_list(predictor)
             return {
                 'symptoms': symptoms,
                 'count': len(symptoms)
@@ -185,11 +810,12 @@ class Diseases(Resource):
     @ns.response(500, 'Internal server error', error_output)
     def get(self):
         """Retrieve list of all available diseases"""
+        predictor = default_predictor()
         if not predictor:
             api.abort(500, 'Model not initialized')
         
         try:
-            diseases = predictor.get_all_diseases()
+            diseases = get_cached_diseases_list(predictor)
             return {
                 'diseases': diseases,
                 'count': len(diseases)
@@ -215,6 +841,7 @@ def validate_symptoms():
         "all_valid": true/false
     }
     """
+    predictor = default_predictor()
     if not predictor:
         return jsonify({'error': 'Model not initialized'}), 500
     
@@ -249,12 +876,14 @@ def get_disease_info(disease_name):
         "precautions": [...]
     }
     """
+    predictor = default_predictor()
     if not predictor:
         return jsonify({'error': 'Model not initialized'}), 500
     
     try:
-        description = predictor.processor.get_symptom_description(disease_name)
-        precautions = predictor.processor.get_symptom_precautions(disease_name)
+        namespace = model_namespace(predictor)
+        description = cache_symptom_descriptions(predictor.processor, disease_name, namespace)
+        precautions = cache_precautions(predictor.processor, disease_name, namespace)
         
         return jsonify({
             'disease': disease_name,
@@ -268,13 +897,14 @@ def get_disease_info(disease_name):
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get statistics about the model."""
+    predictor = default_predictor()
     if not predictor:
         return jsonify({'error': 'Model not initialized'}), 500
     
     try:
         stats = {
-            'total_diseases': len(predictor.get_all_diseases()),
-            'total_symptoms': len(predictor.get_all_symptoms()),
+            'total_diseases': len(get_cached_diseases_list(predictor)),
+            'total_symptoms': len(get_cached_symptoms_list(predictor)),
             'model_type': 'Random Forest Classifier',
             'framework': 'scikit-learn'
         }
@@ -284,6 +914,18 @@ def get_stats():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    """Get hit/miss statistics of the shared cache."""
+    return jsonify(get_cache().stats()), 200
+
+@app.route('/api/shadow/stats', methods=['GET'])
+def get_shadow_stats():
+    """Get agreement and latency of the shadowed candidate model."""
+    if shadow is None:
+        return jsonify({'enabled': False}), 200
+    return jsonify({'enabled': True, **shadow.stats()}), 200
+
 @app.errorhandler(404)
 def not_found(error):
     """Handle 404 errors."""
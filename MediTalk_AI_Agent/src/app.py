@@ -8,6 +8,7 @@ import sys
 import os
 import json
 import difflib
+import functools
 import time
 from typing import Any, Dict, List, cast
 
@@ -33,7 +34,6 @@ except ImportError:
     AudioResponse = None
     AUDIO_AVAILABLE = False
 
-from nlp_symptom_extractor import SymptomExtractor
 try:
     from ui_components import (
         render_metric_grid,
@@ -52,8 +52,15 @@ except ImportError:
             st.write(f"• {p}")
             
 from medical_history import MedicalHistory
+from history_export import EXPORT_FORMATS
+from history_analytics import get_history_analytics
+from history_store import get_history_store
 from pdf_generator import PDFReportGenerator
-from cache_utils import load_predictor_cached
+from predictor_registry import get_predictor_registry
+from cache_utils import (get_symptom_extractor, get_cached_symptoms_list,
+                         get_cached_diseases_list, cache_symptom_descriptions, cache_precautions,
+                         model_namespace)
+from stage_timer import StageTimer
 import logging
 from logging.handlers import RotatingFileHandler
 
@@ -570,21 +577,80 @@ def render_page_header(title, subtitle="", icon=""):
     </div>
     """, unsafe_allow_html=True)
 
-# Simple Loading Animation
-def show_medical_loader():
-    """Display clean loading animation"""
+# Loading Animation driven by the real analysis stages. Only the stages that
+# run on the script thread are shown: speech is synthesized in the background
+# and the PDF report is rendered when it is downloaded.
+ANALYSIS_STAGES = {
+    'extract': "📝 Reading your symptoms...",
+    'predict': "🔬 Analyzing your symptoms...",
+}
+
+
+# Longest wait for background speech once the results are on screen
+SPEECH_WAIT_SECONDS = 30
+
+# Consultations shown per Medical History page
+HISTORY_PAGE_SIZE = 10
+
+
+def show_medical_loader(timer: StageTimer):
+    """
+    Display clean loading animation that follows the timer's stages.
+    
+    The loader advances whenever a stage starts and disappears as soon as
+    the returned callable is invoked - there is no artificial delay.
+    """
     loading_placeholder = st.empty()
     
-    with loading_placeholder.container():
-        st.markdown("""
-        <div class="loading-container">
-            <div class="loading-spinner"></div>
-            <div class="loading-text">🔬 Analyzing your symptoms...</div>
-        </div>
-        """, unsafe_allow_html=True)
+    def render(stage=None):
+        done = len({name for name, _ in timer.stages})
+        text = ANALYSIS_STAGES.get(stage, "🔬 Analyzing your symptoms...")
+        with loading_placeholder.container():
+            st.markdown(f"""
+            <div class="loading-container">
+                <div class="loading-spinner"></div>
+                <div class="loading-text">{text}</div>
+            </div>
+            """, unsafe_allow_html=True)
+            st.progress(min(done / len(ANALYSIS_STAGES), 1.0))
+    
+    def finish():
+        timer.on_stage_start = None
+        loading_placeholder.empty()
+    
+    timer.on_stage_start = render
+    render()
+    return finish
+
+def render_voice_consultation(slot, speech_future):
+    """
+    Fill the voice consultation slot once its background synthesis is done.
     
-    time.sleep(1.5)
-    loading_placeholder.empty()
+    Called after every other result has been sent, so the page is already
+    on screen while this waits; the player is drawn once, with no polling.
+    """
+    try:
+        audio_data, audio_mime = speech_future.result(timeout=SPEECH_WAIT_SECONDS)
+    except Exception:
+        # Failures are logged by the future's done-callback
+        slot.empty()
+        return
+    with slot.container():
+        # Display audio player with autoplay (raw bytes are served
+        # as a media file rather than inlined as base64 markup)
+        st.subheader("🔊 AI Voice Consultation")
+        st.audio(audio_data, format=audio_mime, autoplay=True)
+        st.caption("🎧 Listen to your AI consultation above")
+
+
+def _log_speech_outcome(started: float):
+    """Done-callback for background speech: log its latency or failure."""
+    def log(future):
+        if future.exception() is not None:
+            logger.warning(f"Audio response generation failed: {future.exception()}")
+        else:
+            logger.info('Voice consultation ready in %.0f ms', (time.perf_counter() - started) * 1000)
+    return log
 
 load_premium_css()
 
@@ -602,9 +668,43 @@ if not logger.handlers:
 # Initialize medical history
 MedicalHistory.initialize_session()
 
+def _frequent_disease_advice(predictor: DiseasePredictor, limit: int) -> list[dict]:
+    """
+    Description and precautions of the diseases worth prewarming.
+    
+    MEDITALK_TTS_PREWARM_DISEASES (comma-separated) names them explicitly;
+    otherwise they are the `limit` diseases predicted most often so far,
+    from the history store. (The training data has the same number of rows
+    for every disease, so it says nothing about which are frequent.)
+    """
+    configured = os.getenv('MEDITALK_TTS_PREWARM_DISEASES', '')
+    if configured:
+        diseases = [d.strip() for d in configured.split(',') if d.strip()][:limit]
+    else:
+        diseases = [d for d, _ in get_history_store().most_common_diseases(limit)]
+    # Some model labels carry trailing spaces
+    known = {str(d).strip(): str(d) for d in get_cached_diseases_list(predictor) or []}
+    labels = [known[d.strip()] for d in diseases if d.strip() in known]
+    namespace = model_namespace(predictor)
+    return [
+        {
+            'description': cache_symptom_descriptions(predictor.processor, disease, namespace),
+            'precautions': cache_precautions(predictor.processor, disease, namespace),
+        }
+        for disease in labels
+    ]
+
+
 @st.cache_resource(show_spinner=False)
-def get_predictor() -> DiseasePredictor:
-    return load_predictor_cached(model_dir='models', data_dir='data')
+def get_audio_response(model_version: str, _predictor: DiseasePredictor):
+    """Shared speech synthesizer, prewarmed once per process in the background."""
+    audio_response = AudioResponse()
+    try:
+        limit = int(os.getenv('MEDITALK_TTS_PREWARM', '10'))
+        audio_response.prewarm(_frequent_disease_advice(_predictor, limit))
+    except Exception as e:
+        logger.warning(f"Speech prewarm skipped: {e}")
+    return audio_response
 
 
 def _normalize_symptom(token: str) -> str:
@@ -623,13 +723,15 @@ def _normalize_list(tokens: list[str]) -> list[str]:
 
 
 # Initialize session state
-if 'predictor' not in st.session_state:
+# Sessions hold only a handle; the registry keeps one predictor per model version
+if 'predictor_handle' not in st.session_state:
     try:
-        st.session_state.predictor = get_predictor()
+        st.session_state.predictor_handle = get_predictor_registry().acquire(model_dir='models', data_dir='data')
     except Exception as e:
         st.error(f"Error loading model: {e}")
         st.info("Please run the model training script first: `python src/model_trainer.py`")
         st.stop()
+predictor: DiseasePredictor = st.session_state.predictor_handle.predictor
 
 if 'voice_interface' not in st.session_state:
     try:
@@ -645,7 +747,7 @@ if 'voice_interface' not in st.session_state:
 if 'audio_response' not in st.session_state:
     try:
         if AUDIO_AVAILABLE and AudioResponse:
-            st.session_state.audio_response = AudioResponse()
+            st.session_state.audio_response = get_audio_response(str(predictor.model_version), predictor)
             logger.info("Audio response system initialized")
         else:
             st.session_state.audio_response = None
@@ -653,32 +755,26 @@ if 'audio_response' not in st.session_state:
         logger.warning(f"Audio response not available: {e}")
         st.session_state.audio_response = None
 
-# Initialize Natural Language Symptom Extractor
-if 'symptom_extractor' not in st.session_state:
-    try:
-        # Initialize after predictor so all_symptoms is available
-        known = []
-        try:
-            known = list(map(str, st.session_state.predictor.get_all_symptoms()))
-        except Exception:
-            known = []
-        st.session_state.symptom_extractor = SymptomExtractor(known)
-    except Exception as e:
-        logger.warning(f"Symptom extractor not available: {e}")
-        st.session_state.symptom_extractor = None
+# Natural Language Symptom Extractor (one compiled instance shared process-wide)
+try:
+    symptom_extractor = get_symptom_extractor(
+        str(predictor.model_version),
+        get_cached_symptoms_list(predictor) or [],
+    )
+except Exception as e:
+    logger.warning(f"Symptom extractor not available: {e}")
+    symptom_extractor = None
 
-# Cache disease and symptom lists in session to avoid repeat computation
-if 'all_symptoms' not in st.session_state or not st.session_state.get('all_symptoms'):
-    try:
-        st.session_state.all_symptoms = st.session_state.predictor.get_all_symptoms()
-    except Exception:
-        st.session_state.all_symptoms = []
+# Disease and symptom lists come from the shared cache, not per-session copies
+try:
+    all_symptoms = get_cached_symptoms_list(predictor)
+except Exception:
+    all_symptoms = []
 
-if 'all_diseases' not in st.session_state or not st.session_state.get('all_diseases'):
-    try:
-        st.session_state.all_diseases = st.session_state.predictor.get_all_diseases()
-    except Exception:
-        st.session_state.all_diseases = []
+try:
+    all_diseases = get_cached_diseases_list(predictor)
+except Exception:
+    all_diseases = []
 
 # Flag to trigger auto-analysis after voice input
 if 'auto_analyze' not in st.session_state:
@@ -716,6 +812,7 @@ with st.sidebar:
             "🩺 Symptom Checker",
             "📚 Disease Database",
             "📋 Medical History",
+            "📈 Analytics",
             "📊 Model Metrics",
             "ℹ️ About"
         ],
@@ -950,8 +1047,8 @@ if current_page == 'Home':
     """, unsafe_allow_html=True)
     
     try:
-        _diseases = len(list(st.session_state.all_diseases)) if st.session_state.all_diseases else 41
-        _symptoms = len(list(st.session_state.all_symptoms)) if st.session_state.all_symptoms else 132
+        _diseases = len(list(all_diseases)) if all_diseases else 41
+        _symptoms = len(list(all_symptoms)) if all_symptoms else 132
     except:
         _diseases = 41
         _symptoms = 132
@@ -1056,6 +1153,10 @@ elif current_page == 'Symptom Checker':
     )
     
     symptoms = []
+    # Typed text, re-extracted as a whole when it is analyzed
+    typed_symptoms = ''
+    # Per-stage timings of this run
+    analysis_timer = StageTimer()
     
     if input_method == "💬 Type Symptoms":
         if 'symptoms_input' not in st.session_state:
@@ -1081,10 +1182,14 @@ elif current_page == 'Symptom Checker':
         if not symptoms_input and st.session_state.symptoms_input:
             symptoms_input = st.session_state.symptoms_input
         
+        typed_symptoms = symptoms_input or ''
         extracted_preview: list[str] = []
         if symptoms_input:
-            if st.session_state.symptom_extractor is not None:
-                extracted_preview = st.session_state.symptom_extractor.extract(symptoms_input)
+            if symptom_extractor is not None:
+                # Live preview only: clause-level memoization re-scans just the
+                # clause being typed
+                with analysis_timer.stage('extract'):
+                    extracted_preview = symptom_extractor.extract_incremental(symptoms_input)
             # Fallback to comma-splitting if nothing extracted
             if not extracted_preview and (',' in symptoms_input):
                 extracted_preview = _normalize_list([s for s in symptoms_input.split(',')])
@@ -1117,7 +1222,7 @@ elif current_page == 'Symptom Checker':
         </div>
         """, unsafe_allow_html=True)
         
-        all_symptoms_list = list(map(str, st.session_state.all_symptoms)) if st.session_state.all_symptoms else []
+        all_symptoms_list = list(map(str, all_symptoms)) if all_symptoms else []
         
         if all_symptoms_list:
             selected_symptoms = st.multiselect(
@@ -1188,8 +1293,9 @@ elif current_page == 'Symptom Checker':
         # Show previously captured voice input
         if st.session_state.get('symptoms_input'):
             symptoms_input = st.session_state.symptoms_input
-            if st.session_state.symptom_extractor:
-                symptoms = st.session_state.symptom_extractor.extract(symptoms_input)
+            if symptom_extractor:
+                with analysis_timer.stage('extract'):
+                    symptoms = symptom_extractor.extract(symptoms_input)
             if symptoms:
                 st.markdown(f"""
                 <div style='background: linear-gradient(135deg, #e3f2fd 0%, #bbdefb 100%); padding: 1rem; border-radius: 8px; border-left: 4px solid #2196f3; margin: 1rem 0;'>
@@ -1239,23 +1345,37 @@ elif current_page == 'Symptom Checker':
     if st.session_state.auto_analyze:
         st.session_state.auto_analyze = False
     
+    # The preview matches clause by clause, which misses symptoms written
+    # across punctuation ("skin, rash") and can reorder them, so the model
+    # gets the whole-text extraction
+    if should_analyze and typed_symptoms and symptom_extractor is not None:
+        with analysis_timer.stage('extract'):
+            symptoms = symptom_extractor.extract(typed_symptoms) or symptoms
+    
     # Analysis results
     if should_analyze and symptoms:
-        # Show loading animation
-        show_medical_loader()
+        # Show loading animation (advances with the real analysis stages)
+        finish_loader = show_medical_loader(analysis_timer)
+        speech_future = None
         
         with st.spinner("🔬 Finalizing analysis..."):
             # Validate symptoms
             logger.info('Validating symptoms: %s', symptoms)
-            validation_raw = st.session_state.predictor.validate_symptoms(symptoms)
-            validation: Dict[str, Any] = cast(Dict[str, Any], validation_raw)
+            # One normalization pass and one model call for validation + prediction
+            with analysis_timer.stage('predict'):
+                try:
+                    analysis = predictor.validate_and_predict(symptoms)
+                finally:
+                    # Clear the loader before the results render, even on failure
+                    finish_loader()
+            validation: Dict[str, Any] = cast(Dict[str, Any], analysis['validation'])
             logger.info('Validation result: %s', {k: validation.get(k) for k in ['valid_symptoms','invalid_symptoms','all_valid']})
             
             if not bool(validation.get('all_valid', False)):
                 invalids: list[str] = cast(List[str], validation.get('invalid_symptoms', []))
                 st.warning(f"⚠️ Unrecognized symptoms: {', '.join(invalids)}")
                 # Offer suggestions for each invalid symptom
-                all_symptoms_for_matching = list(map(str, st.session_state.all_symptoms)) if st.session_state.all_symptoms else []
+                all_symptoms_for_matching = list(map(str, all_symptoms)) if all_symptoms else []
                 if all_symptoms_for_matching:
                     suggestions = []
                     for inv in invalids:
@@ -1265,12 +1385,10 @@ elif current_page == 'Symptom Checker':
                     if suggestions:
                         st.info("\n\n".join(suggestions))
             
-            if validation.get('valid_symptoms'):
-                # Make prediction
+            if analysis['result'] is not None:
                 valid_syms: list[str] = cast(List[str], validation.get('valid_symptoms', []))
-                logger.info('Predicting disease for valid symptoms: %s', valid_syms)
-                result_raw = st.session_state.predictor.predict_disease(valid_syms)
-                result: Dict[str, Any] = cast(Dict[str, Any], result_raw)
+                logger.info('Predicted disease for valid symptoms: %s', valid_syms)
+                result: Dict[str, Any] = cast(Dict[str, Any], analysis['result'])
                 logger.info('Prediction: primary=%s confidence=%.3f', result.get('primary_disease'), float(result.get('confidence', 0.0)))
                 
                 # Display results using modern components
@@ -1286,25 +1404,16 @@ elif current_page == 'Symptom Checker':
                         "The AI analyzes patterns across multiple symptoms to improve accuracy."
                     )
                 
-                # Generate and play audio response automatically
+                # Synthesize the spoken consultation in the background; its
+                # slot above the results is filled once everything else is shown
                 if st.session_state.audio_response is not None:
                     try:
-                        # Generate natural consultation speech
-                        speech_text = st.session_state.audio_response.generate_consultation_speech(
+                        voice_slot = st.empty()
+                        speech_future = st.session_state.audio_response.submit_consultation(
                             result, valid_syms
                         )
-                        
-                        # Create audio file
-                        if st.session_state.audio_response.text_to_speech_gtts(speech_text):
-                            # Display audio player with autoplay
-                            st.subheader("🔊 AI Voice Consultation")
-                            audio_html = st.session_state.audio_response.get_audio_player_html(autoplay=True)
-                            if audio_html:
-                                st.markdown(audio_html, unsafe_allow_html=True)
-                                st.caption("🎧 Listen to your AI consultation above")
-                            
-                            # Cleanup old files
-                            st.session_state.audio_response.cleanup_temp_files()
+                        speech_future.add_done_callback(_log_speech_outcome(time.perf_counter()))
+                        voice_slot.caption("🔊 Preparing your voice consultation...")
                     except Exception as audio_err:
                         logger.warning(f"Audio response generation failed: {audio_err}")
                 
@@ -1376,12 +1485,13 @@ elif current_page == 'Symptom Checker':
                         width="stretch"
                     )
                 with col3:
-                    # Generate PDF report
+                    # PDF report is rendered only when the download is requested
                     try:
-                        pdf_content = PDFReportGenerator.generate_report(result, valid_syms)
                         st.download_button(
                             label="📄 Download PDF Report",
-                            data=pdf_content,
+                            data=functools.partial(
+                                PDFReportGenerator.generate_report_cached, result, valid_syms
+                            ),
                             file_name="medical_report.pdf",
                             mime="application/pdf",
                             width="stretch"
@@ -1412,6 +1522,11 @@ elif current_page == 'Symptom Checker':
                         st.info(f"Voice output unavailable: {e}")
             else:
                 st.error("❌ No valid symptoms recognized. Please check your input.")
+        
+        logger.info('Analysis timings: %s', analysis_timer.summary())
+        
+        if speech_future is not None:
+            render_voice_consultation(voice_slot, speech_future)
     
     elif should_analyze and not symptoms:
         st.error("❌ Please enter at least one symptom.")
@@ -1435,7 +1550,7 @@ elif current_page == 'Disease Database':
     
     st.info("Browse information about all diseases in the database.")
     
-    all_diseases_list = list(map(str, st.session_state.all_diseases)) if st.session_state.all_diseases else []
+    all_diseases_list = list(map(str, all_diseases)) if all_diseases else []
     
     # Search/filter
     search_disease = st.text_input(
@@ -1464,7 +1579,10 @@ elif current_page == 'Disease Database':
             
             with col1:
                 # Description
-                description = str(st.session_state.predictor.processor.get_symptom_description(selected_disease))
+                description = str(cache_symptom_descriptions(
+                    predictor.processor, selected_disease,
+                    model_namespace(predictor)
+                ))
                 with st.expander("📖 Disease Description", expanded=True):
                     st.info(description)
             
@@ -1479,7 +1597,10 @@ elif current_page == 'Disease Database':
             # Precautions
             st.markdown("---")
             st.markdown("#### 💊 Precautions & Recommendations")
-            precautions = cast(List[str], st.session_state.predictor.processor.get_symptom_precautions(selected_disease) or [])
+            precautions = cast(List[str], cache_precautions(
+                predictor.processor, selected_disease,
+                model_namespace(predictor)
+            ) or [])
             
             if precautions:
                 render_precautions(precautions)
@@ -1687,9 +1808,9 @@ elif current_page == 'About':
 elif current_page == 'Medical History':
     render_page_header("📋 Medical History", "Your Personal Health Records & Consultation History")
     
-    history = MedicalHistory.get_history()
+    total_consultations = MedicalHistory.count_consultations()
     
-    if not history:
+    if not total_consultations:
         st.info("No consultation history yet. Complete a symptom check to start building your history.")
     else:
         # Summary statistics
@@ -1713,27 +1834,44 @@ elif current_page == 'Medical History':
         col_export, col_clear = st.columns([1, 1])
         
         with col_export:
-            history_json = MedicalHistory.export_history_json()
+            export_format = st.selectbox(
+                "Export format",
+                options=list(EXPORT_FORMATS),
+                format_func=lambda f: {'ndjson': 'JSON Lines', 'csv': 'CSV', 'json': 'JSON'}[f],
+                label_visibility="collapsed"
+            )
+            export_mime, export_ext = EXPORT_FORMATS[export_format]
+            # Exported only when the download is requested
             st.download_button(
-                label="📥 Export History (JSON)",
-                data=history_json,
-                file_name="medical_history.json",
-                mime="application/json",
+                label="📥 Export History",
+                data=functools.partial(MedicalHistory.export_history_bytes, export_format),
+                file_name=f"medical_history.{export_ext}",
+                mime=export_mime,
                 use_container_width=True
             )
         
         with col_clear:
             if st.button("🗑️ Clear History", type="secondary", width="stretch"):
                 MedicalHistory.clear_history()
+                st.session_state.history_cursors = [None]
                 st.success("History cleared!")
                 st.rerun()
         
         st.markdown("---")
         st.markdown("### Consultation History")
         
+        # Keyset pagination: one cursor per visited page, so any page is a
+        # single indexed query regardless of how much history exists
+        if 'history_cursors' not in st.session_state:
+            st.session_state.history_cursors = [None]
+        cursors = st.session_state.history_cursors
+        page_index = len(cursors) - 1
+        page, next_cursor = MedicalHistory.get_history_page(HISTORY_PAGE_SIZE, cursors[-1])
+        
         # Display history in reverse chronological order
-        for i, consultation in enumerate(reversed(history), 1):
-            with st.expander(f"Consultation #{len(history) - i + 1} - {consultation['timestamp'][:19]}"):
+        for i, consultation in enumerate(page):
+            number = total_consultations - page_index * HISTORY_PAGE_SIZE - i
+            with st.expander(f"Consultation #{number} - {consultation['timestamp'][:19]}"):
                 st.markdown(f"**Symptoms:** {', '.join(consultation['symptoms'])}")
                 st.markdown(f"**Primary Disease:** {consultation['primary_disease']}")
                 st.markdown(f"**Confidence:** {consultation['confidence']*100:.1f}%")
@@ -1742,6 +1880,91 @@ elif current_page == 'Medical History':
                     st.markdown("**Alternative Diagnoses:**")
                     for disease, prob in consultation['alternatives']:
                         st.markdown(f"- {disease}: {prob*100:.1f}%")
+        
+        col_prev, col_page, col_next = st.columns([1, 2, 1])
+        with col_prev:
+            if st.button("← Newer", disabled=page_index == 0, width="stretch"):
+                cursors.pop()
+                st.rerun()
+        with col_page:
+            total_pages = (total_consultations + HISTORY_PAGE_SIZE - 1) // HISTORY_PAGE_SIZE
+            st.caption(f"Page {page_index + 1} of {total_pages}")
+        with col_next:
+            if st.button("Older →", disabled=next_cursor is None, width="stretch"):
+                cursors.append(next_cursor)
+                st.rerun()
+
+elif current_page == 'Analytics':
+    render_page_header("📈 Analytics", "Consultation Trends Across All Sessions")
+    
+    try:
+        analytics = get_history_analytics()
+        overview = analytics.overview()
+    except Exception as e:
+        st.error(f"Analytics not available: {e}")
+        overview = None
+    
+    if overview is not None and not overview['total_consultations']:
+        st.info("No consultations recorded yet. Analytics appear after the first symptom check.")
+    elif overview is not None:
+        import pandas as pd
+        import altair as alt
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Consultations", f"{overview['total_consultations']:,}")
+        with col2:
+            st.metric("Diseases Seen", overview['unique_diseases'])
+        with col3:
+            st.metric("Since", (overview['first_hour'] or '').replace('T', ' ') + ":00")
+        
+        st.markdown("---")
+        st.markdown("### Cases per Disease")
+        col_bucket, col_top = st.columns([1, 1])
+        with col_bucket:
+            bucket = st.radio("Bucket", ["hour", "day"], index=1, horizontal=True)
+        with col_top:
+            top_n = st.slider("Diseases shown", min_value=3, max_value=15, value=5)
+        
+        trends = pd.DataFrame(analytics.disease_trends(bucket=bucket))
+        top_diseases = trends.groupby('disease')['count'].sum().nlargest(top_n).index
+        trend_chart = alt.Chart(trends[trends['disease'].isin(top_diseases)]).mark_line(point=True).encode(
+            x=alt.X('period:O', title=bucket.title()),
+            y=alt.Y('count:Q', title='Consultations'),
+            color=alt.Color('disease:N', title='Disease'),
+            tooltip=['period', 'disease', 'count', alt.Tooltip('average_confidence:Q', format='.1%')]
+        ).properties(height=350)
+        st.altair_chart(trend_chart, width="stretch")
+        
+        col_pairs, col_conf = st.columns([1, 1])
+        with col_pairs:
+            st.markdown("### Top Symptom Pairs")
+            pairs = analytics.symptom_pairs(limit=15)
+            if pairs:
+                st.dataframe(
+                    pd.DataFrame([
+                        {
+                            'Symptoms': ' + '.join(s.replace('_', ' ') for s in p['symptoms']),
+                            'Count': p['count'],
+                            'Share': f"{p['share']*100:.2f}%"
+                        }
+                        for p in pairs
+                    ]),
+                    hide_index=True,
+                    width="stretch"
+                )
+            else:
+                st.info("No consultations with two or more symptoms yet.")
+        with col_conf:
+            st.markdown("### Confidence Distribution")
+            histogram = pd.DataFrame(analytics.confidence_histogram()['bins'])
+            confidence_chart = alt.Chart(histogram).mark_bar().encode(
+                x=alt.X('lower:Q', bin='binned', title='Confidence', axis=alt.Axis(format='%')),
+                x2='upper:Q',
+                y=alt.Y('count:Q', title='Predictions'),
+                tooltip=['lower', 'upper', 'count']
+            ).properties(height=350)
+            st.altair_chart(confidence_chart, width="stretch")
 
 # Footer
 st.markdown("---")
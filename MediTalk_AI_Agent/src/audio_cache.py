@@ -0,0 +1,218 @@
+"""
+Content-addressed audio cache for MediTalk
+Stores synthesized speech on disk keyed by hash(text, lang, engine) with an
+LRU size cap, so repeated consultations are served without re-synthesis.
+A small in-memory tier in front of the disk serves hot entries without I/O.
+"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCache:
+    """Two-tier (memory, disk) LRU cache of audio bytes, addressed by content hash."""
+
+    SUFFIX = ".audio"
+
+    def __init__(self, cache_dir: str = os.path.join("temp", "audio_cache"),
+                 max_bytes: int = 50 * 1024 * 1024, memory_bytes: int = 8 * 1024 * 1024):
+        """
+        Initialize the cache and index any entries already on disk.
+
+        Args:
+            cache_dir: Directory holding cached audio files
+            max_bytes: Total size cap; least recently used entries are evicted
+            memory_bytes: Size cap of the in-memory tier (0 disables it)
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._lock = threading.Lock()
+        # key -> size in bytes, least recently used first
+        self._index: "OrderedDict[str, int]" = OrderedDict()
+        self._total_bytes = 0
+        # key -> audio bytes for recently used entries, least recent first
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_total = 0
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_index()
+
+    @staticmethod
+    def make_key(text: str, lang: str, engine: str) -> str:
+        """Return the content address for a (text, lang, engine) triple."""
+        digest = hashlib.sha256()
+        for part in (engine, lang, text):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + self.SUFFIX)
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from disk, oldest modification time first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith(self.SUFFIX):
+                continue
+            try:
+                st = os.stat(os.path.join(self.cache_dir, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, name[:-len(self.SUFFIX)], st.st_size))
+        for _, key, size in sorted(entries):
+            self._index[key] = size
+            self._total_bytes += size
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until under the size cap (lock held)."""
+        while self._total_bytes > self.max_bytes and self._index:
+            key, size = self._index.popitem(last=False)
+            self._total_bytes -= size
+            self.evictions += 1
+            self._forget(key)
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def _remember(self, key: str, data: bytes) -> None:
+        """Keep `data` in the memory tier, evicting its LRU entries (lock held)."""
+        if len(data) > self.memory_bytes:
+            return
+        self._forget(key)
+        self._memory[key] = data
+        self._memory_total += len(data)
+        while self._memory_total > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_total -= len(old)
+
+    def _forget(self, key: str) -> None:
+        """Drop `key` from the memory tier (lock held)."""
+        data = self._memory.pop(key, None)
+        if data is not None:
+            self._memory_total -= len(data)
+
+    def __contains__(self, key: str) -> bool:
+        with self._lock:
+            return key in self._index
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Return cached audio for `key`, or None on a miss.
+
+        Args:
+            key: Content address from make_key()
+        """
+        with self._lock:
+            if key not in self._index:
+                self.misses += 1
+                return None
+            self._index.move_to_end(key)
+            data = self._memory.get(key)
+            if data is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return data
+        try:
+            with open(self._path(key), "rb") as f:
+                data = f.read()
+            # Persist recency so the LRU order survives restarts
+            os.utime(self._path(key))
+        except OSError:
+            with self._lock:
+                size = self._index.pop(key, None)
+                if size is not None:
+                    self._total_bytes -= size
+                self.misses += 1
+            return None
+        with self._lock:
+            self.hits += 1
+            if key in self._index:
+                self._remember(key, data)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """
+        Store audio bytes under `key` (atomic write), evicting as needed.
+
+        Args:
+            key: Content address from make_key()
+            data: Audio bytes
+        """
+        if len(data) > self.max_bytes:
+            return
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._total_bytes -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._total_bytes += len(data)
+            self._remember(key, data)
+            self._evict()
+
+    def get_or_create(self, text: str, lang: str, engine: str,
+                      synthesize: Callable[[], bytes]) -> bytes:
+        """
+        Return cached audio, calling `synthesize` and caching its result on a miss.
+
+        Args:
+            text: Spoken text
+            lang: Language code
+            engine: Name of the TTS engine producing the audio
+            synthesize: Zero-argument callable returning audio bytes
+
+        Returns:
+            Audio bytes
+        """
+        key = self.make_key(text, lang, engine)
+        data = self.get(key)
+        if data is None:
+            data = synthesize()
+            self.put(key, data)
+        return data
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss metrics and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'memory_hits': self.memory_hits,
+                'evictions': self.evictions,
+                'entries': len(self._index),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'memory_bytes': self._memory_total,
+            }
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._lock:
+            for key in list(self._index):
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._index.clear()
+            self._total_bytes = 0
+            self._memory.clear()
+            self._memory_total = 0
@@ -1,22 +1,89 @@
 """
 Audio Response System for MediTalk
-Generates spoken responses for diagnosis results using gTTS
+Generates spoken responses for diagnosis results using a configurable
+chain of TTS backends (gTTS, pyttsx3, espeak)
 """
 
+import io
 import os
+import re
 import base64
-from gtts import gTTS
+import threading
+import time
+import uuid
+import wave
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 import logging
+from audio_cache import AudioCache
+from temp_files import ExpiringFileQueue
+from tts_backends import FallbackTTS, create_tts
 
 logger = logging.getLogger(__name__)
 
+# Background synthesis pool shared by all AudioResponse instances
+_speech_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="speech")
+# Prewarming gets its own single worker, so consultations never queue behind it
+_prewarm_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="speech-prewarm")
+
+# Content addresses produced by AudioCache.make_key()
+_KEY_RE = re.compile(r"[0-9a-f]{64}")
+
+# Name prefix of the audio files written by text_to_speech_gtts()
+SPEECH_FILE_PREFIX = "speech_"
+
+# Consultations synthesized by a fallback backend, kept in memory for fetching
+FALLBACK_CONSULTATIONS = 16
+
+DISCLAIMER = (
+    "Please remember this is an AI prediction. "
+    "You must consult a qualified medical professional for a definitive diagnosis and treatment plan."
+)
+
 class AudioResponse:
     """Handles text-to-speech responses for diagnosis results"""
     
-    def __init__(self, temp_dir: str = "temp"):
-        """Initialize audio response system with temp directory"""
+    def __init__(self, temp_dir: str = "temp", cache_max_bytes: Optional[int] = None,
+                 tts: Optional[FallbackTTS] = None, temp_max_bytes: Optional[int] = None,
+                 temp_ttl_seconds: Optional[float] = None):
+        """
+        Initialize audio response system with temp directory
+        
+        Args:
+            temp_dir: Directory for generated audio files
+            cache_max_bytes: Size cap of the speech cache (default from
+                MEDITALK_AUDIO_CACHE_MB, 50 MB)
+            tts: Backend chain used for synthesis (default from
+                MEDITALK_TTS_BACKENDS / MEDITALK_TTS_TIMEOUT)
+            temp_max_bytes: Byte budget for generated audio files (default
+                from MEDITALK_AUDIO_TEMP_MB, 20 MB)
+            temp_ttl_seconds: Lifetime of generated audio files (default from
+                MEDITALK_AUDIO_TTL, 600 s)
+        """
         self.temp_dir = temp_dir
         os.makedirs(self.temp_dir, exist_ok=True)
+        if cache_max_bytes is None:
+            cache_max_bytes = int(os.getenv('MEDITALK_AUDIO_CACHE_MB', '50')) * 1024 * 1024
+        memory_bytes = int(os.getenv('MEDITALK_AUDIO_MEMORY_MB', '8')) * 1024 * 1024
+        self.cache = AudioCache(os.path.join(self.temp_dir, 'audio_cache'), max_bytes=cache_max_bytes,
+                                memory_bytes=memory_bytes)
+        self.tts = tts or create_tts()
+        if temp_max_bytes is None:
+            temp_max_bytes = int(os.getenv('MEDITALK_AUDIO_TEMP_MB', '20')) * 1024 * 1024
+        if temp_ttl_seconds is None:
+            temp_ttl_seconds = float(os.getenv('MEDITALK_AUDIO_TTL', '600'))
+        self.temp_files = ExpiringFileQueue(ttl_seconds=temp_ttl_seconds, max_bytes=temp_max_bytes)
+        # Files from earlier runs (or crashes) are expired by age, then tracked
+        self.temp_files.adopt(self.temp_dir, SPEECH_FILE_PREFIX)
+        # Last file written by each thread (one Streamlit session runs per thread)
+        self._local = threading.local()
+        # Consultation key -> in-flight synthesis, for lazy fetching
+        self._pending: Dict[str, Future] = {}
+        self._pending_lock = threading.Lock()
+        # Consultation key -> fallback audio, never cached (see synthesize())
+        self._fallback: "OrderedDict[str, Tuple[bytes, str]]" = OrderedDict()
+        logger.info(f"TTS backends: {', '.join(b.name for b in self.tts.backends)}")
         logger.info(f"Audio response system initialized with temp dir: {self.temp_dir}")
     
     def generate_consultation_speech(self, result: dict, symptoms: list) -> str:
@@ -30,6 +97,24 @@ class AudioResponse:
         Returns:
             Formatted text for speech synthesis
         """
+        return " ".join(self.generate_consultation_segments(result, symptoms))
+    
+    def generate_consultation_segments(self, result: dict, symptoms: list) -> List[str]:
+        """
+        Split the consultation speech into independently cacheable segments
+        
+        The segments are the per-consultation introduction, the per-disease
+        advice (description and first precaution) and the fixed disclaimer.
+        Only the introduction depends on the symptoms and confidence, so the
+        other segments can be synthesized ahead of time.
+        
+        Args:
+            result: Dictionary with disease prediction results
+            symptoms: List of symptoms identified
+            
+        Returns:
+            List of text segments, in speaking order
+        """
         disease = result.get('primary_disease', 'Unknown')
         confidence = result.get('confidence', 0.0)
         
@@ -53,6 +138,26 @@ class AudioResponse:
             top_alts = ", or ".join(alt_diseases[:2])
             speech_parts.append(f"Other possible conditions include {top_alts}.")
         
+        segments = [" ".join(speech_parts)]
+        advice = self.generate_advice_speech(result)
+        if advice:
+            segments.append(advice)
+        segments.append(DISCLAIMER)
+        return segments
+    
+    @staticmethod
+    def generate_advice_speech(result: dict) -> str:
+        """
+        Generate the disease-specific part of the consultation
+        
+        Args:
+            result: Dictionary with 'description' and 'precautions'
+            
+        Returns:
+            Advice text (empty if neither is available)
+        """
+        speech_parts = []
+        
         # Description if available
         description = result.get('description', '')
         if description and len(description) < 200:
@@ -64,56 +169,307 @@ class AudioResponse:
             first_precaution = precautions[0]
             speech_parts.append(f"My immediate advice is to {first_precaution}.")
         
-        # Disclaimer
-        speech_parts.append(
-            "Please remember this is an AI prediction. "
-            "You must consult a qualified medical professional for a definitive diagnosis and treatment plan."
-        )
-        
         return " ".join(speech_parts)
     
-    def text_to_speech_gtts(self, text: str, filename: str = "response.mp3", lang: str = 'en') -> bool:
+    @property
+    def last_filepath(self) -> Optional[str]:
+        """Audio file most recently written by the calling thread."""
+        return getattr(self._local, 'filepath', None)
+    
+    @property
+    def last_mime_type(self) -> str:
+        """MIME type of the audio most recently written by the calling thread."""
+        return getattr(self._local, 'mime_type', "audio/mpeg")
+    
+    def text_to_speech_gtts(self, text: str, filename: Optional[str] = None, lang: str = 'en') -> bool:
         """
-        Convert text to speech using gTTS and save as MP3
+        Convert text to speech with the configured backend chain and save it
+        
+        Kept under its historical name; gTTS is only the first backend of the
+        default chain, and slow or unavailable backends fall through to the
+        next one within the chain's deadline.
         
         Args:
             text: Text to convert to speech
-            filename: Output filename
+            filename: Output filename (default: a unique name per request,
+                available afterwards as `last_filepath`)
             lang: Language code (default: 'en')
             
         Returns:
             True if successful, False otherwise
         """
         try:
+            data, mime_type = self.synthesize(text, lang)
+            if filename is None:
+                extension = ".wav" if mime_type == "audio/wav" else ".mp3"
+                filename = f"{SPEECH_FILE_PREFIX}{uuid.uuid4().hex}{extension}"
             filepath = os.path.join(self.temp_dir, filename)
-            tts = gTTS(text=text, lang=lang, slow=False)
-            tts.save(filepath)
-            logger.info(f"Speech generated successfully: {filepath}")
+            with open(filepath, "wb") as f:
+                f.write(data)
+            self.temp_files.register(filepath, len(data))
+            self._local.filepath = filepath
+            self._local.mime_type = mime_type
             return True
         except Exception as e:
-            logger.error(f"Error generating speech with gTTS: {e}")
+            logger.error(f"Error generating speech: {e}")
             return False
     
-    def get_audio_player_html(self, filename: str = "response.mp3", autoplay: bool = True) -> str:
+    def text_to_speech_bytes(self, text: str, lang: str = 'en') -> Optional[Tuple[bytes, str]]:
+        """
+        Convert text to speech entirely in memory
+        
+        Backends write into an in-memory buffer and cache hits are served
+        from the memory tier, so no temp file is written or re-read.
+        
+        Args:
+            text: Text to convert to speech
+            lang: Language code (default: 'en')
+            
+        Returns:
+            Tuple of (audio bytes, MIME type), or None if synthesis failed
+        """
+        try:
+            return self.synthesize(text, lang)
+        except Exception as e:
+            logger.error(f"Error generating speech: {e}")
+            return None
+    
+    def synthesize(self, text: str, lang: str = 'en') -> Tuple[bytes, str]:
+        """
+        Return speech audio for `text`, from the cache when possible
+        
+        Only audio of the preferred (first available) backend is cached.
+        Audio from a fallback backend is returned but not stored, so an
+        outage of the preferred backend does not pin fallback audio in the
+        cache once it recovers.
+        
+        Args:
+            text: Text to convert to speech
+            lang: Language code (default: 'en')
+            
+        Returns:
+            Tuple of (audio bytes, MIME type)
+            
+        Raises:
+            RuntimeError: If every TTS backend fails
+        """
+        data, mime_type, _ = self._synthesize(text, lang)
+        return data, mime_type
+    
+    def _synthesize(self, text: str, lang: str, deadline: Optional[float] = None) -> Tuple[bytes, str, bool]:
+        """
+        synthesize(), also returning whether the preferred backend produced the audio
+        
+        `deadline` (time.monotonic()) bounds the network backends, so several
+        calls can share one (see FallbackTTS.synthesize).
+        """
+        preferred = self.tts.preferred
+        key = self.cache.make_key(text, lang, preferred.name) if preferred else None
+        data = self.cache.get(key) if key else None
+        
+        if data is not None:
+            logger.info(f"Speech served from cache ({preferred.name})")
+            return data, preferred.mime_type, True
+        data, backend = self.tts.synthesize(text, lang, deadline=deadline)
+        if backend is preferred:
+            self.cache.put(key, data)
+            logger.info(f"Speech generated with {backend.name}")
+        else:
+            logger.info(f"Speech generated with fallback {backend.name} (not cached)")
+        return data, backend.mime_type, backend is preferred
+    
+    def synthesize_segments(self, segments: List[str], lang: str = 'en') -> Tuple[bytes, str]:
+        """
+        Synthesize each segment (cached individually) and join the audio
+        
+        MP3 streams are joined frame-wise and WAV streams are merged into a
+        single file. If the segments came from backends with different
+        formats, the full text is synthesized in one piece instead. All
+        segments share one network deadline (MEDITALK_TTS_TIMEOUT), so a cold
+        consultation takes no longer than a single synthesis would.
+        
+        Args:
+            segments: Text segments, in speaking order
+            lang: Language code (default: 'en')
+            
+        Returns:
+            Tuple of (audio bytes, MIME type)
+        """
+        data, mime_type, _ = self._synthesize_segments(segments, lang)
+        return data, mime_type
+    
+    def _synthesize_segments(self, segments: List[str], lang: str) -> Tuple[bytes, str, bool]:
+        """synthesize_segments(), also returning whether only the preferred backend was used."""
+        deadline = time.monotonic() + self.tts.timeout
+        parts = [self._synthesize(segment, lang, deadline) for segment in segments]
+        preferred = all(p for _, _, p in parts)
+        mime_types = {mime_type for _, mime_type, _ in parts}
+        if len(mime_types) == 1:
+            mime_type = mime_types.pop()
+            if len(parts) == 1 or mime_type == "audio/mpeg":
+                return b"".join(data for data, _, _ in parts), mime_type, preferred
+            merged = _merge_wav([data for data, _, _ in parts])
+            if merged is not None:
+                return merged, mime_type, preferred
+        return self._synthesize(" ".join(segments), lang, deadline)
+    
+    def submit_consultation(self, result: dict, symptoms: list, lang: str = 'en') -> "Future[Tuple[bytes, str]]":
+        """
+        Start synthesizing the consultation speech in the background
+        
+        Args:
+            result: Dictionary with disease prediction results
+            symptoms: List of symptoms identified
+            lang: Language code (default: 'en')
+            
+        Returns:
+            Future resolving to (audio bytes, MIME type)
+        """
+        segments = self.generate_consultation_segments(result, symptoms)
+        return _speech_executor.submit(self.synthesize_segments, segments, lang)
+    
+    def consultation_key(self, result: dict, symptoms: list, lang: str = 'en') -> str:
+        """
+        Return the content address of a consultation's speech
+        
+        Args:
+            result: Dictionary with disease prediction results
+            symptoms: List of symptoms identified
+            lang: Language code (default: 'en')
+        """
+        text = "\n".join(self.generate_consultation_segments(result, symptoms))
+        return self.cache.make_key(text, lang, "consultation")
+    
+    def request_consultation(self, result: dict, symptoms: list, lang: str = 'en') -> str:
+        """
+        Ensure the consultation speech is cached or being synthesized
+        
+        The joined audio is stored under the returned key, so clients can
+        fetch it later with get_consultation(). Audio made by a fallback
+        backend is only kept in memory for a few recent consultations, and
+        a new request for the same key synthesizes it again.
+        
+        Args:
+            result: Dictionary with disease prediction results
+            symptoms: List of symptoms identified
+            lang: Language code (default: 'en')
+            
+        Returns:
+            Consultation key
+        """
+        key = self.consultation_key(result, symptoms, lang)
+        with self._pending_lock:
+            if key in self._pending or key in self.cache:
+                return key
+            
+            def synthesize_and_store() -> Tuple[bytes, str]:
+                try:
+                    data, mime_type, preferred = self._synthesize_segments(
+                        self.generate_consultation_segments(result, symptoms), lang
+                    )
+                    if preferred:
+                        self.cache.put(key, data)
+                    else:
+                        with self._pending_lock:
+                            self._fallback[key] = (data, mime_type)
+                            self._fallback.move_to_end(key)
+                            while len(self._fallback) > FALLBACK_CONSULTATIONS:
+                                self._fallback.popitem(last=False)
+                    return data, mime_type
+                finally:
+                    with self._pending_lock:
+                        self._pending.pop(key, None)
+            
+            self._pending[key] = _speech_executor.submit(synthesize_and_store)
+        return key
+    
+    def get_consultation(self, key: str, timeout: Optional[float] = None) -> Optional[Tuple[bytes, str]]:
+        """
+        Return consultation speech requested earlier
+        
+        Args:
+            key: Key from request_consultation()
+            timeout: Seconds to wait if the speech is still being synthesized
+            
+        Returns:
+            Tuple of (audio bytes, MIME type), or None if the key is unknown
+            
+        Raises:
+            concurrent.futures.TimeoutError: If synthesis is still running
+            RuntimeError: If synthesis failed
+        """
+        if not _KEY_RE.fullmatch(key):
+            return None
+        with self._pending_lock:
+            future = self._pending.get(key)
+            fallback = self._fallback.get(key)
+        if future is not None:
+            return future.result(timeout=timeout)
+        data = self.cache.get(key)
+        if data is None:
+            return fallback
+        return data, sniff_mime_type(data)
+    
+    def prewarm(self, results: Iterable[dict], lang: str = 'en') -> List[Future]:
+        """
+        Pre-synthesize the disease-specific speech segments in the background
+        
+        Runs one segment at a time on a dedicated worker, so requested
+        consultations do not wait behind it.
+        
+        Args:
+            results: Dictionaries with 'description' and 'precautions', e.g.
+                for the most frequently predicted diseases
+            lang: Language code (default: 'en')
+            
+        Returns:
+            List of futures, one per segment queued
+        """
+        texts = [DISCLAIMER] + [self.generate_advice_speech(r) for r in results]
+        return [
+            _prewarm_executor.submit(self.synthesize, text, lang)
+            for text in dict.fromkeys(t for t in texts if t)
+        ]
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        Get speech cache metrics
+        
+        Returns:
+            Dictionary with hits, misses, hit_rate, evictions, entries and bytes
+        """
+        return self.cache.stats()
+    
+    def get_audio_player_html(self, filename: Optional[str] = None, autoplay: bool = True,
+                              data: Optional[bytes] = None, mime_type: Optional[str] = None) -> str:
         """
         Generate HTML audio player with base64 encoded audio
         
+        The audio is inlined in the markup (about a third larger than the
+        raw bytes); prefer passing the bytes to st.audio or serving them
+        from /api/speech where possible.
+        
         Args:
-            filename: Audio file to play
+            filename: Audio file to play (default: the file last written by
+                text_to_speech_gtts in this thread)
             autoplay: Whether to autoplay the audio
+            data: Audio bytes to play instead of reading `filename`
+            mime_type: MIME type of `data` (default: last synthesized type)
             
         Returns:
             HTML string for audio player
         """
         try:
-            filepath = os.path.join(self.temp_dir, filename)
-            
-            if not os.path.exists(filepath):
-                logger.warning(f"Audio file not found: {filepath}")
-                return ""
-            
-            with open(filepath, "rb") as f:
-                data = f.read()
+            if data is None:
+                filepath = os.path.join(self.temp_dir, filename) if filename else self.last_filepath
+                
+                if not filepath or not os.path.exists(filepath):
+                    logger.warning(f"Audio file not found: {filepath}")
+                    return ""
+                
+                with open(filepath, "rb") as f:
+                    data = f.read()
+            mime_type = mime_type or self.last_mime_type
             
             b64 = base64.b64encode(data).decode()
             autoplay_attr = "autoplay" if autoplay else ""
@@ -121,7 +477,7 @@ class AudioResponse:
             html = f'''
             <div style="margin: 20px 0;">
                 <audio controls {autoplay_attr} style="width: 100%;">
-                    <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
+                    <source src="data:{mime_type};base64,{b64}" type="{mime_type}">
                     Your browser does not support the audio element.
                 </audio>
             </div>
@@ -132,26 +488,44 @@ class AudioResponse:
             logger.error(f"Error creating audio player: {e}")
             return ""
     
-    def cleanup_temp_files(self, max_files: int = 5):
+    def cleanup_temp_files(self, max_files: Optional[int] = None):
         """
-        Clean up old temporary audio files
+        Clean up expired temporary audio files
+        
+        Files are also removed by a background janitor once they expire or
+        the byte budget is exceeded; this forces a pass immediately.
         
         Args:
-            max_files: Maximum number of files to keep
+            max_files: Optional maximum number of files to keep
         """
         try:
-            files = [
-                os.path.join(self.temp_dir, f) 
-                for f in os.listdir(self.temp_dir) 
-                if f.endswith('.mp3')
-            ]
-            
-            if len(files) > max_files:
-                # Sort by modification time
-                files.sort(key=lambda x: os.path.getmtime(x))
-                # Remove oldest files
-                for f in files[:-max_files]:
-                    os.remove(f)
-                    logger.info(f"Cleaned up old audio file: {f}")
+            self.temp_files.purge(max_files)
         except Exception as e:
             logger.warning(f"Error cleaning up temp files: {e}")
+
+def sniff_mime_type(data: bytes) -> str:
+    """Return the MIME type of synthesized audio from its header bytes."""
+    if data[:4] == b"RIFF" and data[8:12] == b"WAVE":
+        return "audio/wav"
+    return "audio/mpeg"
+
+
+def _merge_wav(chunks: List[bytes]) -> Optional[bytes]:
+    """Concatenate WAV files with identical formats; None if they differ."""
+    params = None
+    frames = []
+    for chunk in chunks:
+        with wave.open(io.BytesIO(chunk), "rb") as wav:
+            chunk_params = wav.getparams()[:3]
+            if params is None:
+                params = chunk_params
+            elif chunk_params != params:
+                return None
+            frames.append(wav.readframes(wav.getnframes()))
+    out = io.BytesIO()
+    with wave.open(out, "wb") as wav:
+        wav.setnchannels(params[0])
+        wav.setsampwidth(params[1])
+        wav.setframerate(params[2])
+        wav.writeframes(b"".join(frames))
+    return out.getvalue()
@@ -0,0 +1,250 @@
+"""
+Bulk PDF report generation for MediTalk AI
+Renders reports for archives of consultations across a process pool and
+streams them into a ZIP file, keeping only a bounded window in memory
+"""
+
+import argparse
+import json
+import logging
+import os
+import re
+import sys
+import time
+import zipfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from pdf_generator import PDFReportGenerator
+
+logger = logging.getLogger(__name__)
+
+# Per-worker disease metadata used to fill in description/precautions
+_processor = None
+
+
+def iter_report_inputs(data: Union[List[Any], Dict[str, Any]]) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+    """
+    Yield (result, symptoms) pairs from exported consultations.
+
+    Accepted inputs:
+        - MedicalHistory.export_history_json() output (list of records with
+          'symptoms', 'primary_disease', 'confidence', 'alternatives')
+        - /api/predict/batch output ({"results": [prediction, ...]})
+        - /api/predict/text output ({"results": [{"extracted", "prediction"}, ...]})
+        - a list of {"symptoms": [...], "result": prediction} objects
+
+    Args:
+        data: Parsed JSON document
+
+    Raises:
+        ValueError: If the document has none of the supported shapes
+    """
+    if isinstance(data, dict) and isinstance(data.get('results'), list):
+        records = data['results']
+    elif isinstance(data, list):
+        records = data
+    else:
+        raise ValueError("Expected a list of consultations or an object with a 'results' list")
+    return iter_record_inputs(records)
+
+
+def iter_ndjson_inputs(fp: TextIO) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+    """
+    Yield (result, symptoms) pairs from JSON Lines, one consultation per line.
+
+    The file is read line by line, so memory does not grow with its size.
+    Accepts the /api/history/export?format=ndjson output and one record per
+    line of any shape iter_report_inputs() accepts in a list.
+
+    Args:
+        fp: Text file object
+
+    Raises:
+        ValueError: If a line is not valid JSON or not a consultation
+    """
+    def records() -> Iterator[Tuple[str, Any]]:
+        for number, line in enumerate(fp, 1):
+            if not line.strip():
+                continue
+            try:
+                yield f"Line {number}", json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Line {number}: invalid JSON ({e.msg})") from None
+
+    return _iter_located_inputs(records())
+
+
+def iter_record_inputs(records: Iterable[Any]) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+    """
+    Yield (result, symptoms) pairs from consultation records, lazily.
+
+    Raises:
+        ValueError: If a record is not a consultation (the message names it)
+    """
+    return _iter_located_inputs((f"Record {number}", record) for number, record in enumerate(records, 1))
+
+
+def _iter_located_inputs(records: Iterable[Tuple[str, Any]]) -> Iterator[Tuple[Dict[str, Any], List[str]]]:
+    """iter_record_inputs() over (location, record) pairs, naming the location in errors."""
+    for location, record in records:
+        if not isinstance(record, dict):
+            raise ValueError(f"{location}: each consultation must be a JSON object")
+        if 'prediction' in record:
+            # /api/predict/text entry; texts without symptoms have no report
+            if record['prediction'] is None:
+                continue
+            result = record['prediction']
+            symptoms = [span['symptom'] for span in record.get('extracted', [])]
+        elif 'result' in record:
+            result = record['result']
+            symptoms = list(record.get('symptoms', []))
+        elif 'alternatives' in record and 'primary_disease' in record:
+            # Medical history entry: alternatives are (disease, probability) pairs
+            pairs = record.get('alternatives') or []
+            result = {
+                'primary_disease': record['primary_disease'],
+                'confidence': record.get('confidence', 0.0),
+                'alternative_diseases': [d for d, _ in pairs],
+                'alternative_probabilities': [p for _, p in pairs],
+            }
+            symptoms = list(record.get('symptoms', []))
+        else:
+            result = record
+            symptoms = list(record.get('symptoms', []))
+        if not isinstance(result, dict) or 'primary_disease' not in result:
+            # Anything else would render as an "Unknown" placeholder report
+            raise ValueError(f"{location}: not a consultation (no 'primary_disease')")
+        yield result, symptoms
+
+
+def _init_worker(data_dir: Optional[str]) -> None:
+    """Load disease descriptions and precautions once per worker process."""
+    global _processor
+    if data_dir:
+        from data_processor import DataProcessor
+        _processor = DataProcessor(data_dir)
+        _processor.load_data()
+
+
+def _complete(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Fill in the fields the report needs but exported records may lack."""
+    result = dict(result)
+    disease = str(result.get('primary_disease', 'Unknown'))
+    result['primary_disease'] = disease
+    result.setdefault('confidence', 0.0)
+    result.setdefault('alternative_diseases', [])
+    result.setdefault('alternative_probabilities', [])
+    if 'description' not in result:
+        result['description'] = (_processor.get_symptom_description(disease)
+                                 if _processor else "No description available.")
+    if 'precautions' not in result:
+        result['precautions'] = _processor.get_symptom_precautions(disease) if _processor else []
+    return result
+
+
+def _render_one(item: Tuple[Dict[str, Any], List[str]]) -> bytes:
+    """Render one report in a worker process."""
+    result, symptoms = item
+    return PDFReportGenerator.generate_report(_complete(result), symptoms)
+
+
+def _report_name(index: int, result: Dict[str, Any]) -> str:
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', str(result.get('primary_disease', 'report'))).strip('_')
+    return f"{index:05d}_{slug or 'report'}.pdf"
+
+
+def generate_bulk_reports(items: Iterable[Tuple[Dict[str, Any], List[str]]],
+                          output: Union[str, BinaryIO],
+                          workers: Optional[int] = None,
+                          data_dir: Optional[str] = 'data',
+                          window: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Render reports across a process pool and stream them into a ZIP.
+
+    At most `window` reports are in flight or awaiting their turn, and each
+    one is written to the archive as soon as it (and every earlier one) is
+    done, so memory stays bounded however large the input is.
+
+    Args:
+        items: (result, symptoms) pairs, e.g. from iter_report_inputs()
+        output: ZIP file path or writable binary file object
+        workers: Worker processes (default: CPU count)
+        data_dir: Dataset directory used to fill in missing descriptions
+            and precautions (None to skip)
+        window: Maximum reports in flight (default: 4 per worker)
+
+    Returns:
+        Dictionary with reports, failed, bytes, seconds and reports_per_second
+    """
+    workers = workers or os.cpu_count() or 1
+    window = window or workers * 4
+    stats = {'reports': 0, 'failed': 0, 'bytes': 0}
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(data_dir,)) as executor, \
+            zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+        pending = deque()
+
+        def write_oldest() -> None:
+            index, result, future = pending.popleft()
+            try:
+                pdf = future.result()
+            except Exception as e:
+                stats['failed'] += 1
+                logger.warning(f"Report {index} ({result.get('primary_disease')}) failed: {e}")
+                return
+            # PDF page streams are already compressed; store them as-is
+            archive.writestr(_report_name(index, result), pdf)
+            stats['reports'] += 1
+            stats['bytes'] += len(pdf)
+
+        for index, (result, symptoms) in enumerate(items, 1):
+            if len(pending) >= window:
+                write_oldest()
+            pending.append((index, result, executor.submit(_render_one, (result, symptoms))))
+        while pending:
+            write_oldest()
+
+    stats['seconds'] = time.perf_counter() - start
+    stats['reports_per_second'] = stats['reports'] / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(
+        description="Render PDF reports for exported consultations into a ZIP archive"
+    )
+    parser.add_argument('input', help='JSON or JSON Lines file: history export or batch/text API results')
+    parser.add_argument('--format', choices=('auto', 'ndjson', 'json'), default='auto',
+                        help='input format (default: ndjson for .ndjson/.jsonl files, else json); '
+                             'ndjson is streamed, json is loaded whole')
+    parser.add_argument('-o', '--output', default='reports.zip', help='ZIP file to write')
+    parser.add_argument('-w', '--workers', type=int, default=None, help='worker processes (default: CPU count)')
+    parser.add_argument('--data-dir', default='data', help='dataset directory for descriptions/precautions')
+    args = parser.parse_args(argv)
+
+    fmt = args.format
+    if fmt == 'auto':
+        fmt = 'ndjson' if args.input.lower().endswith(('.ndjson', '.jsonl')) else 'json'
+    try:
+        with open(args.input, encoding='utf-8') as f:
+            items = iter_ndjson_inputs(f) if fmt == 'ndjson' else iter_report_inputs(json.load(f))
+            stats = generate_bulk_reports(items, args.output, workers=args.workers, data_dir=args.data_dir)
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    print(f"Wrote {stats['reports']} report(s) to {args.output} "
+          f"({stats['bytes'] / 1024:.0f} KiB) in {stats['seconds']:.2f}s "
+          f"- {stats['reports_per_second']:.1f} reports/s")
+    if stats['failed']:
+        print(f"{stats['failed']} report(s) failed; see log for details", file=sys.stderr)
+    return 0 if not stats['failed'] else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
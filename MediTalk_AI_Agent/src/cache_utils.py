@@ -1,81 +1,428 @@
 """
 Caching utilities for MediTalk AI
-Provides caching decorators and functions for performance optimization
+Framework-neutral cache (TTL + LRU memory tier, optional disk tier) shared
+by the Streamlit app and the Flask API, with entries namespaced by model
+version so a model switch never serves stale results
 """
-from functools import lru_cache
-from typing import List, Dict, Any
-import streamlit as st
+import hashlib
+import logging
+import os
+import pickle
+import re
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from nlp_symptom_extractor import SymptomExtractor
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class Cache:
+    """
+    Thread-safe LRU cache whose entries expire after a TTL.
+
+    Entries live under a namespace (typically the model version), so all
+    results derived from one model can be invalidated together. An optional
+    disk tier keeps picklable entries across restarts; it is read on memory
+    misses and written through on every set().
+    """
+
+    SUFFIX = ".pkl"
+    # Namespace directories are named by _namespace_dir()
+    _NAMESPACE_DIR = re.compile(r'[0-9a-f]{32}')
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 3600,
+                 disk_dir: Optional[str] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Memory tier capacity; least recently used entries are evicted
+            ttl_seconds: Default time to live (None never expires)
+            disk_dir: Directory of the disk tier (None disables it)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = disk_dir
+        self._lock = threading.Lock()
+        # (namespace, key) -> (expires_at or None, value), least recent first
+        self._entries: "OrderedDict[Tuple[str, Any], Tuple[Optional[float], Any]]" = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+
+    # ---- disk tier ------------------------------------------------------
+
+    @staticmethod
+    def _digest(value: Any) -> str:
+        return hashlib.sha256(repr(value).encode('utf-8')).hexdigest()
+
+    def _namespace_dir(self, namespace: str) -> str:
+        return os.path.join(self.disk_dir, self._digest(namespace)[:32])
+
+    def _disk_path(self, namespace: str, key: Any) -> str:
+        return os.path.join(self._namespace_dir(namespace), self._digest(key) + self.SUFFIX)
+
+    def _disk_get(self, namespace: str, key: Any) -> Any:
+        path = self._disk_path(namespace, key)
+        try:
+            with open(path, 'rb') as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return _MISSING
+        except Exception as e:
+            logger.warning(f"Dropping unreadable cache file {path}: {e}")
+            self._disk_remove(path)
+            return _MISSING
+        if expires_at is not None and expires_at <= time.time():
+            self._disk_remove(path)
+            return _MISSING
+        return expires_at, value
+
+    def _disk_set(self, namespace: str, key: Any, expires_at: Optional[float], value: Any) -> None:
+        path = self._disk_path(namespace, key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                pickle.dump((expires_at, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            # Unpicklable values simply stay memory-only
+            logger.debug(f"Not persisting cache entry {namespace}/{key!r}: {e}")
+
+    @staticmethod
+    def _disk_remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def _disk_clear(self) -> None:
+        """
+        Delete every namespace directory of the disk tier.
+
+        Only the cache's own entry files are removed, so other files that
+        share the directory (or a mistyped MEDITALK_CACHE_DIR) are left alone.
+        """
+        try:
+            names = os.listdir(self.disk_dir)
+        except OSError:
+            return
+        for name in names:
+            path = os.path.join(self.disk_dir, name)
+            if not (self._NAMESPACE_DIR.fullmatch(name) and os.path.isdir(path)):
+                continue
+            for entry in os.listdir(path):
+                if entry.endswith(self.SUFFIX) or entry.endswith('.tmp'):
+                    self._disk_remove(os.path.join(path, entry))
+            try:
+                os.rmdir(path)
+            except OSError:
+                pass
+
+    # ---- public API -------------------------------------------------------
+
+    def get(self, namespace: str, key: Any, default: Any = None) -> Any:
+        """
+        Return the cached value, or `default` on a miss or expired entry.
+
+        Args:
+            namespace: Entry namespace (e.g. model version)
+            key: Hashable key within the namespace
+            default: Returned when nothing valid is cached
+        """
+        value = self._lookup(namespace, key)
+        return default if value is _MISSING else value
+
+    def _lookup(self, namespace: str, key: Any) -> Any:
+        entry_key = (namespace, key)
+        with self._lock:
+            entry = self._entries.get(entry_key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.time():
+                    self._entries.move_to_end(entry_key)
+                    self.hits += 1
+                    return value
+                del self._entries[entry_key]
+                self.expirations += 1
+        if self.disk_dir:
+            entry = self._disk_get(namespace, key)
+            if entry is not _MISSING:
+                with self._lock:
+                    self.hits += 1
+                    self.disk_hits += 1
+                    self._store(entry_key, entry)
+                return entry[1]
+        with self._lock:
+            self.misses += 1
+        return _MISSING
+
+    def _store(self, entry_key: Tuple[str, Any], entry: Tuple[Optional[float], Any]) -> None:
+        """Insert into the memory tier, evicting LRU entries (lock held)."""
+        self._entries[entry_key] = entry
+        self._entries.move_to_end(entry_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def set(self, namespace: str, key: Any, value: Any, ttl: Any = _MISSING,
+            persist: bool = True) -> None:
+        """
+        Store a value.
+
+        Args:
+            namespace: Entry namespace (e.g. model version)
+            key: Hashable key within the namespace
+            value: Value to cache
+            ttl: Time to live in seconds (None never expires; default: the cache's)
+            persist: Also write to the disk tier (if enabled)
+        """
+        ttl = self.ttl_seconds if ttl is _MISSING else ttl
+        expires_at = time.time() + ttl if ttl is not None else None
+        with self._lock:
+            self._store((namespace, key), (expires_at, value))
+        if persist and self.disk_dir:
+            self._disk_set(namespace, key, expires_at, value)
+
+    def get_or_compute(self, namespace: str, key: Any, compute: Callable[[], Any],
+                       ttl: Any = _MISSING, persist: bool = True) -> Any:
+        """
+        Return the cached value, calling `compute` and caching its result on a miss.
+
+        Args:
+            namespace: Entry namespace (e.g. model version)
+            key: Hashable key within the namespace
+            compute: Zero-argument callable producing the value
+            ttl: Time to live in seconds (None never expires; default: the cache's)
+            persist: Also write to the disk tier (if enabled)
+        """
+        value = self._lookup(namespace, key)
+        if value is _MISSING:
+            value = compute()
+            self.set(namespace, key, value, ttl=ttl, persist=persist)
+        return value
+
+    def invalidate(self, namespace: Optional[str] = None, key: Any = _MISSING) -> int:
+        """
+        Drop cached entries.
+
+        Args:
+            namespace: Namespace to drop (None drops everything)
+            key: Only this key within the namespace
+
+        Returns:
+            Number of memory-tier entries removed
+        """
+        with self._lock:
+            if namespace is None:
+                removed = len(self._entries)
+                self._entries.clear()
+            elif key is not _MISSING:
+                removed = 1 if self._entries.pop((namespace, key), None) is not None else 0
+            else:
+                doomed = [k for k in self._entries if k[0] == namespace]
+                for k in doomed:
+                    del self._entries[k]
+                removed = len(doomed)
+        if self.disk_dir:
+            if namespace is None:
+                self._disk_clear()
+            elif key is not _MISSING:
+                self._disk_remove(self._disk_path(namespace, key))
+            else:
+                shutil.rmtree(self._namespace_dir(namespace), ignore_errors=True)
+        return removed
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss metrics and current size."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'disk_hits': self.disk_hits,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'namespaces': len({k[0] for k in self._entries}),
+                'disk_enabled': bool(self.disk_dir),
+            }
+
+
+_cache: Optional[Cache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Cache:
+    """
+    Return the process-wide cache.
+
+    Configured by MEDITALK_CACHE_MAX_ENTRIES (default 1024), MEDITALK_CACHE_TTL
+    (seconds, default 3600, 0 for no expiry) and MEDITALK_CACHE_DIR (enables
+    the disk tier).
+    """
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                ttl = float(os.getenv('MEDITALK_CACHE_TTL', '3600'))
+                _cache = Cache(
+                    max_entries=int(os.getenv('MEDITALK_CACHE_MAX_ENTRIES', '1024')),
+                    ttl_seconds=ttl or None,
+                    disk_dir=os.getenv('MEDITALK_CACHE_DIR') or None,
+                )
+    return _cache
+
+
+def model_namespace(predictor) -> str:
+    """Cache namespace of a DiseasePredictor: its model version."""
+    return str(getattr(predictor, 'model_version', None) or 'unversioned')
 
 
-@lru_cache(maxsize=1)
 def get_cached_symptoms_list(predictor) -> List[str]:
     """
     Cache symptoms list to avoid repeated lookups.
-    
+
     Args:
         predictor: DiseasePredictor instance
-        
+
     Returns:
         List of all symptoms
     """
-    return predictor.get_all_symptoms()
+    return get_cache().get_or_compute(model_namespace(predictor), 'symptoms', predictor.get_all_symptoms)
 
 
-@lru_cache(maxsize=1)
 def get_cached_diseases_list(predictor) -> List[str]:
     """
     Cache diseases list to avoid repeated lookups.
-    
+
     Args:
         predictor: DiseasePredictor instance
-        
+
     Returns:
         List of all diseases
     """
-    return predictor.get_all_diseases()
+    return get_cache().get_or_compute(model_namespace(predictor), 'diseases', predictor.get_all_diseases)
 
 
-@st.cache_data(ttl=3600)
-def cache_symptom_descriptions(_processor, disease: str) -> str:
+def cache_symptom_descriptions(processor, disease: str, namespace: str = 'data') -> str:
     """
     Cache symptom descriptions for faster retrieval.
-    
+
     Args:
-        _processor: DataProcessor instance (prefixed with _ to avoid hashing)
+        processor: DataProcessor instance
         disease: Disease name
-        
+        namespace: Cache namespace (e.g. model version)
+
     Returns:
         Disease description
     """
-    return _processor.get_symptom_description(disease)
+    return get_cache().get_or_compute(
+        namespace, ('description', disease), lambda: processor.get_symptom_description(disease)
+    )
 
 
-@st.cache_data(ttl=3600)
-def cache_precautions(_processor, disease: str) -> List[str]:
+def cache_precautions(processor, disease: str, namespace: str = 'data') -> List[str]:
     """
     Cache precautions for faster retrieval.
-    
+
     Args:
-        _processor: DataProcessor instance (prefixed with _ to avoid hashing)
+        processor: DataProcessor instance
         disease: Disease name
-        
+        namespace: Cache namespace (e.g. model version)
+
     Returns:
         List of precautions
     """
-    return _processor.get_symptom_precautions(disease)
+    return get_cache().get_or_compute(
+        namespace, ('precautions', disease), lambda: processor.get_symptom_precautions(disease)
+    )
+
+
+# Compiled extractors by model version, kept out of the LRU so cache churn
+# never forces a rebuild; the oldest versions go past MAX_PINNED_EXTRACTORS
+MAX_PINNED_EXTRACTORS = 8
+_extractors: "OrderedDict[str, SymptomExtractor]" = OrderedDict()
+# Per-version build locks, so concurrent first calls build only once
+_extractor_builds: Dict[str, threading.Lock] = {}
+_extractors_lock = threading.Lock()
+
+# Handle on the current model version per directory pair, held by
+# load_predictor_cached()
+_pinned_handles: Dict[Tuple[str, str], Any] = {}
+_pinned_lock = threading.Lock()
 
 
-@st.cache_resource
 def load_predictor_cached(model_dir: str = 'models', data_dir: str = 'data'):
     """
     Cache the predictor instance to avoid reloading model on every interaction.
-    
+
+    Holds one registry handle per directory pair on the current model
+    version; when the model file changes, the next call moves the handle to
+    the new version and the old one can be unloaded. Callers that can
+    release their reference should use get_predictor_registry().acquire().
+
     Args:
         model_dir: Model directory path
         data_dir: Data directory path
-        
+
     Returns:
         DiseasePredictor instance
     """
-    from disease_predictor import DiseasePredictor
-    return DiseasePredictor(model_dir, data_dir)
+    from predictor_registry import get_predictor_registry
+    with _pinned_lock:
+        # Cheap while the version is resident (a stat of the model file)
+        handle = get_predictor_registry().acquire(model_dir, data_dir)
+        previous = _pinned_handles.get((model_dir, data_dir))
+        _pinned_handles[(model_dir, data_dir)] = handle
+        if previous is not None:
+            previous.release()
+        return handle.predictor
+
+
+def get_symptom_extractor(model_version: str, known_symptoms: Sequence[str]) -> SymptomExtractor:
+    """
+    Share one compiled SymptomExtractor across all sessions of the process.
+
+    The extractor is immutable and thread-safe, so concurrent sessions can
+    use the same instance instead of building their own copy. It is pinned
+    outside the cache's LRU, and concurrent first calls for one version
+    wait for a single build.
+
+    Args:
+        model_version: DiseasePredictor.model_version (cache namespace)
+        known_symptoms: Symptom vocabulary
+
+    Returns:
+        SymptomExtractor instance
+    """
+    with _extractors_lock:
+        extractor = _extractors.get(model_version)
+        if extractor is not None:
+            _extractors.move_to_end(model_version)
+            return extractor
+        build_lock = _extractor_builds.setdefault(model_version, threading.Lock())
+    with build_lock:
+        with _extractors_lock:
+            extractor = _extractors.get(model_version)
+        if extractor is None:
+            extractor = SymptomExtractor(map(str, known_symptoms or []))
+            with _extractors_lock:
+                _extractors[model_version] = extractor
+                while len(_extractors) > MAX_PINNED_EXTRACTORS:
+                    _extractors.popitem(last=False)
+                _extractor_builds.pop(model_version, None)
+        return extractor
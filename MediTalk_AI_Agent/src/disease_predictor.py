@@ -7,10 +7,22 @@ import os
 import joblib
 import numpy as np
 from data_processor import DataProcessor
+from tree_explainer import ForestExplainer
 
 class DiseasePredictor:
-    def __init__(self, model_dir='models', data_dir='data', model_filename: str | None = None):
-        """Initialize the disease predictor."""
+    def __init__(self, model_dir='models', data_dir='data', model_filename: str | None = None,
+                 shared: 'DiseasePredictor | None' = None):
+        """
+        Initialize the disease predictor.
+        
+        Args:
+            model_dir: Model directory path
+            data_dir: Data directory path
+            model_filename: Model file inside model_dir (default: disease_model.pkl)
+            shared: Loaded predictor for the same model_dir and data_dir whose
+                label encoder, symptom index and disease data are reused
+                instead of loaded again
+        """
         self.model_dir = model_dir
         self.data_dir = data_dir
         self.model_filename = model_filename or 'disease_model.pkl'
@@ -18,13 +30,19 @@ class DiseasePredictor:
         self.label_encoder = None
         self.symptoms_list = None
         self.diseases_list = None
-        self.processor = DataProcessor(data_dir)
+        self.model_version = None
+        self.symptom_index = {}
+        self._explainer = None
+        if shared is not None and (shared.model_dir, shared.data_dir) != (model_dir, data_dir):
+            shared = None
+        self.processor = shared.processor if shared is not None else DataProcessor(data_dir)
         
-        self.load_model()
-        self.processor.load_data()
+        self.load_model(shared)
+        if shared is None:
+            self.processor.load_data()
     
-    def load_model(self):
-        """Load trained model and components."""
+    def load_model(self, shared: 'DiseasePredictor | None' = None):
+        """Load trained model and components (reusing those of `shared`)."""
         try:
             model_path = os.path.join(self.model_dir, self.model_filename)
             if not os.path.exists(model_path):
@@ -36,9 +54,18 @@ class DiseasePredictor:
                         self.model_filename = candidate
                         break
             self.model = joblib.load(model_path)
-            self.label_encoder = joblib.load(os.path.join(self.model_dir, 'label_encoder.pkl'))
-            self.symptoms_list = joblib.load(os.path.join(self.model_dir, 'symptoms_list.pkl'))
-            self.diseases_list = joblib.load(os.path.join(self.model_dir, 'diseases_list.pkl'))
+            if shared is not None:
+                # Every model in a directory is trained on the same encoder and symptoms
+                self.label_encoder = shared.label_encoder
+                self.symptoms_list = shared.symptoms_list
+                self.diseases_list = shared.diseases_list
+                self.symptom_index = shared.symptom_index
+            else:
+                self.label_encoder = joblib.load(os.path.join(self.model_dir, 'label_encoder.pkl'))
+                self.symptoms_list = joblib.load(os.path.join(self.model_dir, 'symptoms_list.pkl'))
+                self.diseases_list = joblib.load(os.path.join(self.model_dir, 'diseases_list.pkl'))
+                # Symptom -> feature column, so vectors are built with O(1) lookups
+                self.symptom_index = {s: i for i, s in enumerate(self.symptoms_list)}
 
             # Sanity check: ensure model is compatible with symptom vector length
             try:
@@ -59,39 +86,143 @@ class DiseasePredictor:
                 else:
                     raise compat_err
 
+            self.model_version = self._compute_model_version()
             print(f"Model loaded successfully! ({os.path.basename(self.model_filename)})")
         except FileNotFoundError as e:
             print(f"Error loading model: {e}")
             print("Please train the model first using model_trainer.py")
             raise
     
-    def predict_disease(self, symptoms):
+    def _compute_model_version(self) -> str:
+        """
+        Build a cheap version key for the loaded model artifacts.
+
+        The key changes whenever the model file is replaced (retrain/switch),
+        so caches keyed by it are invalidated automatically.
+        """
+        model_path = os.path.join(self.model_dir, self.model_filename)
+        try:
+            stat = os.stat(model_path)
+            return f"{self.model_filename}:{stat.st_size}:{stat.st_mtime_ns}"
+        except OSError:
+            return self.model_filename
+
+    def predict_disease(self, symptoms, explain=False):
         """
         Predict disease based on input symptoms.
         
         Args:
             symptoms (list): List of symptom strings
+            explain (bool): Add per-symptom contributions (see predict_from_indices_batch)
             
         Returns:
             dict: Prediction results with disease, confidence, and recommendations
         """
-        # Clean and normalize symptoms
-        symptoms_clean = [s.strip().lower().replace(' ', '_') for s in symptoms]
-        
-        # Create feature vector
-        feature_vector = [0] * len(self.symptoms_list)
-        
-        for symptom in symptoms_clean:
-            if symptom in self.symptoms_list:
-                idx = self.symptoms_list.index(symptom)
-                feature_vector[idx] = 1
+        return self.predict_disease_batch([symptoms], explain=explain)[0]
+
+    def predict_disease_batch(self, symptoms_batch, explain=False):
+        """
+        Predict diseases for several symptom lists with a single model call.
         
-        feature_vector = np.array(feature_vector).reshape(1, -1)
+        Args:
+            symptoms_batch (list): List of symptom lists
+            explain (bool): Add per-symptom contributions (see predict_from_indices_batch)
+            
+        Returns:
+            list: One prediction result dict per input, in order
+        """
+        if not symptoms_batch:
+            return []
+
+        # Clean and normalize symptoms
+        cleaned = [[s.strip().lower().replace(' ', '_') for s in symptoms] for symptoms in symptoms_batch]
+        index_rows = [
+            [self.symptom_index[s] for s in symptoms_clean if s in self.symptom_index]
+            for symptoms_clean in cleaned
+        ]
+        return self.predict_from_indices_batch(index_rows, cleaned, explain=explain)
+
+    def predict_from_indices_batch(self, index_rows, symptoms_batch, explain=False):
+        """
+        Predict diseases from pre-resolved feature column indices.
         
-        # Get predictions
-        prediction = self.model.predict(feature_vector)[0]
-        probabilities = self.model.predict_proba(feature_vector)[0]
+        Used with InputValidator.normalize_symptoms, which already maps
+        symptoms to columns, so no symptom is normalized or looked up twice.
         
+        Args:
+            index_rows (list): Per input, the feature columns to set
+            symptoms_batch (list): Per input, the normalized symptoms
+                (reported back as input_symptoms)
+            explain (bool): Add an 'explanation' to every result: for each
+                reported disease, the baseline probability and how much each
+                given symptom (and all absent symptoms together) added to it
+            
+        Returns:
+            list: One prediction result dict per input, in order
+        """
+        if not index_rows:
+            return []
+
+        # Create feature matrix
+        feature_matrix = np.zeros((len(index_rows), len(self.symptoms_list)), dtype=np.int64)
+        for row, indices in enumerate(index_rows):
+            feature_matrix[row, indices] = 1
+
+        # Get predictions (argmax of predict_proba is the predicted class);
+        # the explainer yields the same probabilities from its tree walk
+        if explain:
+            probabilities, contributions = self.get_explainer().explain(feature_matrix)
+        else:
+            probabilities = self.model.predict_proba(feature_matrix)
+
+        results = []
+        for row, symptoms_clean in enumerate(symptoms_batch):
+            result, class_indices = self._build_result(probabilities[row], list(symptoms_clean))
+            if explain:
+                result['explanation'] = self._build_explanation(
+                    probabilities[row], contributions[row], index_rows[row], class_indices
+                )
+            results.append(result)
+        return results
+
+    def get_explainer(self):
+        """
+        Return the tree-path explainer of the loaded model (built on first use).
+
+        Raises:
+            ValueError: If the model is not a tree ensemble
+        """
+        if self._explainer is None:
+            self._explainer = ForestExplainer(self.model)
+        return self._explainer
+
+    def _build_explanation(self, probabilities, contributions, indices, class_indices):
+        """Per reported disease, the baseline and the contribution of each given symptom."""
+        baseline = self.get_explainer().baseline
+        columns = list(dict.fromkeys(indices))
+        explanation = []
+        for idx in class_indices:
+            given = contributions[columns, idx]
+            order = np.argsort(given)[::-1]
+            explanation.append({
+                'disease': self.label_encoder.classes_[idx],
+                'probability': float(probabilities[idx]),
+                'baseline': float(baseline[idx]),
+                'contributions': [
+                    {'symptom': self.symptoms_list[columns[i]], 'contribution': float(given[i])}
+                    for i in order
+                ],
+                'absent_symptoms': float(contributions[:, idx].sum() - given.sum()),
+            })
+        return explanation
+
+    def _build_result(self, probabilities, symptoms_clean):
+        """
+        Turn one row of class probabilities into a prediction result dict.
+
+        Returns:
+            tuple: (result dict, class indices of the reported diseases)
+        """
         # Get top 5 predictions initially to filter better
         top_indices = np.argsort(probabilities)[::-1][:5]
         
@@ -126,10 +257,10 @@ class DiseasePredictor:
             'description': description,
             'precautions': precautions,
             'input_symptoms': symptoms_clean,
-            'recognized_symptoms': [s for s in symptoms_clean if s in self.symptoms_list]
+            'recognized_symptoms': [s for s in symptoms_clean if s in self.symptom_index]
         }
         
-        return result
+        return result, filtered_indices
     
     def get_all_symptoms(self):
         """Return list of all available symptoms."""
@@ -152,7 +283,7 @@ class DiseasePredictor:
         invalid_symptoms = []
         
         for symptom in symptoms_clean:
-            if symptom in self.symptoms_list:
+            if symptom in self.symptom_index:
                 valid_symptoms.append(symptom)
             else:
                 invalid_symptoms.append(symptom)
@@ -163,6 +294,47 @@ class DiseasePredictor:
             'all_valid': len(invalid_symptoms) == 0
         }
 
+    def validate_and_predict(self, symptoms):
+        """
+        Validate symptoms and predict disease in a single pass.
+        
+        Symptoms are normalized and resolved to feature columns once; the
+        model is then called once with the valid ones. Equivalent to
+        validate_symptoms() followed by predict_disease(valid_symptoms).
+        
+        Args:
+            symptoms (list): List of symptom strings
+            
+        Returns:
+            dict: {'validation': validation results (as validate_symptoms),
+                   'result': prediction results, or None if no symptom is valid}
+        """
+        symptoms_clean = [s.strip().lower().replace(' ', '_') for s in symptoms]
+        
+        valid_symptoms = []
+        invalid_symptoms = []
+        indices = []
+        
+        for symptom in symptoms_clean:
+            idx = self.symptom_index.get(symptom)
+            if idx is None:
+                invalid_symptoms.append(symptom)
+            else:
+                valid_symptoms.append(symptom)
+                indices.append(idx)
+        
+        validation = {
+            'valid_symptoms': valid_symptoms,
+            'invalid_symptoms': invalid_symptoms,
+            'all_valid': len(invalid_symptoms) == 0
+        }
+        
+        result = None
+        if valid_symptoms:
+            result = self.predict_from_indices_batch([indices], [valid_symptoms])[0]
+        
+        return {'validation': validation, 'result': result}
+
 if __name__ == "__main__":
     # Example usage
     predictor = DiseasePredictor('models', 'data')
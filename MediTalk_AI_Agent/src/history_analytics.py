@@ -0,0 +1,281 @@
+"""
+Consultation analytics for MediTalk AI
+Hourly disease counts, symptom co-occurrence and confidence distribution,
+kept as rollup tables next to the history store and updated incrementally
+"""
+
+import logging
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+
+from history_store import SQLiteHistoryStore, get_history_store
+
+logger = logging.getLogger(__name__)
+
+# Confidence histogram resolution (bins of 0.05)
+CONFIDENCE_BINS = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analytics_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS analytics_disease_hourly (
+    hour TEXT NOT NULL,
+    primary_disease TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (hour, primary_disease)
+);
+CREATE TABLE IF NOT EXISTS analytics_symptom_pairs (
+    symptom_a TEXT NOT NULL,
+    symptom_b TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (symptom_a, symptom_b)
+);
+CREATE TABLE IF NOT EXISTS analytics_confidence (
+    bin INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+"""
+
+# Each statement folds the consultations with id in (?, ?] into a rollup
+_FOLD_STATEMENTS = (
+    # Timestamps are ISO 8601, so the first 13 characters are the hour
+    "INSERT INTO analytics_disease_hourly (hour, primary_disease, count, confidence_sum) "
+    "SELECT substr(timestamp, 1, 13), primary_disease, COUNT(*), SUM(confidence) "
+    "FROM consultations WHERE id > ? AND id <= ? GROUP BY 1, 2 "
+    "ON CONFLICT (hour, primary_disease) DO UPDATE SET "
+    "count = count + excluded.count, confidence_sum = confidence_sum + excluded.confidence_sum",
+
+    "INSERT INTO analytics_symptom_pairs (symptom_a, symptom_b, count) "
+    "SELECT a.value, b.value, COUNT(*) "
+    "FROM consultations c, json_each(c.symptoms) a, json_each(c.symptoms) b "
+    "WHERE c.id > ? AND c.id <= ? AND a.value < b.value GROUP BY 1, 2 "
+    "ON CONFLICT (symptom_a, symptom_b) DO UPDATE SET count = count + excluded.count",
+
+    f"INSERT INTO analytics_confidence (bin, count) "
+    f"SELECT MAX(0, MIN(CAST(confidence * {CONFIDENCE_BINS} AS INTEGER), {CONFIDENCE_BINS - 1})), COUNT(*) "
+    f"FROM consultations WHERE id > ? AND id <= ? GROUP BY 1 "
+    f"ON CONFLICT (bin) DO UPDATE SET count = count + excluded.count",
+)
+
+
+class HistoryAnalytics:
+    """
+    Aggregate queries over the consultation store.
+
+    Rollups count consultations as they were recorded: every query first
+    folds in the consultations added since the last one (tracked by the
+    highest folded id), so the work per query is proportional to the new
+    rows, and reads only touch the small rollup tables. Consultations later
+    removed by retention or clearing stay counted until rebuild().
+
+    Every fold reads and advances the folded id in one write transaction,
+    so several processes sharing the database never count a row twice.
+    """
+
+    def __init__(self, store: SQLiteHistoryStore, chunk_size: int = 50000):
+        """
+        Args:
+            store: History store whose database holds the rollups
+            chunk_size: Consultations folded per transaction, so a first
+                refresh over a large history does not block writers for long
+
+        Raises:
+            ValueError: If the store is in-memory (rollups need a shared file)
+        """
+        if store.db_path == ':memory:':
+            raise ValueError("Analytics need a file-backed history store")
+        self.store = store
+        self.chunk_size = chunk_size
+        # Own connection: WAL readers do not wait for the store's writes.
+        # Transactions are explicit (see _transaction)
+        self._conn = sqlite3.connect(store.db_path, check_same_thread=False, isolation_level=None)
+        self._conn.executescript(_SCHEMA)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[None]:
+        """
+        Run a block in a write transaction (lock held).
+
+        BEGIN IMMEDIATE takes the database write lock up front, so the
+        folded id read inside the block cannot be advanced by another
+        process before the block commits.
+        """
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            self._conn.rollback()
+            raise
+        self._conn.commit()
+
+    def _last_id(self) -> int:
+        row = self._conn.execute("SELECT value FROM analytics_state WHERE key = 'last_id'").fetchone()
+        return row[0] if row else 0
+
+    def refresh(self) -> int:
+        """
+        Fold consultations recorded since the last refresh into the rollups.
+
+        Returns:
+            Number of consultations folded
+        """
+        self.store.flush()
+        folded = 0
+        with self._lock:
+            while True:
+                with self._transaction():
+                    last_id = self._last_id()
+                    upper, count = self._conn.execute(
+                        "SELECT MAX(id), COUNT(*) FROM "
+                        "(SELECT id FROM consultations WHERE id > ? ORDER BY id LIMIT ?)",
+                        (last_id, self.chunk_size),
+                    ).fetchone()
+                    if count:
+                        for statement in _FOLD_STATEMENTS:
+                            self._conn.execute(statement, (last_id, upper))
+                        self._conn.execute(
+                            "INSERT INTO analytics_state (key, value) VALUES ('last_id', ?) "
+                            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+                            (upper,),
+                        )
+                if not count:
+                    break
+                folded += count
+        if folded:
+            logger.info(f"Analytics rollups updated with {folded} consultation(s)")
+        return folded
+
+    def rebuild(self) -> int:
+        """Recompute the rollups from the consultations currently stored."""
+        with self._lock:
+            with self._transaction():
+                for table in ('analytics_state', 'analytics_disease_hourly',
+                              'analytics_symptom_pairs', 'analytics_confidence'):
+                    self._conn.execute(f"DELETE FROM {table}")
+        return self.refresh()
+
+    def overview(self) -> Dict[str, Any]:
+        """Return total consultations, distinct diseases and the covered hours."""
+        self.refresh()
+        with self._lock:
+            total, diseases, first, last = self._conn.execute(
+                "SELECT SUM(count), COUNT(DISTINCT primary_disease), MIN(hour), MAX(hour) "
+                "FROM analytics_disease_hourly"
+            ).fetchone()
+        return {
+            'total_consultations': total or 0,
+            'unique_diseases': diseases,
+            'first_hour': first,
+            'last_hour': last,
+        }
+
+    def disease_trends(self, bucket: str = 'hour', since: Optional[str] = None,
+                       until: Optional[str] = None, disease: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return cases per disease per time bucket, oldest first.
+
+        Args:
+            bucket: 'hour' ("2025-01-01T10") or 'day' ("2025-01-01")
+            since: Earliest ISO timestamp to include (hour resolution)
+            until: Latest ISO timestamp to include (hour resolution); a
+                bare date ("2025-01-01") includes that whole day
+            disease: Restrict to one primary disease
+
+        Raises:
+            ValueError: If the bucket is not 'hour' or 'day'
+        """
+        if bucket not in ('hour', 'day'):
+            raise ValueError("bucket must be 'hour' or 'day'")
+        period = 'hour' if bucket == 'hour' else 'substr(hour, 1, 10)'
+        clauses, params = [], []
+        if since:
+            clauses.append("hour >= ?")
+            params.append(since[:13])
+        if until:
+            clauses.append("hour <= ?")
+            # "2025-01-01" sorts before "2025-01-01T00", so extend it to the last hour
+            params.append(until[:13] if len(until) > 10 else until[:10] + 'T23')
+        if disease:
+            clauses.append("primary_disease = ?")
+            params.append(disease)
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+
+        self.refresh()
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {period}, primary_disease, SUM(count), SUM(confidence_sum) "
+                f"FROM analytics_disease_hourly{where} GROUP BY 1, 2 ORDER BY 1, 3 DESC",
+                params,
+            ).fetchall()
+        return [
+            {'period': p, 'disease': d, 'count': count, 'average_confidence': conf_sum / count}
+            for p, d, count, conf_sum in rows
+        ]
+
+    def symptom_pairs(self, limit: int = 20, symptom: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return the most frequent symptom pairs.
+
+        Args:
+            limit: Number of pairs
+            symptom: Only pairs that include this symptom
+
+        Returns:
+            List of {'symptoms': [a, b], 'count', 'share'} where share is the
+            fraction of all consultations that reported both
+        """
+        where, params = "", []
+        if symptom:
+            where = " WHERE symptom_a = ? OR symptom_b = ?"
+            params = [symptom, symptom]
+
+        self.refresh()
+        with self._lock:
+            total = self._conn.execute("SELECT SUM(count) FROM analytics_confidence").fetchone()[0] or 0
+            rows = self._conn.execute(
+                f"SELECT symptom_a, symptom_b, count FROM analytics_symptom_pairs{where} "
+                f"ORDER BY count DESC, symptom_a, symptom_b LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return [
+            {'symptoms': [a, b], 'count': count, 'share': count / total if total else 0.0}
+            for a, b, count in rows
+        ]
+
+    def confidence_histogram(self) -> Dict[str, Any]:
+        """Return the prediction confidence distribution in bins of 1 / CONFIDENCE_BINS."""
+        self.refresh()
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT bin, count FROM analytics_confidence"))
+        width = 1.0 / CONFIDENCE_BINS
+        return {
+            'bins': [
+                {'lower': round(i * width, 4), 'upper': round((i + 1) * width, 4), 'count': counts.get(i, 0)}
+                for i in range(CONFIDENCE_BINS)
+            ],
+            'total': sum(counts.values()),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+_analytics: Optional[HistoryAnalytics] = None
+_analytics_lock = threading.Lock()
+
+
+def get_history_analytics() -> HistoryAnalytics:
+    """Return the process-wide analytics over get_history_store()."""
+    global _analytics
+    if _analytics is None:
+        with _analytics_lock:
+            if _analytics is None:
+                _analytics = HistoryAnalytics(get_history_store())
+    return _analytics
@@ -0,0 +1,116 @@
+"""
+Streaming consultation history export for MediTalk AI
+Serializes consultations one record at a time as JSON Lines, CSV or compact
+JSON, so exports of any size are written with flat memory use
+"""
+
+import csv
+import io
+import json
+from typing import Any, BinaryIO, Dict, Iterable, Iterator
+
+# Format name -> (MIME type, file extension)
+EXPORT_FORMATS = {
+    'ndjson': ('application/x-ndjson', 'jsonl'),
+    'csv': ('text/csv', 'csv'),
+    'json': ('application/json', 'json'),
+}
+
+CSV_COLUMNS = ['timestamp', 'primary_disease', 'confidence', 'symptoms', 'alternatives']
+
+# Encoded output is yielded in chunks of about this size
+CHUNK_BYTES = 64 * 1024
+
+
+def _public(record: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop the internal store fields from a consultation."""
+    return {k: v for k, v in record.items() if k not in ('id', 'session_id')}
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yield one compact JSON document per line."""
+    for record in records:
+        yield json.dumps(_public(record), separators=(',', ':')) + '\n'
+
+
+def iter_json(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """Yield a compact JSON array, one element at a time."""
+    yield '['
+    separator = ''
+    for record in records:
+        yield separator + json.dumps(_public(record), separators=(',', ':'))
+        separator = ','
+    yield ']\n'
+
+
+def iter_csv(records: Iterable[Dict[str, Any]]) -> Iterator[str]:
+    """
+    Yield CSV rows with a header.
+
+    Symptoms are joined with ';' and alternatives written as
+    'disease:probability' pairs joined with ';'.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for record in records:
+        writer.writerow([
+            record['timestamp'],
+            record['primary_disease'],
+            record['confidence'],
+            ';'.join(record['symptoms']),
+            ';'.join(f"{disease}:{probability}" for disease, probability in record['alternatives']),
+        ])
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+
+_SERIALIZERS = {
+    'ndjson': iter_ndjson,
+    'csv': iter_csv,
+    'json': iter_json,
+}
+
+
+def iter_export(records: Iterable[Dict[str, Any]], fmt: str = 'ndjson',
+                chunk_bytes: int = CHUNK_BYTES) -> Iterator[bytes]:
+    """
+    Yield the UTF-8 encoded export in chunks of roughly `chunk_bytes`.
+
+    Args:
+        records: Consultations, e.g. SQLiteHistoryStore.iter_records()
+        fmt: One of EXPORT_FORMATS
+        chunk_bytes: Target chunk size
+
+    Raises:
+        ValueError: If the format is not supported
+    """
+    if fmt not in _SERIALIZERS:
+        raise ValueError(f"Unsupported export format '{fmt}' (expected one of: {', '.join(EXPORT_FORMATS)})")
+
+    pending = []
+    size = 0
+    for piece in _SERIALIZERS[fmt](records):
+        pending.append(piece)
+        size += len(piece)
+        if size >= chunk_bytes:
+            yield ''.join(pending).encode('utf-8')
+            pending.clear()
+            size = 0
+    if pending:
+        yield ''.join(pending).encode('utf-8')
+
+
+def write_export(records: Iterable[Dict[str, Any]], fp: BinaryIO, fmt: str = 'ndjson') -> int:
+    """
+    Write the export to a binary file object.
+
+    Returns:
+        Number of bytes written
+    """
+    written = 0
+    for chunk in iter_export(records, fmt):
+        fp.write(chunk)
+        written += len(chunk)
+    return written
@@ -0,0 +1,428 @@
+"""
+Persistent consultation store for MediTalk AI
+SQLite (WAL mode) backend for MedicalHistory with indexed, paginated
+queries, batched writes and running per-disease aggregates
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections import Counter, OrderedDict, defaultdict
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DB_PATH = os.path.normpath(
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'history', 'consultations.db')
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS consultations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    primary_disease TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    symptoms TEXT NOT NULL,
+    alternatives TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_consultations_timestamp ON consultations (timestamp);
+CREATE INDEX IF NOT EXISTS idx_consultations_disease ON consultations (primary_disease);
+CREATE INDEX IF NOT EXISTS idx_consultations_session ON consultations (session_id, id);
+CREATE TABLE IF NOT EXISTS disease_stats (
+    session_id TEXT NOT NULL,
+    primary_disease TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    confidence_sum REAL NOT NULL,
+    PRIMARY KEY (session_id, primary_disease)
+);
+"""
+
+_UPSERT_STATS = (
+    "INSERT INTO disease_stats (session_id, primary_disease, count, confidence_sum) "
+    "VALUES (?, ?, ?, ?) "
+    "ON CONFLICT (session_id, primary_disease) DO UPDATE SET "
+    "count = count + excluded.count, confidence_sum = confidence_sum + excluded.confidence_sum"
+)
+
+_COLUMNS = "id, session_id, timestamp, primary_disease, confidence, symptoms, alternatives"
+
+
+def _row_to_record(row: Tuple) -> Dict[str, Any]:
+    return {
+        'id': row[0],
+        'session_id': row[1],
+        'timestamp': row[2],
+        'primary_disease': row[3],
+        'confidence': row[4],
+        'symptoms': json.loads(row[5]),
+        'alternatives': json.loads(row[6]),
+    }
+
+
+class RunningStats:
+    """Per-disease counts and confidence sum, updated in O(1) per change."""
+
+    __slots__ = ('counts', 'confidence_sum', 'total')
+
+    def __init__(self):
+        self.counts: Counter = Counter()
+        self.confidence_sum = 0.0
+        self.total = 0
+
+    def apply(self, disease: str, count: int, confidence: float) -> None:
+        """Add (or with negative values, remove) consultations of `disease`."""
+        self.counts[disease] += count
+        if self.counts[disease] <= 0:
+            del self.counts[disease]
+        self.confidence_sum += confidence
+        self.total += count
+
+    def summary(self) -> Dict[str, Any]:
+        """Summary in the MedicalHistory.get_history_summary() format."""
+        # most_common(1) is linear in the number of distinct diseases, which
+        # is bounded by the model's label set, not by the history size
+        top = self.counts.most_common(1)
+        return {
+            'total_consultations': self.total,
+            'most_common_disease': top[0][0] if top else None,
+            'most_common_count': top[0][1] if top else 0,
+            'average_confidence': self.confidence_sum / self.total if self.total else 0,
+            'unique_diseases': len(self.counts),
+        }
+
+
+class SQLiteHistoryStore:
+    """Consultation records in SQLite, written in batches."""
+
+    def __init__(self, db_path: str = DEFAULT_DB_PATH, batch_size: int = 32,
+                 flush_interval: float = 1.0, max_per_session: Optional[int] = None,
+                 max_cached_sessions: int = 1024):
+        """
+        Open (and create if needed) the consultation database.
+
+        Args:
+            db_path: SQLite file path (":memory:" for a throwaway store)
+            batch_size: Pending writes that trigger an immediate flush
+            flush_interval: Seconds after which pending writes are flushed
+            max_per_session: Keep only this many newest consultations per
+                session (None keeps everything)
+            max_cached_sessions: Sessions whose running aggregates stay in
+                memory; the least recently used are reloaded on demand
+        """
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_per_session = max_per_session
+        self.max_cached_sessions = max_cached_sessions
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._rebuild_stats_if_missing()
+        self._lock = threading.RLock()
+        self._pending: List[Tuple] = []
+        # (session_id, disease) -> [count, confidence_sum] not yet persisted
+        self._pending_stats: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0])
+        # session_id -> running aggregates (including pending writes),
+        # loaded on first use, least recently used first
+        self._stats: "OrderedDict[str, RunningStats]" = OrderedDict()
+        self._timer: Optional[threading.Timer] = None
+        atexit.register(self.flush)
+
+    def _rebuild_stats_if_missing(self) -> None:
+        """Derive the aggregates table once for databases created before it existed."""
+        has_stats = self._conn.execute("SELECT 1 FROM disease_stats LIMIT 1").fetchone()
+        has_rows = self._conn.execute("SELECT 1 FROM consultations LIMIT 1").fetchone()
+        if has_rows and not has_stats:
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO disease_stats (session_id, primary_disease, count, confidence_sum) "
+                    "SELECT session_id, primary_disease, COUNT(*), SUM(confidence) "
+                    "FROM consultations GROUP BY session_id, primary_disease"
+                )
+
+    def _session_stats(self, session_id: str) -> RunningStats:
+        """Return the running aggregates of a session (lock held)."""
+        stats = self._stats.get(session_id)
+        if stats is not None:
+            self._stats.move_to_end(session_id)
+            return stats
+        stats = RunningStats()
+        rows = self._conn.execute(
+            "SELECT primary_disease, count, confidence_sum FROM disease_stats WHERE session_id = ?",
+            (session_id,),
+        )
+        for disease, count, confidence_sum in rows:
+            stats.apply(disease, count, confidence_sum)
+        # Writes not persisted yet (at most one batch)
+        for (sid, disease), (count, confidence_sum) in self._pending_stats.items():
+            if sid == session_id:
+                stats.apply(disease, int(count), confidence_sum)
+        self._stats[session_id] = stats
+        while len(self._stats) > self.max_cached_sessions:
+            self._stats.popitem(last=False)
+        return stats
+
+    def _track(self, session_id: str, disease: str, count: int, confidence: float) -> None:
+        """Apply a change to the in-memory aggregates and queue it for persistence (lock held)."""
+        self._session_stats(session_id).apply(disease, count, confidence)
+        delta = self._pending_stats[(session_id, disease)]
+        delta[0] += count
+        delta[1] += confidence
+
+    # ---- writes -------------------------------------------------------
+
+    def add(self, session_id: str, record: Dict[str, Any]) -> None:
+        """
+        Queue one consultation for writing.
+
+        Args:
+            session_id: Owner of the record (e.g. a browser session)
+            record: Dict with timestamp, symptoms, primary_disease,
+                confidence and alternatives
+        """
+        row = (
+            session_id,
+            record['timestamp'],
+            record['primary_disease'],
+            float(record['confidence']),
+            json.dumps(list(record['symptoms'])),
+            json.dumps([list(pair) for pair in record['alternatives']]),
+        )
+        with self._lock:
+            self._pending.append(row)
+            self._track(session_id, row[2], 1, row[3])
+            if len(self._pending) >= self.batch_size:
+                self._flush_locked()
+            elif self._timer is None:
+                self._timer = threading.Timer(self.flush_interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self) -> None:
+        """Write all pending consultations in one transaction."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self) -> None:
+        """
+        Write the pending batch in one transaction (lock held).
+
+        The batch stays queued until the transaction commits, so a failed
+        write is retried by the next flush instead of being lost, and the
+        running aggregates keep matching stored plus pending consultations.
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return
+        rows = self._pending
+        deltas = {key: list(delta) for key, delta in self._pending_stats.items()}
+        evicted: List[Tuple[str, str, float]] = []
+        try:
+            with self._conn:
+                self._conn.executemany(
+                    "INSERT INTO consultations "
+                    "(session_id, timestamp, primary_disease, confidence, symptoms, alternatives) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+                if self.max_per_session is not None:
+                    for session_id in {row[0] for row in rows}:
+                        for disease, confidence in self._evict_locked(session_id):
+                            evicted.append((session_id, disease, confidence))
+                            delta = deltas.setdefault((session_id, disease), [0, 0.0])
+                            delta[0] -= 1
+                            delta[1] -= confidence
+                self._conn.executemany(_UPSERT_STATS, [
+                    (sid, disease, int(d[0]), d[1]) for (sid, disease), d in deltas.items() if d[0] or d[1]
+                ])
+                self._conn.execute("DELETE FROM disease_stats WHERE count <= 0")
+        except Exception as e:
+            logger.error(f"History flush failed; {len(rows)} consultation(s) kept for retry: {e}")
+            raise
+        self._pending = []
+        self._pending_stats.clear()
+        for session_id, disease, confidence in evicted:
+            stats = self._stats.get(session_id)
+            if stats is not None:
+                stats.apply(disease, -1, -confidence)
+
+    def _evict_locked(self, session_id: str) -> List[Tuple[str, float]]:
+        """
+        Delete a session's oldest consultations beyond the cap (lock and transaction held).
+
+        Returns:
+            (disease, confidence) of each deleted consultation, for the caller
+            to apply to the aggregates once the transaction commits
+        """
+        excess = self._session_stats(session_id).total - self.max_per_session
+        if excess <= 0:
+            return []
+        evicted = self._conn.execute(
+            "SELECT id, primary_disease, confidence FROM consultations "
+            "WHERE session_id = ? ORDER BY id LIMIT ?",
+            (session_id, excess),
+        ).fetchall()
+        self._conn.execute(
+            "DELETE FROM consultations WHERE session_id = ? AND id <= ?",
+            (session_id, evicted[-1][0]),
+        )
+        return [(disease, confidence) for _, disease, confidence in evicted]
+
+    def clear(self, session_id: Optional[str] = None) -> None:
+        """Delete the consultations of one session, or all of them."""
+        with self._lock:
+            self._flush_locked()
+            with self._conn:
+                if session_id is None:
+                    self._conn.execute("DELETE FROM consultations")
+                    self._conn.execute("DELETE FROM disease_stats")
+                    self._stats.clear()
+                else:
+                    self._conn.execute("DELETE FROM consultations WHERE session_id = ?", (session_id,))
+                    self._conn.execute("DELETE FROM disease_stats WHERE session_id = ?", (session_id,))
+                    self._stats.pop(session_id, None)
+
+    # ---- reads (pending writes are flushed first) ---------------------
+
+    def _where(self, session_id: Optional[str], disease: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses, params = [], []
+        if session_id is not None:
+            clauses.append("session_id = ?")
+            params.append(session_id)
+        if disease is not None:
+            clauses.append("primary_disease = ?")
+            params.append(disease)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, session_id: Optional[str] = None, limit: int = 20,
+              before_id: Optional[int] = None, disease: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return one page of consultations, newest first.
+
+        Pages are addressed by keyset (`before_id` = id of the last record of
+        the previous page), so every page costs one index range scan however
+        deep it is.
+
+        Args:
+            session_id: Restrict to one session (None for all)
+            limit: Page size
+            before_id: Only records with a smaller id
+            disease: Restrict to one primary disease
+        """
+        where, params = self._where(session_id, disease)
+        if before_id is not None:
+            where += (" AND " if where else " WHERE ") + "id < ?"
+            params.append(before_id)
+        with self._lock:
+            self._flush_locked()
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM consultations{where} ORDER BY id DESC LIMIT ?",
+                params + [limit],
+            ).fetchall()
+        return [_row_to_record(row) for row in rows]
+
+    def count(self, session_id: Optional[str] = None, disease: Optional[str] = None) -> int:
+        """
+        Return the number of stored consultations.
+
+        Pending writes are flushed first, so retention eviction is applied
+        and the count matches what query() pages through. A whole session's
+        count is then its running total (O(1)); other counts use the indexes.
+        """
+        if session_id is not None and disease is None:
+            with self._lock:
+                self._flush_locked()
+                return self._session_stats(session_id).total
+        where, params = self._where(session_id, disease)
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(f"SELECT COUNT(*) FROM consultations{where}", params).fetchone()[0]
+
+    def iter_records(self, session_id: Optional[str] = None,
+                     chunk_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """Yield all consultations oldest first, reading in chunks."""
+        where, params = self._where(session_id, None)
+        last_id = 0
+        while True:
+            with self._lock:
+                self._flush_locked()
+                rows = self._conn.execute(
+                    f"SELECT {_COLUMNS} FROM consultations{where}"
+                    f"{' AND' if where else ' WHERE'} id > ? ORDER BY id LIMIT ?",
+                    params + [last_id, chunk_size],
+                ).fetchall()
+            if not rows:
+                return
+            for row in rows:
+                yield _row_to_record(row)
+            last_id = rows[-1][0]
+
+    def summary(self, session_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Return total, average confidence and disease counts.
+
+        A session's summary is read from its running aggregates without
+        touching the consultations; the all-sessions summary sums the
+        per-session aggregates table.
+        """
+        with self._lock:
+            self._flush_locked()
+            if session_id is not None:
+                return self._session_stats(session_id).summary()
+            stats = RunningStats()
+            rows = self._conn.execute(
+                "SELECT primary_disease, SUM(count), SUM(confidence_sum) "
+                "FROM disease_stats GROUP BY primary_disease"
+            )
+            for disease, count, confidence_sum in rows:
+                stats.apply(disease, count, confidence_sum)
+            return stats.summary()
+
+    def most_common_diseases(self, limit: int = 10) -> List[Tuple[str, int]]:
+        """Return (disease, consultations) of the most often predicted diseases, across sessions."""
+        with self._lock:
+            self._flush_locked()
+            return self._conn.execute(
+                "SELECT primary_disease, SUM(count) FROM disease_stats "
+                "GROUP BY primary_disease ORDER BY 2 DESC, 1 LIMIT ?",
+                (limit,),
+            ).fetchall()
+
+    def close(self) -> None:
+        """Flush pending writes and close the connection."""
+        with self._lock:
+            self._flush_locked()
+            self._conn.close()
+
+
+_store: Optional[SQLiteHistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> SQLiteHistoryStore:
+    """
+    Return the process-wide store.
+
+    Configured by MEDITALK_HISTORY_DB (database path) and
+    MEDITALK_HISTORY_MAX_PER_SESSION (retention cap, unset for unlimited).
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                max_per_session = os.getenv('MEDITALK_HISTORY_MAX_PER_SESSION')
+                _store = SQLiteHistoryStore(
+                    os.getenv('MEDITALK_HISTORY_DB', DEFAULT_DB_PATH),
+                    max_per_session=int(max_per_session) if max_per_session else None,
+                )
+                logger.info(f"History store opened: {_store.db_path}")
+    return _store
@@ -2,7 +2,11 @@
 Input validation and sanitization utilities for MediTalk
 """
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Optional
+
+# Compiled once at import time and shared by every validation call
+_SYMPTOM_RE = re.compile(r'^[a-zA-Z0-9_\s\-]+$')
+_UNDERSCORES_RE = re.compile(r'_+')
 
 
 class InputValidator:
@@ -12,9 +16,10 @@ class InputValidator:
     MAX_SYMPTOM_LENGTH = 100
     MAX_SYMPTOMS_COUNT = 20
     MAX_TEXT_LENGTH = 1000
+    MAX_BATCH_SIZE = 50
     
     # Allowed characters in symptom names
-    SYMPTOM_PATTERN = re.compile(r'^[a-zA-Z0-9_\s\-]+$')
+    SYMPTOM_PATTERN = _SYMPTOM_RE
     
     @staticmethod
     def sanitize_symptom(symptom: str) -> str:
@@ -48,7 +53,7 @@ class InputValidator:
         symptom = symptom.lower().replace(' ', '_')
         
         # Remove multiple consecutive underscores
-        symptom = re.sub(r'_+', '_', symptom)
+        symptom = _UNDERSCORES_RE.sub('_', symptom)
         
         # Remove leading/trailing underscores
         symptom = symptom.strip('_')
@@ -95,6 +100,103 @@ class InputValidator:
         
         return unique
     
+    @staticmethod
+    def normalize_symptoms(symptoms: List[str],
+                           symptom_index: Optional[Mapping[str, int]] = None) -> Dict[str, Any]:
+        """
+        Validate, normalize, deduplicate and index symptoms in a single pass.
+        
+        Applies the same rules as sanitize_symptom/validate_symptoms_list, but
+        without per-symptom exceptions or a second dedup pass. When a
+        symptom -> feature column mapping is given, known symptoms are also
+        resolved to column indices so the result can be fed straight into
+        the model.
+        
+        Args:
+            symptoms: List of raw symptom strings
+            symptom_index: Optional mapping of symptom -> feature column
+            
+        Returns:
+            dict with 'symptoms' (sanitized, unique), 'valid_symptoms',
+            'invalid_symptoms', 'indices' and 'rejected' (malformed inputs)
+            
+        Raises:
+            ValueError: If input is invalid
+        """
+        if not isinstance(symptoms, list):
+            raise ValueError("Symptoms must be a list")
+        
+        if len(symptoms) > InputValidator.MAX_SYMPTOMS_COUNT:
+            raise ValueError(f"Too many symptoms. Maximum is {InputValidator.MAX_SYMPTOMS_COUNT}")
+        
+        max_len = InputValidator.MAX_SYMPTOM_LENGTH
+        seen = set()
+        unique: List[str] = []
+        valid: List[str] = []
+        invalid: List[str] = []
+        indices: List[int] = []
+        rejected = 0
+        
+        for raw in symptoms:
+            if not raw or not isinstance(raw, str):
+                rejected += 1
+                continue
+            symptom = raw.strip()
+            if len(symptom) > max_len or not _SYMPTOM_RE.match(symptom):
+                rejected += 1
+                continue
+            symptom = _UNDERSCORES_RE.sub('_', symptom.lower().replace(' ', '_')).strip('_')
+            if not symptom or symptom in seen:
+                continue
+            seen.add(symptom)
+            unique.append(symptom)
+            
+            if symptom_index is not None:
+                idx = symptom_index.get(symptom)
+                if idx is None:
+                    invalid.append(symptom)
+                else:
+                    valid.append(symptom)
+                    indices.append(idx)
+        
+        return {
+            'symptoms': unique,
+            'valid_symptoms': valid,
+            'invalid_symptoms': invalid,
+            'indices': indices,
+            'rejected': rejected
+        }
+    
+    @staticmethod
+    def normalize_symptoms_batch(batch: List[List[str]],
+                                 symptom_index: Optional[Mapping[str, int]] = None) -> List[Dict[str, Any]]:
+        """
+        Batch variant of normalize_symptoms for the batch endpoints.
+        
+        Args:
+            batch: List of raw symptom lists
+            symptom_index: Optional mapping of symptom -> feature column
+            
+        Returns:
+            One normalize_symptoms result per input list, in order
+            
+        Raises:
+            ValueError: If input is invalid (message names the failing item)
+        """
+        if not isinstance(batch, list) or not batch:
+            raise ValueError("Batch must be a non-empty list")
+        
+        if len(batch) > InputValidator.MAX_BATCH_SIZE:
+            raise ValueError(f"Batch too large. Maximum is {InputValidator.MAX_BATCH_SIZE}")
+        
+        results = []
+        for i, symptoms in enumerate(batch):
+            try:
+                results.append(InputValidator.normalize_symptoms(symptoms, symptom_index))
+            except ValueError as e:
+                raise ValueError(f"Item {i}: {e}")
+        return results
+    
     @staticmethod
     def validate_json_payload(payload: Dict[str, Any], required_fields: List[str]) -> Dict[str, Any]:
         """
@@ -120,6 +222,37 @@ class InputValidator:
         
         return payload
     
+    @staticmethod
+    def validate_texts(texts: List[str]) -> List[str]:
+        """
+        Validate a batch of free-text symptom descriptions.
+        
+        Texts are checked but not rewritten, so character offsets reported
+        for extracted symptoms refer to exactly what the client sent.
+        
+        Args:
+            texts: List of raw text strings
+            
+        Returns:
+            The validated list of texts
+            
+        Raises:
+            ValueError: If input is invalid
+        """
+        if not isinstance(texts, list) or not texts:
+            raise ValueError("Texts must be a non-empty list")
+        
+        if len(texts) > InputValidator.MAX_BATCH_SIZE:
+            raise ValueError(f"Too many texts. Maximum is {InputValidator.MAX_BATCH_SIZE}")
+        
+        for text in texts:
+            if not isinstance(text, str):
+                raise ValueError("Text must be a string")
+            if len(text) > InputValidator.MAX_TEXT_LENGTH:
+                raise ValueError(f"Text exceeds maximum length of {InputValidator.MAX_TEXT_LENGTH}")
+        
+        return texts
+    
     @staticmethod
     def sanitize_text(text: str) -> str:
         """
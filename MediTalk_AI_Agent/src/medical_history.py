@@ -1,21 +1,33 @@
 """
 Medical history tracking for MediTalk AI
-Stores and retrieves consultation history using Streamlit session state
+Stores and retrieves consultation history through a persistent store
+(SQLite by default), scoped to the current Streamlit session
 """
 import streamlit as st
+import uuid
 from datetime import datetime
-from typing import List, Dict, Any
-import json
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+
+from history_export import iter_export
+from history_store import get_history_store
 
 
 class MedicalHistory:
     """Manages patient consultation history."""
     
+    # Number of consultations returned by get_history()
+    MAX_RECENT = 50
+    
     @staticmethod
     def initialize_session():
         """Initialize session state for medical history."""
-        if 'consultation_history' not in st.session_state:
-            st.session_state.consultation_history = []
+        if 'history_session_id' not in st.session_state:
+            st.session_state.history_session_id = uuid.uuid4().hex
+    
+    @staticmethod
+    def _session_id() -> str:
+        MedicalHistory.initialize_session()
+        return st.session_state.history_session_id
     
     @staticmethod
     def add_consultation(symptoms: List[str], result: Dict[str, Any]) -> None:
@@ -26,8 +38,6 @@ class MedicalHistory:
             symptoms: List of input symptoms
             result: Prediction result dictionary
         """
-        MedicalHistory.initialize_session()
-        
         consultation = {
             'timestamp': datetime.now().isoformat(),
             'symptoms': symptoms,
@@ -39,27 +49,49 @@ class MedicalHistory:
             ))
         }
         
-        st.session_state.consultation_history.append(consultation)
-        
-        # Keep only last 50 consultations to manage memory
-        if len(st.session_state.consultation_history) > 50:
-            st.session_state.consultation_history = st.session_state.consultation_history[-50:]
+        get_history_store().add(MedicalHistory._session_id(), consultation)
     
     @staticmethod
     def get_history() -> List[Dict[str, Any]]:
         """
-        Get consultation history.
+        Get recent consultation history.
         
         Returns:
-            List of consultation dictionaries
+            List of the last 50 consultation dictionaries, oldest first
         """
-        MedicalHistory.initialize_session()
-        return st.session_state.consultation_history
+        records = get_history_store().query(MedicalHistory._session_id(), limit=MedicalHistory.MAX_RECENT)
+        records.reverse()
+        return records
+    
+    @staticmethod
+    def get_history_page(page_size: int = 10,
+                         before_id: Optional[int] = None) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """
+        Get one page of consultation history, newest first.
+        
+        Args:
+            page_size: Consultations per page
+            before_id: Cursor returned for the previous page (None for the first)
+            
+        Returns:
+            Tuple of (consultations, cursor for the next page or None)
+        """
+        records = get_history_store().query(
+            MedicalHistory._session_id(), limit=page_size + 1, before_id=before_id
+        )
+        if len(records) > page_size:
+            return records[:page_size], records[page_size - 1]['id']
+        return records, None
+    
+    @staticmethod
+    def count_consultations() -> int:
+        """Return the number of consultations in this session's history (its running total, no query)."""
+        return get_history_store().count(MedicalHistory._session_id())
     
     @staticmethod
     def clear_history() -> None:
         """Clear all consultation history."""
-        st.session_state.consultation_history = []
+        get_history_store().clear(MedicalHistory._session_id())
     
     @staticmethod
     def export_history_json() -> str:
@@ -67,10 +99,36 @@ class MedicalHistory:
         Export history as JSON string.
         
         Returns:
-            JSON string of consultation history
+            Compact JSON array of consultation history, serialized one
+            record at a time (same document as export_history('json'))
+        """
+        return MedicalHistory.export_history_bytes('json').decode('utf-8')
+    
+    @staticmethod
+    def export_history(fmt: str = 'ndjson') -> Iterator[bytes]:
+        """
+        Stream history export without building it in memory.
+        
+        Args:
+            fmt: 'ndjson', 'csv' or 'json' (compact)
+            
+        Returns:
+            Iterator of UTF-8 encoded chunks
         """
-        history = MedicalHistory.get_history()
-        return json.dumps(history, indent=2)
+        return iter_export(get_history_store().iter_records(MedicalHistory._session_id()), fmt)
+    
+    @staticmethod
+    def export_history_bytes(fmt: str = 'ndjson') -> bytes:
+        """
+        Export history as a single bytes object (for st.download_button).
+        
+        Args:
+            fmt: 'ndjson', 'csv' or 'json' (compact)
+            
+        Returns:
+            UTF-8 encoded export
+        """
+        return b''.join(MedicalHistory.export_history(fmt))
     
     @staticmethod
     def get_history_summary() -> Dict[str, Any]:
@@ -80,31 +138,4 @@ class MedicalHistory:
         Returns:
             Dictionary with summary stats
         """
-        history = MedicalHistory.get_history()
-        
-        if not history:
-            return {
-                'total_consultations': 0,
-                'most_common_disease': None,
-                'average_confidence': 0
-            }
-        
-        # Calculate stats
-        total = len(history)
-        diseases = [c['primary_disease'] for c in history]
-        confidences = [c['confidence'] for c in history]
-        
-        # Most common disease
-        disease_counts = {}
-        for disease in diseases:
-            disease_counts[disease] = disease_counts.get(disease, 0) + 1
-        
-        most_common = max(disease_counts.items(), key=lambda x: x[1]) if disease_counts else (None, 0)
-        
-        return {
-            'total_consultations': total,
-            'most_common_disease': most_common[0],
-            'most_common_count': most_common[1],
-            'average_confidence': sum(confidences) / len(confidences) if confidences else 0,
-            'unique_diseases': len(disease_counts)
-        }
+        return get_history_store().summary(MedicalHistory._session_id())
@@ -154,21 +154,53 @@ class ModelTrainer:
             'classification_report': report,
         }
     
-    def save_model(self):
-        """Save trained model and encoder."""
+    def save_model(self, model_name: str = 'disease_model'):
+        """Save trained model (as <model_name>.pkl) and encoder.
+
+        The label encoder and symptom/disease lists are shared by every model
+        in model_dir. The production model (disease_model) rewrites them; a
+        candidate only writes missing ones and must match the existing ones,
+        so saving it never changes how the production model is decoded.
+
+        Raises:
+            ValueError: If a candidate was trained on other symptoms or diseases
+        """
         os.makedirs(self.model_dir, exist_ok=True)
+        artifacts = {
+            'label_encoder.pkl': self.label_encoder,
+            'symptoms_list.pkl': self.processor.all_symptoms,
+            'diseases_list.pkl': self.processor.diseases,
+        }
+        candidate = model_name != 'disease_model'
+        if candidate:
+            self._check_shared_artifacts(artifacts)
         
-        joblib.dump(self.model, os.path.join(self.model_dir, 'disease_model.pkl'))
-        joblib.dump(self.label_encoder, os.path.join(self.model_dir, 'label_encoder.pkl'))
-        joblib.dump(self.processor.all_symptoms, os.path.join(self.model_dir, 'symptoms_list.pkl'))
-        joblib.dump(self.processor.diseases, os.path.join(self.model_dir, 'diseases_list.pkl'))
+        joblib.dump(self.model, os.path.join(self.model_dir, f'{model_name}.pkl'))
+        for filename, value in artifacts.items():
+            path = os.path.join(self.model_dir, filename)
+            if not candidate or not os.path.exists(path):
+                joblib.dump(value, path)
         
         print(f"Model saved to {self.model_dir}")
 
-    def save_metrics(self, metrics: dict):
+    def _check_shared_artifacts(self, artifacts: dict):
+        """Raise ValueError if an existing shared artifact differs from this training run's."""
+        def _labels(value):
+            return [str(v) for v in getattr(value, 'classes_', value)]
+
+        for filename, value in artifacts.items():
+            path = os.path.join(self.model_dir, filename)
+            if os.path.exists(path) and _labels(joblib.load(path)) != _labels(value):
+                raise ValueError(
+                    f"{path} differs from this training run's; a candidate model must use "
+                    f"the production symptoms and diseases (retrain disease_model instead)"
+                )
+
+    def save_metrics(self, metrics: dict, model_name: str = 'disease_model'):
         """Save training metrics to JSON for later inspection/UI display."""
         os.makedirs(self.model_dir, exist_ok=True)
-        metrics_path = os.path.join(self.model_dir, 'training_metrics.json')
+        filename = 'training_metrics.json' if model_name == 'disease_model' else f'{model_name}_metrics.json'
+        metrics_path = os.path.join(self.model_dir, filename)
         def _to_builtin(obj):
             """Recursively convert numpy / non-JSON-serializable types to Python builtins."""
             import numpy as _np
@@ -189,23 +221,26 @@ class ModelTrainer:
             json.dump(cleaned, f, indent=2)
         print(f"Metrics saved to {metrics_path}")
     
-    def run_training_pipeline(self, *, tune: bool = False, n_iter: int = 30, cv: int = 3, scoring: str = 'f1_weighted'):
+    def run_training_pipeline(self, *, tune: bool = False, n_iter: int = 30, cv: int = 3, scoring: str = 'f1_weighted',
+                              model_name: str = 'disease_model'):
         """Run complete training pipeline.
 
         If tune is True, perform hyperparameter tuning before saving the best model.
+        A model_name other than disease_model saves a candidate next to the
+        production model (e.g. for shadow evaluation) instead of replacing it.
         """
         X, y = self.prepare_data()
         if tune:
             model, metrics = self.tune_model(X, y, n_iter=n_iter, cv=cv, scoring=scoring)
         else:
             model, metrics = self.train_model(X, y)
-        self.save_model()
-        self.save_metrics(metrics)
+        self.save_model(model_name)
+        self.save_metrics(metrics, model_name)
         print("\nTraining pipeline completed successfully!")
 
 if __name__ == "__main__":
     import sys
-    # Simple CLI flags: --tune [--iters N] [--cv K] [--scoring metric]
+    # Simple CLI flags: --tune [--iters N] [--cv K] [--scoring metric] [--output NAME]
     args = sys.argv[1:]
     tune = '--tune' in args or os.getenv('MEDITALK_TUNING', '0') in ('1', 'true', 'TRUE')
     def _get_arg_value(flag: str, default: str):
@@ -218,6 +253,9 @@ if __name__ == "__main__":
     n_iter = int(_get_arg_value('--iters', '30'))
     cv = int(_get_arg_value('--cv', '3'))
     scoring = _get_arg_value('--scoring', 'f1_weighted')
+    model_name = _get_arg_value('--output', 'disease_model')
+    if model_name.endswith('.pkl'):
+        model_name = model_name[:-len('.pkl')]
 
     trainer = ModelTrainer('data', 'models')
-    trainer.run_training_pipeline(tune=tune, n_iter=n_iter, cv=cv, scoring=scoring)
+    trainer.run_training_pipeline(tune=tune, n_iter=n_iter, cv=cv, scoring=scoring, model_name=model_name)
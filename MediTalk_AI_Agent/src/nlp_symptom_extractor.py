@@ -14,24 +14,50 @@ Approach:
 2) Phrase match: check each known multi-word symptom (underscores -> spaces)
 3) Synonym mapping: common layperson phrases to canonical symptoms
 4) Token match with close similarity using difflib (as a last resort)
+
+Results are memoized per normalized text in a small, bounded LRU cache so
+Streamlit reruns (live preview + Analyze) do not re-run the regex pipeline.
 """
 from __future__ import annotations
 
-from typing import Iterable, List, Set
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Any, Dict, FrozenSet, Iterable, List, Mapping, NamedTuple, Pattern, Set, Tuple
 import re
 import difflib
+import threading
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9\s]")
+_WHITESPACE_RE = re.compile(r"\s+")
+# Clause boundaries used by the incremental mode; matches never span them
+_CLAUSE_SPLIT_RE = re.compile(r"[,;.!?\n]+")
+_TOKEN_RE = re.compile(r"[^ ]+")
+
+
+class SymptomMatch(NamedTuple):
+    """A recognized symptom and where it was found in the normalized text."""
+    symptom: str
+    start: int
+    end: int
+    method: str  # 'phrase', 'synonym' or 'token'
 
 
 class SymptomExtractor:
-    def __init__(self, known_symptoms: Iterable[str] | None = None) -> None:
-        self.known: List[str] = sorted(set(map(str, known_symptoms or [])))
+    """
+    Immutable, thread-safe matcher. All patterns are compiled once in the
+    constructor, so a single instance can be shared by every session/request.
+    The only mutable state is the result cache, which is guarded by a lock.
+    """
+
+    def __init__(self, known_symptoms: Iterable[str] | None = None, cache_size: int = 512) -> None:
+        self.known: Tuple[str, ...] = tuple(sorted(set(map(str, known_symptoms or []))))
         # Precompute space-form phrases ("back pain") for fast contains checks
-        self.phrases: List[str] = [s.replace('_', ' ') for s in self.known]
+        self.phrases: Tuple[str, ...] = tuple(s.replace('_', ' ') for s in self.known)
         # Build quick lookup
-        self.known_set: Set[str] = set(self.known)
+        self.known_set: FrozenSet[str] = frozenset(self.known)
         # A small, pragmatic synonym map for frequent layperson expressions
         # Add more entries here safely without changing model behavior
-        self.synonyms: dict[str, str] = {
+        self.synonyms: Mapping[str, str] = MappingProxyType({
             # Fever
             "fever": "high_fever",
             "feverish": "high_fever",
@@ -52,104 +78,144 @@ class SymptomExtractor:
             "coughing": "cough",
             "sneeze": "continuous_sneezing",
             "sneezing": "continuous_sneezing",
-        }
+        })
+
+        # Compiled word-boundary patterns, longest phrase first so multi-word
+        # symptoms win over their sub-phrases. Each carries a same-length blank
+        # used to mask matches while keeping text offsets stable.
+        self._phrase_patterns: Tuple[Tuple[Pattern[str], str, str], ...] = tuple(
+            (re.compile(rf"\b{re.escape(phrase)}\b"), original, " " * len(phrase))
+            for phrase, original in sorted(zip(self.phrases, self.known), key=lambda x: -len(x[0]))
+        )
+        self._synonym_patterns: Tuple[Tuple[Pattern[str], str, str], ...] = tuple(
+            (re.compile(rf"\b{re.escape(k)}\b"), v, " " * len(k))
+            for k, v in sorted(self.synonyms.items(), key=lambda x: -len(x[0]))
+        )
+        # Complete single-word symptoms (no underscore) for the token fallback
+        self._single_word_symptoms: Tuple[str, ...] = tuple(s for s in self.known if '_' not in s)
+        self._single_word_set: FrozenSet[str] = frozenset(self._single_word_symptoms)
+
+        # Bounded LRU cache: normalized text -> extracted symptoms
+        self._cache: "OrderedDict[str, Tuple[SymptomMatch, ...]]" = OrderedDict()
+        self._cache_size = max(0, int(cache_size))
+        self._cache_lock = threading.Lock()
+        self._cache_hits = 0
+        self._cache_misses = 0
 
     @staticmethod
     def _normalize_text(text: str) -> str:
         text = text.lower()
         # Keep letters, digits, spaces; turn dashes/underscores to spaces
         text = text.replace('_', ' ').replace('-', ' ')
-        text = re.sub(r"[^a-z0-9\s]", " ", text)
+        text = _NON_ALNUM_RE.sub(" ", text)
         # Collapse multiple spaces
-        text = re.sub(r"\s+", " ", text).strip()
+        text = _WHITESPACE_RE.sub(" ", text).strip()
         return text
 
+    @staticmethod
+    def _normalize_with_offsets(text: str) -> Tuple[str, List[int]]:
+        """
+        Same normalization as _normalize_text, but also return, for every
+        character of the normalized text, its index in the original text.
+        """
+        chars: List[str] = []
+        origin: List[int] = []
+        for i, ch in enumerate(text):
+            for low in ch.lower():
+                if low in '_-' or _NON_ALNUM_RE.match(low):
+                    low = ' '
+                if _WHITESPACE_RE.match(low):
+                    # Collapse runs of whitespace and drop leading whitespace
+                    if not chars or chars[-1] == ' ':
+                        continue
+                    low = ' '
+                chars.append(low)
+                origin.append(i)
+        if chars and chars[-1] == ' ':
+            chars.pop()
+            origin.pop()
+        return ''.join(chars), origin
+
     @staticmethod
     def _normalize_symptom(s: str) -> str:
         return s.strip().lower().replace(' ', '_').replace('-', '_')
 
-    def _phrase_match(self, norm_text: str) -> List[str]:
-        found: List[str] = []
+    def _phrase_match(self, norm_text: str) -> List[SymptomMatch]:
+        found: List[SymptomMatch] = []
         # Check longer phrases first so we capture multi-word symptoms accurately
-        for phrase, original in sorted(zip(self.phrases, self.known), key=lambda x: -len(x[0])):
+        for pattern, original, blank in self._phrase_patterns:
             # whole-phrase contains check (word boundary safe)
             # Example: "back pain" in text -> back_pain
             # Only match if it's an EXACT phrase match, not substring
-            if re.search(rf"\b{re.escape(phrase)}\b", norm_text):
-                found.append(original)
-                # Remove matched phrase from text to prevent token-level re-matching later
-                norm_text = re.sub(rf"\b{re.escape(phrase)}\b", "", norm_text)
+            m = pattern.search(norm_text)
+            if m:
+                found.append(SymptomMatch(original, m.start(), m.end(), 'phrase'))
+                # Blank out matched phrase to prevent token-level re-matching later
+                norm_text = pattern.sub(blank, norm_text)
         return found
 
-    def _synonym_match(self, norm_text: str) -> List[str]:
-        hits: List[str] = []
-        # Sort by length descending to match longer phrases first
-        sorted_synonyms = sorted(self.synonyms.items(), key=lambda x: -len(x[0]))
-        for k, v in sorted_synonyms:
-            if re.search(rf"\b{re.escape(k)}\b", norm_text):
+    def _synonym_match(self, norm_text: str) -> List[SymptomMatch]:
+        hits: List[SymptomMatch] = []
+        # Patterns are pre-sorted by length descending to match longer phrases first
+        for pattern, v, blank in self._synonym_patterns:
+            m = pattern.search(norm_text)
+            if m:
                 if v in self.known_set:
-                    hits.append(v)
-                    # Remove matched synonym to prevent token-level re-matching
-                    norm_text = re.sub(rf"\b{re.escape(k)}\b", "", norm_text)
+                    hits.append(SymptomMatch(v, m.start(), m.end(), 'synonym'))
+                    # Blank out matched synonym to prevent token-level re-matching
+                    norm_text = pattern.sub(blank, norm_text)
         return hits
 
-    def _token_match_fuzzy(self, norm_text: str, already_matched: Set[str]) -> List[str]:
+    def _token_match_fuzzy(self, norm_text: str, already_matched: Set[str]) -> List[SymptomMatch]:
         """
         Token-level fallback: for each word try to find a close known symptom token
         Useful for single-word symptoms like "cough" or when user types "headache"
         Only matches COMPLETE single-word symptoms, not partial token matches.
         """
-        tokens = [t for t in norm_text.split(' ') if t and len(t) > 2]  # Ignore very short words
-        results: Set[str] = set()
+        tokens = [m for m in _TOKEN_RE.finditer(norm_text) if len(m.group()) > 2]  # Ignore very short words
+        results: Dict[str, SymptomMatch] = {}
         
         # Only match complete single-word symptoms (no underscore = single word)
-        single_word_symptoms = [s for s in self.known if '_' not in s]
+        single_word_symptoms = self._single_word_symptoms
         
-        for t in tokens:
+        for m in tokens:
+            t = m.group()
             # Skip if this token was already part of a matched phrase
             if any(t in matched.replace('_', ' ') for matched in already_matched):
                 continue
-                
+
+            symptom = None
             # Exact token match to single-word symptoms
-            if t in single_word_symptoms:
-                results.add(t)
-                continue
-            
+            if t in self._single_word_set:
+                symptom = t
             # Exact synonym match
-            if t in self.synonyms:
-                mapped = self.synonyms[t]
-                if mapped in self.known_set:
-                    results.add(mapped)
-                    continue
-            
-            # Very close fuzzy match only for single-word symptoms (cutoff 0.95 = very strict)
-            close = difflib.get_close_matches(t, single_word_symptoms, n=1, cutoff=0.95)
-            if close:
-                results.add(close[0])
-        
-        return list(sorted(results))
+            elif t in self.synonyms and self.synonyms[t] in self.known_set:
+                symptom = self.synonyms[t]
+            else:
+                # Very close fuzzy match only for single-word symptoms (cutoff 0.95 = very strict)
+                close = difflib.get_close_matches(t, single_word_symptoms, n=1, cutoff=0.95)
+                if close:
+                    symptom = close[0]
 
-    def extract(self, text: str) -> List[str]:
-        """
-        Extract a deduplicated list of model-ready symptoms from free text.
-        Returns: list of symptom identifiers like ["back_pain", "high_fever"]
-        """
-        if not text:
-            return []
-        norm = self._normalize_text(text)
+            if symptom is not None and symptom not in results:
+                results[symptom] = SymptomMatch(symptom, m.start(), m.end(), 'token')
+        
+        return [results[k] for k in sorted(results)]
 
-        found: List[str] = []
+    def _extract_normalized(self, norm: str) -> Tuple[SymptomMatch, ...]:
+        """Run the full matching pipeline on already-normalized text."""
+        found: List[SymptomMatch] = []
         already_matched: Set[str] = set()
         
         # 1) Phrase-level exacts (most specific - do first)
         phrase_matches = self._phrase_match(norm)
         found.extend(phrase_matches)
-        already_matched.update(phrase_matches)
+        already_matched.update(m.symptom for m in phrase_matches)
         
         # 2) Synonym phrases
         synonym_matches = self._synonym_match(norm)
         found.extend(synonym_matches)
-        already_matched.update(synonym_matches)
+        already_matched.update(m.symptom for m in synonym_matches)
         
         # 3) Token-level fuzzy fallback (only for unmatched single-word symptoms)
         token_matches = self._token_match_fuzzy(norm, already_matched)
@@ -157,10 +223,112 @@ class SymptomExtractor:
 
         # Deduplicate while preserving order of first appearance in text
         seen: Set[str] = set()
-        ordered: List[str] = []
-        for s in found:
-            if s not in seen:
-                seen.add(s)
-                ordered.append(s)
+        ordered: List[SymptomMatch] = []
+        for m in found:
+            if m.symptom not in seen:
+                seen.add(m.symptom)
+                ordered.append(m)
+
+        return tuple(ordered)
+
+    def _extract_cached(self, norm: str) -> Tuple[SymptomMatch, ...]:
+        """Memoized wrapper around _extract_normalized (LRU, thread-safe)."""
+        if not norm:
+            return ()
+        with self._cache_lock:
+            cached = self._cache.get(norm)
+            if cached is not None:
+                self._cache.move_to_end(norm)
+                self._cache_hits += 1
+                return cached
+            self._cache_misses += 1
+
+        # Match outside the lock so concurrent sessions do not serialize
+        result = self._extract_normalized(norm)
+
+        if self._cache_size:
+            with self._cache_lock:
+                self._cache[norm] = result
+                self._cache.move_to_end(norm)
+                while len(self._cache) > self._cache_size:
+                    self._cache.popitem(last=False)
+        return result
 
+    def extract(self, text: str) -> List[str]:
+        """
+        Extract a deduplicated list of model-ready symptoms from free text.
+        Returns: list of symptom identifiers like ["back_pain", "high_fever"]
+        """
+        if not text:
+            return []
+        return [m.symptom for m in self._extract_cached(self._normalize_text(text))]
+
+    def extract_spans(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Like extract(), but also report where each symptom was found.
+
+        Returns:
+            list of dicts with symptom, start/end offsets into the original
+            text, the matched text and the match method
+        """
+        if not text:
+            return []
+        norm, origin = self._normalize_with_offsets(text)
+        spans: List[Dict[str, Any]] = []
+        for m in self._extract_cached(norm):
+            start = origin[m.start]
+            end = origin[m.end - 1] + 1
+            spans.append({
+                'symptom': m.symptom,
+                'start': start,
+                'end': end,
+                'text': text[start:end],
+                'method': m.method,
+            })
+        return spans
+
+    def extract_incremental(self, text: str) -> List[str]:
+        """
+        Extract symptoms clause by clause for live previews while typing.
+
+        The text is split at punctuation/newlines and each clause is looked up
+        in the LRU cache, so when the user keeps typing only the last (changed)
+        clause is actually re-scanned. Symptoms spanning a clause boundary are
+        not matched, and results are ordered clause by clause.
+        """
+        if not text:
+            return []
+        seen: Set[str] = set()
+        ordered: List[str] = []
+        for clause in _CLAUSE_SPLIT_RE.split(text):
+            for m in self._extract_cached(self._normalize_text(clause)):
+                if m.symptom not in seen:
+                    seen.add(m.symptom)
+                    ordered.append(m.symptom)
         return ordered
+
+    def cache_info(self) -> Dict[str, Any]:
+        """
+        Return extraction cache statistics.
+
+        Returns:
+            dict with hits, misses, hit_rate, size and maxsize
+        """
+        with self._cache_lock:
+            hits, misses = self._cache_hits, self._cache_misses
+            size = len(self._cache)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / total if total else 0.0,
+            'size': size,
+            'maxsize': self._cache_size,
+        }
+
+    def clear_cache(self) -> None:
+        """Drop all memoized results and reset statistics."""
+        with self._cache_lock:
+            self._cache.clear()
+            self._cache_hits = 0
+            self._cache_misses = 0
@@ -8,9 +8,176 @@ from reportlab.lib.units import inch
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib import colors
+from collections import OrderedDict, namedtuple
 from datetime import datetime
 from typing import Dict, Any, List
+import copy
+import hashlib
 import io
+import json
+import threading
+
+
+# Styles and static flowables shared by every report
+ReportTemplate = namedtuple('ReportTemplate', [
+    'normal', 'heading3', 'heading4', 'title', 'heading', 'disclaimer',
+    'alt_table_style', 'title_paragraph', 'disclaimer_paragraph',
+])
+
+
+def _build_template() -> ReportTemplate:
+    """Build the report styles and static flowables (done once per process)."""
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#2C3E50'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+    
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#34495E'),
+        spaceAfter=12,
+        spaceBefore=12
+    )
+    
+    disclaimer_style = ParagraphStyle(
+        'Disclaimer',
+        parent=styles['Normal'],
+        fontSize=8,
+        textColor=colors.grey,
+        alignment=TA_CENTER
+    )
+    
+    alt_table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    
+    return ReportTemplate(
+        normal=styles['Normal'],
+        heading3=styles['Heading3'],
+        heading4=styles['Heading4'],
+        title=title_style,
+        heading=heading_style,
+        disclaimer=disclaimer_style,
+        alt_table_style=alt_table_style,
+        title_paragraph=Paragraph("MediTalk AI Medical Report", title_style),
+        disclaimer_paragraph=Paragraph(
+            "<i><b>DISCLAIMER:</b> This report is generated by an AI system for informational purposes only. "
+            "It should not be considered as professional medical advice. Please consult a qualified "
+            "healthcare provider for proper diagnosis and treatment.</i>",
+            disclaimer_style
+        ),
+    )
+
+
+_TEMPLATE = _build_template()
+
+# Memoized reports keyed by hash(result, symptoms, generation date), least
+# recently used first
+_REPORT_CACHE_SIZE = 64
+_report_cache: "OrderedDict[str, bytes]" = OrderedDict()
+_report_cache_lock = threading.Lock()
+
+
+def _generated_on() -> str:
+    """Return the report's "Generated on" timestamp (minute resolution)."""
+    return datetime.now().strftime("%B %d, %Y at %I:%M %p")
+
+
+def _render(result: Dict[str, Any], symptoms: List[str], template: ReportTemplate,
+            date_str: str) -> bytes:
+    """Lay out and build one report with the given template and generation date."""
+    buffer = io.BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter,
+                           rightMargin=72, leftMargin=72,
+                           topMargin=72, bottomMargin=18)
+    
+    # Container for the 'Flowable' objects
+    elements = []
+    
+    # Title (static flowables are copied: layout stores per-build state on them)
+    elements.append(copy.copy(template.title_paragraph))
+    elements.append(Spacer(1, 12))
+    
+    # Date and time
+    elements.append(Paragraph(f"<i>Generated on {date_str}</i>", template.normal))
+    elements.append(Spacer(1, 20))
+    
+    # Patient Symptoms Section
+    elements.append(Paragraph("Reported Symptoms", template.heading))
+    symptoms_text = ", ".join(symptoms)
+    elements.append(Paragraph(symptoms_text, template.normal))
+    elements.append(Spacer(1, 20))
+    
+    # Primary Diagnosis Section
+    elements.append(Paragraph("Primary Diagnosis", template.heading))
+    elements.append(Paragraph(
+        f"<b>{result['primary_disease']}</b>",
+        template.heading3
+    ))
+    
+    confidence_pct = result['confidence'] * 100
+    confidence_color = '#27AE60' if confidence_pct > 70 else '#F39C12' if confidence_pct > 40 else '#E74C3C'
+    elements.append(Paragraph(
+        f"<font color='{confidence_color}'>Confidence: {confidence_pct:.1f}%</font>",
+        template.normal
+    ))
+    elements.append(Spacer(1, 12))
+    
+    # Description
+    elements.append(Paragraph("Description:", template.heading4))
+    elements.append(Paragraph(result['description'], template.normal))
+    elements.append(Spacer(1, 20))
+    
+    # Alternative Diagnoses
+    if result['alternative_diseases']:
+        elements.append(Paragraph("Alternative Diagnoses", template.heading))
+        
+        alt_data = [['Disease', 'Probability']]
+        for disease, prob in zip(result['alternative_diseases'], result['alternative_probabilities']):
+            alt_data.append([disease, f"{prob*100:.1f}%"])
+        
+        alt_table = Table(alt_data, colWidths=[4*inch, 1.5*inch])
+        alt_table.setStyle(template.alt_table_style)
+        elements.append(alt_table)
+        elements.append(Spacer(1, 20))
+    
+    # Precautions
+    if result['precautions']:
+        elements.append(Paragraph("Recommended Precautions", template.heading))
+        
+        for i, precaution in enumerate(result['precautions'], 1):
+            elements.append(Paragraph(
+                f"{i}. {precaution}",
+                template.normal
+            ))
+        elements.append(Spacer(1, 20))
+    
+    # Disclaimer
+    elements.append(Spacer(1, 30))
+    elements.append(copy.copy(template.disclaimer_paragraph))
+    
+    # Build PDF
+    doc.build(elements)
+    
+    # Get PDF content
+    pdf_content = buffer.getvalue()
+    buffer.close()
+    
+    return pdf_content
 
 
 class PDFReportGenerator:
@@ -21,6 +188,8 @@ class PDFReportGenerator:
         """
         Generate PDF report from prediction result.
         
+        Styles and static flowables are built once at import and reused.
+        
         Args:
             result: Prediction result dictionary
             symptoms: List of input symptoms
@@ -28,125 +197,40 @@ class PDFReportGenerator:
         Returns:
             PDF content as bytes
         """
-        buffer = io.BytesIO()
-        doc = SimpleDocTemplate(buffer, pagesize=letter,
-                               rightMargin=72, leftMargin=72,
-                               topMargin=72, bottomMargin=18)
-        
-        # Container for the 'Flowable' objects
-        elements = []
-        
-        # Define styles
-        styles = getSampleStyleSheet()
-        title_style = ParagraphStyle(
-            'CustomTitle',
-            parent=styles['Heading1'],
-            fontSize=24,
-            textColor=colors.HexColor('#2C3E50'),
-            spaceAfter=30,
-            alignment=TA_CENTER
-        )
-        
-        heading_style = ParagraphStyle(
-            'CustomHeading',
-            parent=styles['Heading2'],
-            fontSize=16,
-            textColor=colors.HexColor('#34495E'),
-            spaceAfter=12,
-            spaceBefore=12
-        )
-        
-        # Title
-        elements.append(Paragraph("MediTalk AI Medical Report", title_style))
-        elements.append(Spacer(1, 12))
-        
-        # Date and time
-        date_str = datetime.now().strftime("%B %d, %Y at %I:%M %p")
-        elements.append(Paragraph(f"<i>Generated on {date_str}</i>", styles['Normal']))
-        elements.append(Spacer(1, 20))
-        
-        # Patient Symptoms Section
-        elements.append(Paragraph("Reported Symptoms", heading_style))
-        symptoms_text = ", ".join(symptoms)
-        elements.append(Paragraph(symptoms_text, styles['Normal']))
-        elements.append(Spacer(1, 20))
-        
-        # Primary Diagnosis Section
-        elements.append(Paragraph("Primary Diagnosis", heading_style))
-        elements.append(Paragraph(
-            f"<b>{result['primary_disease']}</b>",
-            styles['Heading3']
-        ))
-        
-        confidence_pct = result['confidence'] * 100
-        confidence_color = '#27AE60' if confidence_pct > 70 else '#F39C12' if confidence_pct > 40 else '#E74C3C'
-        elements.append(Paragraph(
-            f"<font color='{confidence_color}'>Confidence: {confidence_pct:.1f}%</font>",
-            styles['Normal']
-        ))
-        elements.append(Spacer(1, 12))
-        
-        # Description
-        elements.append(Paragraph("Description:", styles['Heading4']))
-        elements.append(Paragraph(result['description'], styles['Normal']))
-        elements.append(Spacer(1, 20))
+        return _render(result, symptoms, _TEMPLATE, _generated_on())
+    
+    @staticmethod
+    def generate_report_cached(result: Dict[str, Any], symptoms: List[str]) -> bytes:
+        """
+        Generate PDF report, reusing the bytes of an identical earlier report.
         
-        # Alternative Diagnoses
-        if result['alternative_diseases']:
-            elements.append(Paragraph("Alternative Diagnoses", heading_style))
-            
-            alt_data = [['Disease', 'Probability']]
-            for disease, prob in zip(result['alternative_diseases'], result['alternative_probabilities']):
-                alt_data.append([disease, f"{prob*100:.1f}%"])
-            
-            alt_table = Table(alt_data, colWidths=[4*inch, 1.5*inch])
-            alt_table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#3498DB')),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            elements.append(alt_table)
-            elements.append(Spacer(1, 20))
+        Suited to lazy downloads: the report is only laid out on first
+        request and repeated downloads of the same consultation are free.
+        The generation date is part of the key, so a cached report is only
+        reused while its "Generated on" line is still current.
         
-        # Precautions
-        if result['precautions']:
-            elements.append(Paragraph("Recommended Precautions", heading_style))
+        Args:
+            result: Prediction result dictionary
+            symptoms: List of input symptoms
             
-            for i, precaution in enumerate(result['precautions'], 1):
-                elements.append(Paragraph(
-                    f"{i}. {precaution}",
-                    styles['Normal']
-                ))
-            elements.append(Spacer(1, 20))
-        
-        # Disclaimer
-        elements.append(Spacer(1, 30))
-        disclaimer_style = ParagraphStyle(
-            'Disclaimer',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.grey,
-            alignment=TA_CENTER
-        )
-        elements.append(Paragraph(
-            "<i><b>DISCLAIMER:</b> This report is generated by an AI system for informational purposes only. "
-            "It should not be considered as professional medical advice. Please consult a qualified "
-            "healthcare provider for proper diagnosis and treatment.</i>",
-            disclaimer_style
-        ))
-        
-        # Build PDF
-        doc.build(elements)
-        
-        # Get PDF content
-        pdf_content = buffer.getvalue()
-        buffer.close()
-        
+        Returns:
+            PDF content as bytes
+        """
+        date_str = _generated_on()
+        key = hashlib.sha256(
+            json.dumps([result, symptoms, date_str], sort_keys=True, default=str).encode('utf-8')
+        ).hexdigest()
+        with _report_cache_lock:
+            pdf_content = _report_cache.get(key)
+            if pdf_content is not None:
+                _report_cache.move_to_end(key)
+                return pdf_content
+        
+        pdf_content = _render(result, symptoms, _TEMPLATE, date_str)
+        with _report_cache_lock:
+            _report_cache[key] = pdf_content
+            while len(_report_cache) > _REPORT_CACHE_SIZE:
+                _report_cache.popitem(last=False)
         return pdf_content
     
     @staticmethod
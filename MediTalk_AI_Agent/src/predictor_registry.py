@@ -0,0 +1,257 @@
+"""
+Process-wide predictor registry for MediTalk AI
+Holds exactly one loaded DiseasePredictor per model version and hands out
+reference-counted handles, so sessions and API workers share one model.
+Several models can be resident side by side, loaded lazily, sharing their
+symptom index and disease data, with an LRU limit on idle ones.
+"""
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (model_dir, data_dir, model_filename) as requested by callers
+SourceKey = Tuple[str, str, Optional[str]]
+
+DEFAULT_MODEL = 'disease_model'
+
+# Files in a model directory that are shared artifacts, not models
+_ARTIFACTS = {'label_encoder.pkl', 'symptoms_list.pkl', 'diseases_list.pkl'}
+
+
+def available_models(model_dir: str = 'models') -> List[str]:
+    """Return the names (file stems) of the models in `model_dir`."""
+    try:
+        names = os.listdir(model_dir)
+    except OSError:
+        return []
+    return sorted(n[:-len('.pkl')] for n in names if n.endswith('.pkl') and n not in _ARTIFACTS)
+
+
+class _Entry:
+    """One resident predictor and the number of live handles on it."""
+
+    __slots__ = ('predictor', 'refs')
+
+    def __init__(self, predictor):
+        self.predictor = predictor
+        self.refs = 0
+
+
+class PredictorHandle:
+    """
+    Reference to a registry predictor.
+
+    Release it explicitly (or use it as a context manager); a handle that is
+    garbage collected unreleased - e.g. with an ended Streamlit session - is
+    released automatically.
+    """
+
+    __slots__ = ('model_version', '_registry', '_predictor')
+
+    def __init__(self, registry: 'PredictorRegistry', version: str, predictor):
+        self.model_version = version
+        self._registry = registry
+        self._predictor = predictor
+
+    @property
+    def predictor(self):
+        if self._registry is None:
+            raise RuntimeError("Predictor handle has been released")
+        return self._predictor
+
+    @property
+    def released(self) -> bool:
+        return self._registry is None
+
+    def release(self) -> None:
+        """Drop this reference (idempotent)."""
+        registry, self._registry = self._registry, None
+        self._predictor = None
+        if registry is not None:
+            registry._release(self.model_version)
+
+    def __del__(self):
+        self.release()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+
+
+class PredictorRegistry:
+    """Loads each model version once and counts the handles on it."""
+
+    def __init__(self, loader: Optional[Callable[..., Any]] = None, max_resident: int = 3):
+        """
+        Args:
+            loader: Callable(model_dir, data_dir, model_filename, shared=)
+                returning a predictor with a model_version (default:
+                DiseasePredictor); `shared` is a resident predictor from the
+                same directories, or None
+            max_resident: Models kept loaded; idle ones beyond this are
+                unloaded least recently used first (models with live
+                handles are never unloaded)
+        """
+        if loader is None:
+            from disease_predictor import DiseasePredictor
+            loader = DiseasePredictor
+        self._loader = loader
+        self.max_resident = max_resident
+        self._lock = threading.RLock()
+        # model_version -> resident predictor, least recently acquired first
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # requested source -> version it currently resolves to
+        self._sources: Dict[SourceKey, str] = {}
+        # source -> load in progress (resolves to its version), so a slow
+        # load neither blocks other models nor runs twice
+        self._loading: Dict[SourceKey, Future] = {}
+        self.loads = 0
+
+    def _current_version(self, source: SourceKey) -> Optional[str]:
+        """Version `source` resolves to, or None if unknown or changed on disk (lock held)."""
+        version = self._sources.get(source)
+        entry = self._entries.get(version) if version else None
+        if entry is None:
+            return None
+        # Cheap stat-based check so a retrained model file is picked up
+        compute_version = getattr(entry.predictor, '_compute_model_version', None)
+        if compute_version is not None and compute_version() != version:
+            return None
+        return version
+
+    def acquire(self, model_dir: str = 'models', data_dir: str = 'data',
+                model_filename: Optional[str] = None) -> PredictorHandle:
+        """
+        Return a handle on the predictor for the given model files.
+
+        The model is loaded only if no resident predictor has the same
+        version; otherwise the resident one is shared. Loading runs outside
+        the registry lock: other models stay available meanwhile, and
+        concurrent requests for the same files wait for the one load.
+
+        Args:
+            model_dir: Model directory path
+            data_dir: Data directory path
+            model_filename: Model file inside model_dir (default: disease_model.pkl)
+        """
+        source = (model_dir, data_dir, model_filename)
+        while True:
+            with self._lock:
+                version = self._current_version(source)
+                if version is not None:
+                    return self._handle(version)
+                loading = self._loading.get(source)
+                if loading is None:
+                    loading = self._loading[source] = Future()
+                    donor = self._donor(model_dir, data_dir)
+                    break
+            # Another caller is loading these files; its error is ours too
+            loading.result()
+
+        try:
+            predictor = self._loader(model_dir, data_dir, model_filename, shared=donor)
+        except BaseException as e:
+            with self._lock:
+                del self._loading[source]
+            loading.set_exception(e)
+            raise
+        with self._lock:
+            del self._loading[source]
+            self.loads += 1
+            version = str(predictor.model_version)
+            if version not in self._entries:
+                self._entries[version] = _Entry(predictor)
+                logger.info(f"Predictor loaded: {version}")
+            previous = self._sources.get(source)
+            self._sources[source] = version
+            if previous and previous != version:
+                self._drop_if_unused(previous)
+            handle = self._handle(version)
+        loading.set_result(version)
+        return handle
+
+    def _handle(self, version: str) -> PredictorHandle:
+        """Count a new handle on a resident version (lock held)."""
+        entry = self._entries[version]
+        entry.refs += 1
+        self._entries.move_to_end(version)
+        self._evict()
+        return PredictorHandle(self, version, entry.predictor)
+
+    def _donor(self, model_dir: str, data_dir: str):
+        """A resident predictor loaded from the same directories, if any (lock held)."""
+        for entry in reversed(self._entries.values()):
+            predictor = entry.predictor
+            if (getattr(predictor, 'model_dir', None), getattr(predictor, 'data_dir', None)) == (model_dir, data_dir):
+                return predictor
+        return None
+
+    def _evict(self) -> None:
+        """Unload idle models, least recently used first, while over max_resident (lock held)."""
+        for version in list(self._entries):
+            if len(self._entries) <= self.max_resident:
+                return
+            if self._entries[version].refs <= 0:
+                del self._entries[version]
+                logger.info(f"Predictor evicted: {version}")
+
+    def _release(self, version: str) -> None:
+        with self._lock:
+            entry = self._entries.get(version)
+            if entry is None:
+                return
+            entry.refs -= 1
+            self._drop_if_unused(version)
+            self._evict()
+
+    def _drop_if_unused(self, version: str) -> None:
+        """
+        Unload a version with no handles that no source resolves to (lock held).
+
+        Current versions stay resident while idle, so the next session does
+        not reload the model.
+        """
+        entry = self._entries.get(version)
+        if entry is not None and entry.refs <= 0 and version not in self._sources.values():
+            del self._entries[version]
+            logger.info(f"Predictor unloaded: {version}")
+
+    def stats(self) -> List[Dict[str, Any]]:
+        """Return the resident models, least recently used first, with their handle counts."""
+        with self._lock:
+            current = set(self._sources.values())
+            return [
+                {
+                    'model': os.path.splitext(str(getattr(entry.predictor, 'model_filename', version)))[0],
+                    'model_version': version,
+                    'refs': entry.refs,
+                    'current': version in current,
+                }
+                for version, entry in self._entries.items()
+            ]
+
+
+_registry: Optional[PredictorRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_predictor_registry() -> PredictorRegistry:
+    """
+    Return the process-wide registry.
+
+    MEDITALK_MAX_MODELS sets how many models stay resident (default 3).
+    """
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = PredictorRegistry(max_resident=int(os.getenv('MEDITALK_MAX_MODELS', '3')))
+    return _registry
@@ -0,0 +1,216 @@
+"""
+Shadow evaluation for MediTalk AI
+Replays a sample of live prediction requests against a candidate model on
+a background thread and records how often it agrees with the production
+model and how its latency compares, without touching the responses
+"""
+
+import logging
+import os
+import queue
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional, Sequence
+
+from predictor_registry import PredictorRegistry, get_predictor_registry
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(values: Sequence[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ShadowEvaluator:
+    """
+    Compares a candidate model with production on sampled live traffic.
+
+    submit() is called on the request thread after the primary prediction
+    and only samples and enqueues; the candidate runs on a worker thread.
+    When the queue is full the sample is dropped, so shadow work never
+    slows the primary path.
+    """
+
+    def __init__(self, candidate: str, model_dir: str = 'models', data_dir: str = 'data',
+                 sample_rate: float = 0.1, queue_size: int = 100, window: int = 1000,
+                 registry: Optional[PredictorRegistry] = None):
+        """
+        Args:
+            candidate: Candidate model name (file stem in model_dir)
+            model_dir: Model directory path
+            data_dir: Data directory path
+            sample_rate: Fraction of requests replayed (0-1)
+            queue_size: Pending samples beyond which new ones are dropped
+            window: Recent latencies kept for the percentiles
+            registry: Registry the candidate is loaded from (default: process-wide)
+        """
+        self.candidate = candidate
+        self.model_dir = model_dir
+        self.data_dir = data_dir
+        self.sample_rate = sample_rate
+        self._registry = registry
+        self._queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._handle = None
+        self._primary_ms: deque = deque(maxlen=window)
+        self._candidate_ms: deque = deque(maxlen=window)
+        self._reset_counters()
+
+    def _reset_counters(self) -> None:
+        self.sampled = 0
+        self.dropped = 0
+        self.failed = 0
+        self.compared = 0
+        self.agreements = 0
+        self.top3_agreements = 0
+        self._primary_ms.clear()
+        self._candidate_ms.clear()
+
+    def submit(self, index_rows: List[List[int]], symptoms_batch: List[List[str]],
+               primary_results: List[Dict[str, Any]], primary_seconds: float,
+               explain: bool = False) -> bool:
+        """
+        Offer one request (possibly a batch) for shadow evaluation.
+
+        Args:
+            index_rows: Feature columns per input, as passed to the primary model
+            symptoms_batch: Normalized symptoms per input
+            primary_results: Production predictions, in input order
+            primary_seconds: Wall time of the production model call
+            explain: Whether the production call explained its predictions
+                (the candidate does the same, so latencies compare)
+
+        Returns:
+            True if the request was queued, False if not sampled or dropped
+        """
+        if not index_rows or random.random() >= self.sample_rate:
+            return False
+        primary = [(r['primary_disease'], [r['primary_disease']] + list(r['alternative_diseases']))
+                   for r in primary_results]
+        try:
+            self._queue.put_nowait((index_rows, symptoms_batch, primary, primary_seconds, explain))
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            return False
+        with self._lock:
+            self.sampled += 1
+        self._ensure_worker()
+        return True
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            with self._lock:
+                if self._worker is None or not self._worker.is_alive():
+                    self._worker = threading.Thread(target=self._run, name='shadow-eval', daemon=True)
+                    self._worker.start()
+
+    def _predictor(self):
+        """
+        Candidate predictor, held while shadowing (worker thread only).
+
+        Resolved through the registry for every sample (cheap while it is
+        resident), so a replaced candidate file is picked up and the old
+        version's handle released.
+        """
+        registry = self._registry or get_predictor_registry()
+        handle = registry.acquire(self.model_dir, self.data_dir, f"{self.candidate}.pkl")
+        if self._handle is not None and self._handle.model_version == handle.model_version:
+            handle.release()
+        else:
+            if self._handle is not None:
+                logger.info(f"Shadow candidate {self.candidate} changed to {handle.model_version}")
+                self._handle.release()
+            self._handle = handle
+        return self._handle.predictor
+
+    def _run(self) -> None:
+        while True:
+            index_rows, symptoms_batch, primary, primary_seconds, explain = self._queue.get()
+            try:
+                predictor = self._predictor()
+                start = time.perf_counter()
+                results = predictor.predict_from_indices_batch(index_rows, symptoms_batch, explain=explain)
+                candidate_seconds = time.perf_counter() - start
+            except Exception as e:
+                with self._lock:
+                    self.failed += 1
+                logger.warning(f"Shadow prediction with {self.candidate} failed: {e}")
+            else:
+                with self._lock:
+                    for (disease, top3), result in zip(primary, results):
+                        self.compared += 1
+                        self.agreements += result['primary_disease'] == disease
+                        self.top3_agreements += result['primary_disease'] in top3
+                    self._primary_ms.append(primary_seconds * 1000)
+                    self._candidate_ms.append(candidate_seconds * 1000)
+            finally:
+                self._queue.task_done()
+
+    def join(self, timeout: float = 10.0) -> None:
+        """Wait until the queued samples have been evaluated (for tests and scripts)."""
+        deadline = time.monotonic() + timeout
+        while self._queue.unfinished_tasks and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return agreement rates and latency percentiles of the recent window."""
+        with self._lock:
+            primary = list(self._primary_ms)
+            candidate = list(self._candidate_ms)
+            latency = {}
+            for name, values in (('primary_ms', primary), ('candidate_ms', candidate)):
+                latency[name] = {
+                    'mean': sum(values) / len(values) if values else None,
+                    'p50': _percentile(values, 0.5),
+                    'p95': _percentile(values, 0.95),
+                }
+            deltas = [c - p for p, c in zip(primary, candidate)]
+            handle = self._handle
+            return {
+                'candidate': self.candidate,
+                'candidate_version': handle.model_version if handle is not None else None,
+                'sample_rate': self.sample_rate,
+                'sampled': self.sampled,
+                'dropped': self.dropped,
+                'failed': self.failed,
+                'queued': self._queue.qsize(),
+                'compared': self.compared,
+                'agreement_rate': self.agreements / self.compared if self.compared else None,
+                'top3_agreement_rate': self.top3_agreements / self.compared if self.compared else None,
+                'latency': {
+                    **latency,
+                    'delta_ms_mean': sum(deltas) / len(deltas) if deltas else None,
+                },
+            }
+
+    def reset(self) -> None:
+        """Clear the counters (e.g. after swapping the candidate file, which the next sample loads)."""
+        with self._lock:
+            self._reset_counters()
+
+
+def create_shadow_evaluator(model_dir: str = 'models', data_dir: str = 'data') -> Optional[ShadowEvaluator]:
+    """
+    Build the evaluator from the environment, or None if shadowing is off.
+
+    MEDITALK_SHADOW_MODEL names the candidate (unset disables shadowing),
+    MEDITALK_SHADOW_SAMPLE the sampled fraction (default 0.1) and
+    MEDITALK_SHADOW_QUEUE the queue size (default 100).
+    """
+    candidate = os.getenv('MEDITALK_SHADOW_MODEL')
+    if not candidate:
+        return None
+    return ShadowEvaluator(
+        candidate[:-len('.pkl')] if candidate.endswith('.pkl') else candidate,
+        model_dir=model_dir,
+        data_dir=data_dir,
+        sample_rate=float(os.getenv('MEDITALK_SHADOW_SAMPLE', '0.1')),
+        queue_size=int(os.getenv('MEDITALK_SHADOW_QUEUE', '100')),
+    )
@@ -0,0 +1,57 @@
+"""
+Stage timing utilities for MediTalk AI
+Measures the wall-clock time of each step of an analysis (extraction and
+inference in the app's loader; speech and PDF too in the timing benchmark)
+so progress and latency reflect real work.
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+
+class StageTimer:
+    """Records the duration of named stages, in the order they ran."""
+
+    def __init__(self, on_stage_start: Optional[Callable[[str], None]] = None):
+        """
+        Initialize the timer.
+
+        Args:
+            on_stage_start: Optional callback invoked with the stage name
+                when a stage begins (e.g. to update a progress display)
+        """
+        self.on_stage_start = on_stage_start
+        self.stages: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block as stage `name`.
+
+        The duration is recorded even if the block raises.
+        """
+        if self.on_stage_start is not None:
+            self.on_stage_start(name)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - start))
+
+    @property
+    def total(self) -> float:
+        """Total seconds spent in all recorded stages."""
+        return sum(seconds for _, seconds in self.stages)
+
+    def as_dict(self) -> Dict[str, float]:
+        """Return stage durations in milliseconds (repeated stages are summed)."""
+        result: Dict[str, float] = {}
+        for name, seconds in self.stages:
+            result[name] = result.get(name, 0.0) + seconds * 1000
+        return result
+
+    def summary(self) -> str:
+        """Return a one-line human readable breakdown, e.g. for logging."""
+        parts = [f"{name}={ms:.1f}ms" for name, ms in self.as_dict().items()]
+        parts.append(f"total={self.total * 1000:.1f}ms")
+        return " ".join(parts)
@@ -0,0 +1,175 @@
+"""
+Temporary file expiry for MediTalk
+Tracks generated files in an expiry heap so cleanup touches only the files
+it removes, and a background janitor keeps them within a byte budget
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ExpiringFileQueue:
+    """Expiry-ordered index of temporary files with a total size budget."""
+
+    def __init__(self, ttl_seconds: float = 600, max_bytes: int = 20 * 1024 * 1024,
+                 interval_seconds: float = 30):
+        """
+        Initialize the queue.
+
+        Args:
+            ttl_seconds: How long a registered file is kept
+            max_bytes: Total size budget; files closest to expiry go first
+            interval_seconds: How often the background janitor runs
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.interval_seconds = interval_seconds
+        self._lock = threading.Lock()
+        # (expires_at, path) min-heap; entries superseded by a re-register are skipped
+        self._heap: List[Tuple[float, str]] = []
+        # path -> (expires_at, size) for the live entry of each file
+        self._entries: Dict[str, Tuple[float, int]] = {}
+        self._total_bytes = 0
+        self.removed = 0
+        self._janitor: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def register(self, path: str, size: Optional[int] = None,
+                 expires_in: Optional[float] = None) -> None:
+        """
+        Track `path` for expiry, replacing any earlier registration.
+
+        Args:
+            path: File to remove once it expires
+            size: File size in bytes (read from disk if omitted)
+            expires_in: Seconds until it expires (default: the queue's TTL)
+        """
+        if size is None:
+            size = os.path.getsize(path)
+        if expires_in is None:
+            expires_in = self.ttl_seconds
+        expires_at = time.monotonic() + expires_in
+        with self._lock:
+            previous = self._entries.get(path)
+            if previous is not None:
+                self._total_bytes -= previous[1]
+            self._entries[path] = (expires_at, size)
+            self._total_bytes += size
+            heapq.heappush(self._heap, (expires_at, path))
+        self._ensure_janitor()
+
+    def adopt(self, directory: str, prefix: str) -> int:
+        """
+        Take over files left in `directory` by earlier runs.
+
+        Files named `prefix`* are aged by their modification time: expired
+        ones are removed now, the rest are registered for the time they
+        have left. Meant to be called once at startup.
+
+        Args:
+            directory: Directory to scan
+            prefix: File name prefix of the files this queue manages
+
+        Returns:
+            Number of files removed
+        """
+        now = time.time()
+        removed = 0
+        try:
+            entries = [e for e in os.scandir(directory) if e.name.startswith(prefix) and e.is_file()]
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            remaining = self.ttl_seconds - (now - stat.st_mtime)
+            if remaining <= 0:
+                try:
+                    os.remove(entry.path)
+                    removed += 1
+                except OSError:
+                    pass
+            else:
+                self.register(entry.path, stat.st_size, expires_in=remaining)
+        if removed:
+            with self._lock:
+                self.removed += removed
+            logger.info(f"Removed {removed} temp file(s) left by an earlier run")
+        return removed
+
+    def purge(self, max_files: Optional[int] = None) -> int:
+        """
+        Remove expired files, then the oldest ones while over budget.
+
+        Only popped heap entries are visited, so the cost is proportional to
+        the number of files removed rather than to the files on disk.
+
+        Args:
+            max_files: Optional cap on the number of tracked files
+
+        Returns:
+            Number of files removed
+        """
+        now = time.monotonic()
+        doomed = []
+        with self._lock:
+            while self._heap:
+                expires_at, path = self._heap[0]
+                entry = self._entries.get(path)
+                if entry is None or entry[0] != expires_at:
+                    heapq.heappop(self._heap)  # stale entry
+                    continue
+                over_budget = (self._total_bytes > self.max_bytes
+                               or (max_files is not None and len(self._entries) > max_files))
+                if expires_at > now and not over_budget:
+                    break
+                heapq.heappop(self._heap)
+                del self._entries[path]
+                self._total_bytes -= entry[1]
+                doomed.append(path)
+            self.removed += len(doomed)
+        for path in doomed:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        if doomed:
+            logger.info(f"Removed {len(doomed)} expired temp file(s)")
+        return len(doomed)
+
+    def _ensure_janitor(self) -> None:
+        if self._janitor is not None:
+            return
+        with self._lock:
+            if self._janitor is None:
+                self._janitor = threading.Thread(target=self._run, name="temp-janitor", daemon=True)
+                self._janitor.start()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.purge()
+            except Exception as e:
+                logger.warning(f"Temp file janitor failed: {e}")
+
+    def stop(self) -> None:
+        """Stop the background janitor."""
+        self._stop.set()
+
+    def stats(self) -> Dict[str, int]:
+        """Return the number and total size of tracked files."""
+        with self._lock:
+            return {
+                'files': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_bytes': self.max_bytes,
+                'removed': self.removed,
+            }
@@ -0,0 +1,340 @@
+"""
+Text-to-speech backends for MediTalk
+Provides a common interface over gTTS (online), pyttsx3 and espeak (offline)
+and a deterministic local stub for tests, plus a fallback chain bounded by
+one deadline per call
+"""
+
+import io
+import logging
+import math
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import BinaryIO, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# The stub only produces a tone; it is meant for tests and offline runs
+DEFAULT_BACKENDS = "gtts,pyttsx3,espeak"
+DEFAULT_TIMEOUT = 8.0
+
+# Worker pool for network backends, so a call can stop waiting on them.
+# A worker is only used when one is free: calls never queue behind network
+# requests that are still hanging. Offline backends run on the caller's thread
+# and bound themselves (each runs in a subprocess with a timeout).
+NETWORK_WORKERS = 4
+_executor = ThreadPoolExecutor(max_workers=NETWORK_WORKERS, thread_name_prefix="tts")
+_free_workers = threading.BoundedSemaphore(NETWORK_WORKERS)
+
+
+class TTSBackend:
+    """
+    Base class for speech synthesis engines.
+
+    Subclasses implement write_to_fp() (preferred, in memory) or save().
+    """
+
+    name = "base"
+    mime_type = "audio/mpeg"
+    extension = ".mp3"
+    # Network backends run on the worker pool under the call's deadline
+    network = False
+
+    def is_available(self) -> bool:
+        """Return True if the engine can be used in this environment."""
+        return True
+
+    def write_to_fp(self, text: str, fp: BinaryIO, lang: str = "en") -> None:
+        """
+        Synthesize `text` and write the audio to the binary file object `fp`.
+
+        The default goes through a temporary file for engines that can only
+        write to a path; backends override it to stay in memory.
+
+        Raises:
+            Exception: If synthesis fails
+        """
+        fd, path = tempfile.mkstemp(suffix=self.extension, prefix="meditalk_tts_")
+        os.close(fd)
+        try:
+            self.save(text, path, lang)
+            with open(path, "rb") as f:
+                shutil.copyfileobj(f, fp)
+        finally:
+            _remove_quietly(path)
+
+    def save(self, text: str, filepath: str, lang: str = "en") -> None:
+        """
+        Synthesize `text` and write the audio to `filepath`.
+
+        Raises:
+            Exception: If synthesis fails
+        """
+        with open(filepath, "wb") as f:
+            self.write_to_fp(text, f, lang)
+
+
+class GTTSBackend(TTSBackend):
+    """Google Text-to-Speech (online, MP3)."""
+
+    name = "gtts"
+    network = True
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        # Per HTTP request, so a stalled connection frees its worker
+        self.timeout = timeout
+
+    def is_available(self) -> bool:
+        try:
+            import gtts  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def write_to_fp(self, text: str, fp: BinaryIO, lang: str = "en") -> None:
+        from gtts import gTTS
+        gTTS(text=text, lang=lang, slow=False, timeout=self.timeout).write_to_fp(fp)
+
+
+class Pyttsx3Backend(TTSBackend):
+    """
+    pyttsx3 offline engine (uses espeak on Linux, SAPI5 on Windows; WAV).
+
+    runAndWait() cannot be interrupted and may hang in a broken driver, so
+    every call runs in a child process that is killed after the timeout.
+    """
+
+    name = "pyttsx3"
+    mime_type = "audio/wav"
+    extension = ".wav"
+
+    _SCRIPT = (
+        "import sys, pyttsx3\n"
+        "engine = pyttsx3.init()\n"
+        "engine.setProperty('rate', int(sys.argv[3]))\n"
+        "engine.save_to_file(sys.argv[1], sys.argv[2])\n"
+        "engine.runAndWait()\n"
+    )
+
+    def __init__(self, rate: int = 150, timeout: float = DEFAULT_TIMEOUT):
+        self.rate = rate
+        self.timeout = timeout
+
+    def is_available(self) -> bool:
+        try:
+            import pyttsx3  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def command(self, text: str, filepath: str) -> List[str]:
+        """Child process command line that writes `text` to `filepath`."""
+        return [sys.executable, "-c", self._SCRIPT, text, filepath, str(self.rate)]
+
+    def save(self, text: str, filepath: str, lang: str = "en") -> None:
+        subprocess.run(
+            self.command(text, filepath),
+            check=True, timeout=self.timeout,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        if not os.path.exists(filepath) or os.path.getsize(filepath) == 0:
+            raise RuntimeError("pyttsx3 produced no audio")
+
+
+class EspeakBackend(TTSBackend):
+    """espeak / espeak-ng command line synthesizer (offline, WAV)."""
+
+    name = "espeak"
+    mime_type = "audio/wav"
+    extension = ".wav"
+
+    def __init__(self, timeout: float = DEFAULT_TIMEOUT):
+        self.timeout = timeout
+        self.binary = shutil.which("espeak-ng") or shutil.which("espeak")
+
+    def is_available(self) -> bool:
+        return self.binary is not None
+
+    def write_to_fp(self, text: str, fp: BinaryIO, lang: str = "en") -> None:
+        completed = subprocess.run(
+            [self.binary, "-v", lang, "--stdout", text],
+            check=True, timeout=self.timeout,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        fp.write(completed.stdout)
+
+
+class StubTTSBackend(TTSBackend):
+    """
+    Deterministic local stub producing a short tone WAV.
+
+    The audio depends only on the text, so it is useful in tests and offline
+    development. It is not part of the default chain.
+    """
+
+    name = "stub"
+    mime_type = "audio/wav"
+    extension = ".wav"
+
+    SAMPLE_RATE = 8000
+    MS_PER_WORD = 60
+
+    def render(self, text: str) -> bytes:
+        """Return the WAV frames for `text` (8 kHz, mono, 8-bit)."""
+        words = max(1, len(text.split()))
+        n_samples = self.SAMPLE_RATE * self.MS_PER_WORD * words // 1000
+        # Pitch derived from the text so different texts sound different
+        freq = 300 + sum(map(ord, text)) % 400
+        return bytes(
+            128 + int(40 * math.sin(2 * math.pi * freq * i / self.SAMPLE_RATE))
+            for i in range(n_samples)
+        )
+
+    def write_to_fp(self, text: str, fp: BinaryIO, lang: str = "en") -> None:
+        with wave.open(fp, "wb") as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(1)
+            wav.setframerate(self.SAMPLE_RATE)
+            wav.writeframes(self.render(text))
+
+
+BACKENDS = {
+    GTTSBackend.name: GTTSBackend,
+    Pyttsx3Backend.name: Pyttsx3Backend,
+    EspeakBackend.name: EspeakBackend,
+    StubTTSBackend.name: StubTTSBackend,
+}
+
+
+class FallbackTTS:
+    """Tries backends in order; network backends share one deadline per call."""
+
+    def __init__(self, backends: Sequence[TTSBackend], timeout: float = DEFAULT_TIMEOUT):
+        """
+        Initialize the fallback chain.
+
+        Args:
+            backends: Backends in order of preference
+            timeout: Seconds per call that network backends may take in
+                total; offline backends run afterwards on the calling thread,
+                bounded by their own subprocess timeouts
+        """
+        if not backends:
+            raise ValueError("At least one TTS backend is required")
+        self.backends: List[TTSBackend] = list(backends)
+        self.timeout = timeout
+
+    @property
+    def preferred(self) -> Optional[TTSBackend]:
+        """The first available backend, whose audio is the one worth caching."""
+        return next((b for b in self.backends if b.is_available()), None)
+
+    def synthesize(self, text: str, lang: str = "en",
+                   deadline: Optional[float] = None) -> Tuple[bytes, TTSBackend]:
+        """
+        Synthesize speech with the first backend that succeeds in time.
+
+        Each attempt writes to its own in-memory buffer, so a backend that
+        times out and finishes late cannot clobber another one's output.
+
+        Args:
+            text: Text to speak
+            lang: Language code
+            deadline: time.monotonic() by which network backends must be
+                done, e.g. shared by several calls (default: `timeout` from now)
+
+        Returns:
+            Tuple of (audio bytes, backend that produced them)
+
+        Raises:
+            RuntimeError: If every backend fails or times out
+        """
+        if deadline is None:
+            deadline = time.monotonic() + self.timeout
+        errors = []
+        for backend in self.backends:
+            if not backend.is_available():
+                continue
+            buffer = io.BytesIO()
+            try:
+                if backend.network:
+                    _run_until(deadline, backend.write_to_fp, text, buffer, lang)
+                else:
+                    backend.write_to_fp(text, buffer, lang)
+            except FutureTimeoutError:
+                errors.append(f"{backend.name}: no response before the deadline")
+                logger.warning(f"TTS backend {backend.name} timed out; falling back")
+                continue
+            except Exception as e:
+                errors.append(f"{backend.name}: {e}")
+                logger.warning(f"TTS backend {backend.name} failed: {e}")
+                continue
+            data = buffer.getvalue()
+            if data:
+                return data, backend
+            errors.append(f"{backend.name}: empty output")
+        raise RuntimeError("All TTS backends failed: " + "; ".join(errors))
+
+
+def _run_until(deadline: float, fn, *args) -> None:
+    """
+    Run `fn` on a free network worker and wait for it until `deadline`.
+
+    Raises:
+        TimeoutError: If the deadline passes first
+        RuntimeError: If every worker is still busy with earlier calls
+    """
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise FutureTimeoutError()
+    if not _free_workers.acquire(blocking=False):
+        raise RuntimeError("all network TTS workers are busy")
+    try:
+        future = _executor.submit(fn, *args)
+    except BaseException:
+        _free_workers.release()
+        raise
+    future.add_done_callback(lambda _: _free_workers.release())
+    future.result(timeout=remaining)
+
+
+def _remove_quietly(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def create_tts(names: Optional[str] = None, timeout: Optional[float] = None) -> FallbackTTS:
+    """
+    Build a fallback chain from a comma-separated list of backend names.
+
+    Args:
+        names: e.g. "gtts,espeak" or "stub" for tests (default:
+            MEDITALK_TTS_BACKENDS or "gtts,pyttsx3,espeak")
+        timeout: Deadline of a call in seconds (default: MEDITALK_TTS_TIMEOUT or 8)
+
+    Returns:
+        FallbackTTS instance
+
+    Raises:
+        ValueError: If a backend name is unknown
+    """
+    names = names or os.getenv('MEDITALK_TTS_BACKENDS', DEFAULT_BACKENDS)
+    if timeout is None:
+        timeout = float(os.getenv('MEDITALK_TTS_TIMEOUT', str(DEFAULT_TIMEOUT)))
+    backends = []
+    for name in (n.strip().lower() for n in names.split(',')):
+        if not name:
+            continue
+        if name not in BACKENDS:
+            raise ValueError(f"Unknown TTS backend: {name}. Choose from {', '.join(BACKENDS)}")
+        backends.append(BACKENDS[name]() if name == StubTTSBackend.name else BACKENDS[name](timeout=timeout))
+    return FallbackTTS(backends, timeout=timeout)
@@ -283,8 +283,9 @@ class VoiceInterface:
         # Parse symptoms
         symptoms = [s.strip() for s in symptoms_text.split(',')]
         
-        # Validate symptoms
-        validation = predictor.validate_symptoms(symptoms)
+        # Validate symptoms and make prediction in one pass
+        analysis = predictor.validate_and_predict(symptoms)
+        validation = analysis['validation']
         
         if not validation['all_valid']:
             message = f"I recognized the following symptoms: {', '.join(validation['valid_symptoms'])}. "
@@ -292,8 +293,12 @@ class VoiceInterface:
             print(message)
             self.text_to_speech(message)
         
-        # Make prediction
-        result = predictor.predict_disease(validation['valid_symptoms'])
+        result = analysis['result']
+        if result is None:
+            message = "I could not recognize any of your symptoms. Please try again using different words."
+            print(message)
+            self.text_to_speech(message)
+            return
         
         # Generate response
         response = f"Based on your symptoms, I believe you may have {result['primary_disease']}. "
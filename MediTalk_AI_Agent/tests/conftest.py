@@ -0,0 +1,16 @@
+"""Test configuration: make the modules in src/ importable."""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+
+@pytest.fixture(scope='session')
+def predictor():
+    """The shipped model, loaded once for the whole run."""
+    from disease_predictor import DiseasePredictor
+    return DiseasePredictor(os.path.join(ROOT, 'models'), os.path.join(ROOT, 'data'))
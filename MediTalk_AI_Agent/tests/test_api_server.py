@@ -0,0 +1,78 @@
+"""Tests for per-request model selection in the API server."""
+
+import os
+import shutil
+
+import pytest
+
+import api_server
+from predictor_registry import PredictorRegistry
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+SYMPTOMS = {'symptoms': ['itching', 'skin_rash', 'nodal_skin_eruptions']}
+
+
+@pytest.fixture
+def models(tmp_path, monkeypatch):
+    """A model directory with the default model and a copy named tuned_model, on a fresh registry."""
+    source = os.path.join(ROOT, 'models')
+    for name in os.listdir(source):
+        if name.endswith('.pkl'):
+            shutil.copy(os.path.join(source, name), tmp_path / name)
+    shutil.copy(tmp_path / 'disease_model.pkl', tmp_path / 'tuned_model.pkl')
+    registry = PredictorRegistry()
+    monkeypatch.setattr(api_server, 'MODEL_DIR', str(tmp_path))
+    monkeypatch.setattr(api_server, 'DATA_DIR', os.path.join(ROOT, 'data'))
+    monkeypatch.setattr(api_server, 'default_model', 'disease_model')
+    monkeypatch.setattr(api_server, 'get_predictor_registry', lambda: registry)
+    return tmp_path, registry
+
+
+@pytest.fixture
+def client():
+    return api_server.app.test_client()
+
+
+def test_default_model_serves_unselected_requests(models, client):
+    response = client.post('/api/predict', json=SYMPTOMS)
+    assert response.status_code == 200
+    assert response.headers['X-Model'] == 'disease_model'
+    assert response.get_json()['primary_disease'] == 'Fungal infection'
+
+
+@pytest.mark.parametrize('selection', [
+    {'query_string': {'model': 'tuned_model'}},
+    {'query_string': {'model': 'tuned_model.pkl'}},
+    {'headers': {'X-Model': 'tuned_model'}},
+])
+def test_model_is_selected_by_query_or_header(models, client, selection):
+    response = client.post('/api/predict', json=SYMPTOMS, **selection)
+    assert response.status_code == 200
+    assert response.headers['X-Model'] == 'tuned_model'
+    _, registry = models
+    assert {s['model'] for s in registry.stats()} == {'tuned_model'}
+    # The request's handle is released at teardown
+    assert all(s['refs'] == 0 for s in registry.stats())
+
+
+def test_unknown_model_is_rejected(models, client):
+    response = client.post('/api/predict', json=SYMPTOMS, query_string={'model': 'missing'})
+    assert response.status_code == 400
+    assert 'X-Model' not in response.headers
+
+
+def test_replaced_default_model_is_picked_up(models, client):
+    model_dir, registry = models
+    assert client.post('/api/predict', json=SYMPTOMS).status_code == 200
+    assert client.get('/api/symptoms').status_code == 200
+    assert registry.loads == 1
+
+    # Retrained file: same name, new modification time
+    path = model_dir / 'disease_model.pkl'
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert client.post('/api/predict', json=SYMPTOMS).status_code == 200
+    assert registry.loads == 2
+    assert [s['model_version'] for s in registry.stats() if s['current']] == [
+        f"disease_model.pkl:{stat.st_size}:{stat.st_mtime_ns + 10**9}"
+    ]
@@ -0,0 +1,124 @@
+"""Tests for speech caching in AudioResponse."""
+
+import threading
+import time
+
+import pytest
+
+from audio_response import AudioResponse
+from tts_backends import FallbackTTS, StubTTSBackend, TTSBackend
+
+RESULT = {
+    'primary_disease': 'Migraine',
+    'confidence': 0.8,
+    'alternative_diseases': ['Hypertension'],
+    'description': 'A headache disorder.',
+    'precautions': ['rest in a dark room'],
+}
+
+
+class SwitchableBackend(TTSBackend):
+    """Preferred backend that can be taken down and brought back."""
+
+    name = "primary"
+    mime_type = "audio/wav"
+
+    def __init__(self):
+        self.up = True
+        self.calls = 0
+
+    def write_to_fp(self, text, fp, lang="en"):
+        self.calls += 1
+        if not self.up:
+            raise ConnectionError("service unavailable")
+        StubTTSBackend().write_to_fp("primary " + text, fp, lang)
+
+
+@pytest.fixture
+def primary():
+    return SwitchableBackend()
+
+
+@pytest.fixture
+def make_audio(tmp_path, primary):
+    def make():
+        tts = FallbackTTS([primary, StubTTSBackend()], timeout=1)
+        return AudioResponse(temp_dir=str(tmp_path), tts=tts)
+    return make
+
+
+def test_preferred_backend_audio_is_cached(make_audio, primary):
+    audio = make_audio()
+    first = audio.synthesize("hello")
+    assert audio.synthesize("hello") == first
+    assert primary.calls == 1
+
+
+def test_fallback_audio_is_not_cached(make_audio, primary):
+    audio = make_audio()
+    primary.up = False
+    fallback, _ = audio.synthesize("hello")
+    assert StubTTSBackend().render("hello") in fallback
+    primary.up = True
+    recovered, _ = audio.synthesize("hello")
+    assert recovered != fallback
+    assert primary.calls == 2
+
+
+def test_fallback_audio_does_not_survive_restart(make_audio, primary):
+    primary.up = False
+    fallback, _ = make_audio().synthesize("hello")
+    primary.up = True
+    recovered, _ = make_audio().synthesize("hello")
+    assert recovered != fallback
+
+
+def test_fallback_consultation_is_fetchable_but_not_cached(make_audio, primary):
+    audio = make_audio()
+    primary.up = False
+    key = audio.request_consultation(RESULT, ['headache'])
+    data, mime_type = audio.get_consultation(key, timeout=5)
+    assert mime_type == "audio/wav"
+    assert audio.get_consultation(key) == (data, mime_type)
+    assert key not in audio.cache
+
+    primary.up = True
+    assert audio.request_consultation(RESULT, ['headache']) == key
+    audio.get_consultation(key, timeout=5)
+    assert key in audio.cache
+
+
+def test_consultation_segments_share_one_deadline(tmp_path):
+    class SlowNetworkBackend(SwitchableBackend):
+        network = True
+
+        def write_to_fp(self, text, fp, lang="en"):
+            time.sleep(0.2)
+            super().write_to_fp(text, fp, lang)
+
+    tts = FallbackTTS([SlowNetworkBackend(), StubTTSBackend()], timeout=0.3)
+    audio = AudioResponse(temp_dir=str(tmp_path), tts=tts)
+    start = time.monotonic()
+    data, mime_type = audio.synthesize_segments(["one", "two", "three", "four"])
+    # Four cold segments at 0.2 s each would take 0.8 s with per-call deadlines
+    assert time.monotonic() - start < 0.6
+    assert mime_type == "audio/wav" and data.startswith(b"RIFF")
+
+
+def test_prewarm_does_not_delay_consultations(tmp_path):
+    release = threading.Event()
+
+    class BlockingPrewarm(StubTTSBackend):
+        def write_to_fp(self, text, fp, lang="en"):
+            if text.startswith("About"):
+                release.wait(5)
+            super().write_to_fp(text, fp, lang)
+
+    audio = AudioResponse(temp_dir=str(tmp_path), tts=FallbackTTS([BlockingPrewarm()]))
+    advice = [{'description': f"About disease {i}.", 'precautions': []} for i in range(6)]
+    try:
+        audio.prewarm(advice)
+        data, _ = audio.submit_consultation(RESULT, ['headache']).result(timeout=2)
+        assert data.startswith(b"RIFF")
+    finally:
+        release.set()
@@ -0,0 +1,53 @@
+"""Tests for bulk report input parsing."""
+
+import io
+import json
+
+import pytest
+
+from bulk_reports import iter_ndjson_inputs, iter_report_inputs
+
+HISTORY_RECORD = {
+    'timestamp': '2025-01-01T10:00:00',
+    'symptoms': ['itching', 'skin_rash'],
+    'primary_disease': 'Fungal infection',
+    'confidence': 0.9,
+    'alternatives': [['Acne', 0.05]],
+}
+
+
+def test_ndjson_is_read_lazily():
+    lines = io.StringIO(json.dumps(HISTORY_RECORD) + "\n\n" + "not json\n")
+    items = iter_ndjson_inputs(lines)
+    result, symptoms = next(items)
+    assert result['alternative_diseases'] == ['Acne']
+    assert symptoms == ['itching', 'skin_rash']
+    # The bad line is only reached when the consumer gets that far
+    with pytest.raises(ValueError, match="Line 3"):
+        next(items)
+
+
+def test_json_document_shapes():
+    batch = {'results': [{'primary_disease': 'Acne', 'confidence': 0.4}]}
+    assert [r['primary_disease'] for r, _ in iter_report_inputs(batch)] == ['Acne']
+    text = {'results': [{'text': 'hi', 'extracted': [], 'prediction': None}]}
+    assert list(iter_report_inputs(text)) == []
+    with pytest.raises(ValueError):
+        iter_report_inputs({'unexpected': True})
+
+
+@pytest.mark.parametrize('record', [
+    {'results': 1},
+    {'symptoms': ['cough']},
+    {'result': None},
+    {'prediction': {'confidence': 0.5}},
+    {'alternatives': []},
+])
+def test_records_without_a_prediction_are_rejected(record):
+    lines = io.StringIO(json.dumps(HISTORY_RECORD) + "\n\n" + json.dumps(record) + "\n")
+    items = iter_ndjson_inputs(lines)
+    next(items)
+    with pytest.raises(ValueError, match="Line 3: not a consultation"):
+        next(items)
+    with pytest.raises(ValueError, match="Record 2: not a consultation"):
+        list(iter_report_inputs([HISTORY_RECORD, record]))
@@ -0,0 +1,66 @@
+"""Tests for the shared cache and the pinned symptom extractors."""
+
+import threading
+import time
+from collections import OrderedDict
+
+import cache_utils
+from cache_utils import Cache, get_cache, get_symptom_extractor
+
+
+def test_invalidate_all_keeps_foreign_files(tmp_path):
+    cache = Cache(disk_dir=str(tmp_path))
+    cache.set('v1', 'a', 1)
+    cache.set('v2', 'b', 2)
+    notes = tmp_path / "notes.txt"
+    notes.write_text("keep me")
+    other = tmp_path / "reports"
+    other.mkdir()
+    (other / "r.pdf").write_bytes(b"%PDF")
+
+    assert cache.invalidate() == 2
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["notes.txt", "reports"]
+    assert (other / "r.pdf").exists()
+    assert Cache(disk_dir=str(tmp_path)).get('v1', 'a') is None
+
+
+def test_invalidate_namespace_keeps_other_namespaces(tmp_path):
+    cache = Cache(disk_dir=str(tmp_path))
+    cache.set('v1', 'a', 1)
+    cache.set('v2', 'b', 2)
+    assert cache.invalidate('v1') == 1
+
+    reopened = Cache(disk_dir=str(tmp_path))
+    assert reopened.get('v1', 'a') is None
+    assert reopened.get('v2', 'b') == 2
+
+
+def test_symptom_extractor_is_built_once_and_survives_lru_churn(monkeypatch):
+    builds = []
+
+    class SlowExtractor:
+        def __init__(self, symptoms):
+            builds.append(list(symptoms))
+            time.sleep(0.05)
+
+    monkeypatch.setattr(cache_utils, 'SymptomExtractor', SlowExtractor)
+    monkeypatch.setattr(cache_utils, '_extractors', OrderedDict())
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(get_symptom_extractor('test-v1', ['cough'])))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(builds) == 1
+    assert len({id(r) for r in results}) == 1
+
+    cache = get_cache()
+    for i in range(cache.max_entries + 1):
+        cache.set('churn', i, i, persist=False)
+    assert get_symptom_extractor('test-v1', ['cough']) is results[0]
+    assert len(builds) == 1
+    cache.invalidate('churn')
@@ -0,0 +1,31 @@
+"""Tests for the disease predictor's single-pass validation."""
+
+import pytest
+
+INPUTS = [
+    ['headache', 'high_fever', 'vomiting'],
+    ['Skin Rash', ' itching ', 'nodal skin eruptions'],
+    ['cough', 'not a symptom', 'chest_pain'],
+    ['joint_pain'],
+]
+
+
+@pytest.mark.parametrize('symptoms', INPUTS)
+def test_validate_and_predict_matches_separate_calls(predictor, symptoms):
+    analysis = predictor.validate_and_predict(symptoms)
+    validation = predictor.validate_symptoms(symptoms)
+
+    assert analysis['validation'] == validation
+    assert analysis['result'] == predictor.predict_disease(validation['valid_symptoms'])
+
+
+def test_no_valid_symptom_gives_no_result(predictor):
+    analysis = predictor.validate_and_predict(['not a symptom', 'Also Unknown'])
+    assert analysis == {
+        'validation': {
+            'valid_symptoms': [],
+            'invalid_symptoms': ['not_a_symptom', 'also_unknown'],
+            'all_valid': False,
+        },
+        'result': None,
+    }
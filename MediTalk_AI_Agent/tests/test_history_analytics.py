@@ -0,0 +1,71 @@
+"""Tests for the incremental analytics rollups."""
+
+import threading
+
+from history_analytics import HistoryAnalytics
+from history_store import SQLiteHistoryStore
+
+
+def fill(store, n, day="2026-01-01"):
+    for i in range(n):
+        store.add("s", {
+            'timestamp': f"{day}T{i % 24:02d}:30:00",
+            'primary_disease': "Flu" if i % 2 else "Cold",
+            'confidence': 0.5,
+            'symptoms': ["cough", "fever"],
+            'alternatives': [],
+        })
+    store.flush()
+
+
+def test_refresh_is_idempotent(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"), batch_size=100)
+    fill(store, 30)
+    analytics = HistoryAnalytics(store, chunk_size=7)
+
+    assert analytics.refresh() == 30
+    assert analytics.refresh() == 0
+    assert analytics.overview()['total_consultations'] == 30
+    assert analytics.symptom_pairs()[0]['count'] == 30
+
+    fill(store, 5, day="2026-01-02")
+    assert analytics.overview()['total_consultations'] == 35
+    assert analytics.rebuild() == 35
+    assert analytics.confidence_histogram()['total'] == 35
+    analytics.close()
+    store.close()
+
+
+def test_concurrent_refreshes_count_each_row_once(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"), batch_size=1000)
+    fill(store, 500)
+    # Separate connections, as in separate processes
+    workers = [HistoryAnalytics(store, chunk_size=10) for _ in range(3)]
+    folded = []
+    threads = [threading.Thread(target=lambda a=a: folded.append(a.refresh())) for a in workers]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(folded) == 500
+    assert workers[0].overview()['total_consultations'] == 500
+    assert workers[1].confidence_histogram()['total'] == 500
+    for analytics in workers:
+        analytics.close()
+    store.close()
+
+
+def test_bare_until_date_includes_the_whole_day(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"))
+    fill(store, 24)
+    fill(store, 24, day="2026-01-02")
+    analytics = HistoryAnalytics(store)
+
+    trends = analytics.disease_trends(bucket='day', until="2026-01-01")
+    assert {t['period'] for t in trends} == {"2026-01-01"}
+    assert sum(t['count'] for t in trends) == 24
+    hourly = analytics.disease_trends(since="2026-01-02", until="2026-01-02T05")
+    assert sum(t['count'] for t in hourly) == 6
+    analytics.close()
+    store.close()
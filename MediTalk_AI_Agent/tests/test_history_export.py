@@ -0,0 +1,90 @@
+"""Tests for the streaming history export."""
+
+import csv
+import io
+import json
+
+import pytest
+
+import medical_history
+from history_export import CSV_COLUMNS, iter_export, write_export
+from history_store import SQLiteHistoryStore
+from medical_history import MedicalHistory
+
+RECORDS = [
+    {
+        'timestamp': '2026-01-01T10:00:00',
+        'primary_disease': 'Fungal infection',
+        'confidence': 0.9,
+        'symptoms': ['itching', 'skin_rash'],
+        'alternatives': [['Acne', 0.05], ['Psoriasis', 0.02]],
+    },
+    {
+        'timestamp': '2026-01-02T11:30:00',
+        'primary_disease': 'Common Cold',
+        'confidence': 0.45,
+        'symptoms': ['cough', 'high "fever", chills'],
+        'alternatives': [],
+    },
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"), batch_size=100)
+    for record in RECORDS:
+        store.add("s", record)
+    store.add("other", RECORDS[0])
+    yield store
+    store.close()
+
+
+def export(store, fmt, chunk_bytes=16):
+    return b''.join(iter_export(store.iter_records("s"), fmt, chunk_bytes=chunk_bytes)).decode('utf-8')
+
+
+def test_ndjson_round_trip(store):
+    lines = export(store, 'ndjson').splitlines()
+    assert [json.loads(line) for line in lines] == RECORDS
+
+
+def test_json_round_trip(store):
+    assert json.loads(export(store, 'json')) == RECORDS
+    assert json.loads(export(store, 'json', chunk_bytes=1 << 20)) == RECORDS
+
+
+def test_csv_round_trip(store):
+    rows = list(csv.DictReader(io.StringIO(export(store, 'csv'))))
+    assert list(rows[0]) == CSV_COLUMNS
+    assert [
+        {
+            'timestamp': row['timestamp'],
+            'primary_disease': row['primary_disease'],
+            'confidence': float(row['confidence']),
+            'symptoms': row['symptoms'].split(';'),
+            'alternatives': [
+                [disease, float(probability)]
+                for disease, probability in (pair.rsplit(':', 1) for pair in row['alternatives'].split(';') if pair)
+            ],
+        }
+        for row in rows
+    ] == RECORDS
+
+
+def test_write_export_counts_bytes(store):
+    fp = io.BytesIO()
+    assert write_export(store.iter_records("s"), fp, 'ndjson') == len(fp.getvalue())
+    assert fp.getvalue().decode('utf-8') == export(store, 'ndjson')
+
+
+def test_unknown_format_is_rejected(store):
+    with pytest.raises(ValueError, match="Unsupported export format"):
+        next(iter_export(store.iter_records("s"), 'xml'))
+
+
+def test_export_history_json_matches_the_streamed_export(store, monkeypatch):
+    monkeypatch.setattr(medical_history, 'get_history_store', lambda: store)
+    monkeypatch.setattr(MedicalHistory, '_session_id', staticmethod(lambda: "s"))
+    exported = MedicalHistory.export_history_json()
+    assert exported == export(store, 'json')
+    assert json.loads(exported) == RECORDS
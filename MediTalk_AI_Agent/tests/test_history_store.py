@@ -0,0 +1,110 @@
+"""Tests for the batched SQLite history store."""
+
+import sqlite3
+
+import pytest
+
+from history_store import SQLiteHistoryStore
+
+
+def record(disease, confidence=0.5):
+    return {
+        'timestamp': '2026-01-01T10:00:00',
+        'primary_disease': disease,
+        'confidence': confidence,
+        'symptoms': ['cough'],
+        'alternatives': [],
+    }
+
+
+class FailingConnection:
+    """Connection proxy whose first batch insert fails."""
+
+    def __init__(self, conn):
+        self._conn = conn
+        self.failures = 1
+
+    def executemany(self, sql, rows):
+        if self.failures and sql.startswith("INSERT INTO consultations"):
+            self.failures -= 1
+            raise sqlite3.OperationalError("database is locked")
+        return self._conn.executemany(sql, rows)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self._conn.__enter__()
+
+    def __exit__(self, *exc):
+        return self._conn.__exit__(*exc)
+
+
+def test_failed_flush_keeps_the_batch(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"), batch_size=100)
+    store.add("s", record("Flu", 0.8))
+    store.add("s", record("Cold", 0.4))
+    conn = store._conn
+    store._conn = FailingConnection(conn)
+
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+    assert store.count("s") == 2
+
+    store.flush()
+    store._conn = conn
+    assert [r['primary_disease'] for r in store.query("s")] == ["Cold", "Flu"]
+    assert store.count("s", disease="Flu") == 1
+    assert store.summary()['total_consultations'] == 2
+    store.close()
+
+
+def test_stats_follow_eviction(tmp_path):
+    path = str(tmp_path / "history.db")
+    store = SQLiteHistoryStore(path, batch_size=2, max_per_session=3)
+    for i, disease in enumerate(["Flu", "Flu", "Cold", "Cold", "Cold"]):
+        store.add("s", record(disease, 0.1 * (i + 1)))
+    store.flush()
+
+    summary = store.summary("s")
+    assert summary['total_consultations'] == 3
+    assert summary['most_common_disease'] == "Cold"
+    assert summary['average_confidence'] == pytest.approx(0.4)
+    store.close()
+
+    # Persisted aggregates match the stored rows
+    reopened = SQLiteHistoryStore(path)
+    assert reopened.summary("s") == pytest.approx(summary)
+    assert reopened.count("s") == 3
+    reopened.close()
+
+
+def test_count_applies_eviction_of_pending_writes(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"), batch_size=100, max_per_session=3)
+    for disease in ["Flu", "Flu", "Cold", "Cold", "Cold"]:
+        store.add("s", record(disease))
+    assert store.count("s") == 3
+    assert store.count("s") == len(store.query("s", limit=10))
+    store.close()
+
+
+def test_session_stats_cache_is_bounded(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"), batch_size=100,
+                               max_cached_sessions=2)
+    for session in ("a", "b", "c"):
+        store.add(session, record("Flu"))
+    assert len(store._stats) == 2
+
+    # An evicted session reloads from disk plus its pending writes
+    assert store.count("a") == 1
+    store.flush()
+    assert {s: store.count(s) for s in "abc"} == {"a": 1, "b": 1, "c": 1}
+    store.close()
+
+
+def test_most_common_diseases_counts_all_sessions(tmp_path):
+    store = SQLiteHistoryStore(str(tmp_path / "history.db"))
+    for session, disease in [("a", "Flu"), ("b", "Flu"), ("b", "Cold"), ("c", "Migraine"), ("c", "Flu")]:
+        store.add(session, record(disease))
+    assert store.most_common_diseases(2) == [("Flu", 3), ("Cold", 1)]
+    store.close()
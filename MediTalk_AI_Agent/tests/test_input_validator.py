@@ -0,0 +1,80 @@
+"""Tests for the single-pass symptom normalization."""
+
+import pytest
+
+from input_validator import InputValidator
+
+INDEX = {'headache': 0, 'high_fever': 1, 'skin_rash': 2, 'joint_pain': 3}
+
+INPUTS = [
+    ['Headache', 'HIGH FEVER', 'skin_rash'],
+    ['  high   fever  ', 'high__fever', '_joint_pain_', 'Joint Pain'],
+    ['headache', 'unknown symptom', 'Unknown_Symptom', 'itching'],
+    ['', '   ', 'fever!', 'x' * 101, None, 42, 'skin rash'],
+    [],
+]
+
+
+def old_split(symptoms):
+    """validate_symptoms_list followed by the predictor's validation."""
+    cleaned = InputValidator.validate_symptoms_list(symptoms)
+    return ([s for s in cleaned if s in INDEX], [s for s in cleaned if s not in INDEX])
+
+
+@pytest.mark.parametrize('symptoms', INPUTS)
+def test_normalize_matches_validate_symptoms_list(symptoms):
+    normalized = InputValidator.normalize_symptoms(symptoms, INDEX)
+    valid, invalid = old_split(symptoms)
+
+    assert normalized['symptoms'] == InputValidator.validate_symptoms_list(symptoms)
+    assert normalized['valid_symptoms'] == valid
+    assert normalized['invalid_symptoms'] == invalid
+    assert normalized['indices'] == [INDEX[s] for s in valid]
+
+
+def test_malformed_inputs_are_counted():
+    normalized = InputValidator.normalize_symptoms(INPUTS[3], INDEX)
+    assert normalized['valid_symptoms'] == ['skin_rash']
+    assert normalized['rejected'] == 6
+
+
+def test_without_index_only_normalizes():
+    normalized = InputValidator.normalize_symptoms(['Skin Rash', 'skin_rash'])
+    assert normalized['symptoms'] == ['skin_rash']
+    assert normalized['valid_symptoms'] == normalized['invalid_symptoms'] == []
+
+
+def test_too_many_symptoms_are_rejected():
+    with pytest.raises(ValueError, match="Too many symptoms"):
+        InputValidator.normalize_symptoms(['headache'] * (InputValidator.MAX_SYMPTOMS_COUNT + 1))
+
+
+def test_batch_matches_single_calls():
+    batch = InputValidator.normalize_symptoms_batch(INPUTS, INDEX)
+    assert batch == [InputValidator.normalize_symptoms(s, INDEX) for s in INPUTS]
+
+
+@pytest.mark.parametrize('batch, message', [
+    ([], "non-empty"),
+    ([['headache']] * (InputValidator.MAX_BATCH_SIZE + 1), "Batch too large"),
+    ([['headache'], 'headache'], "Item 1"),
+])
+def test_batch_rejections(batch, message):
+    with pytest.raises(ValueError, match=message):
+        InputValidator.normalize_symptoms_batch(batch, INDEX)
+
+
+def test_validate_texts_keeps_texts_unchanged():
+    texts = ['  I have a Headache!  ', 'fever\tand chills']
+    assert InputValidator.validate_texts(texts) == texts
+
+
+@pytest.mark.parametrize('texts, message', [
+    ([], "non-empty"),
+    (['fever'] * (InputValidator.MAX_BATCH_SIZE + 1), "Too many texts"),
+    (['fever', 3], "must be a string"),
+    (['x' * (InputValidator.MAX_TEXT_LENGTH + 1)], "maximum length"),
+])
+def test_validate_texts_rejections(texts, message):
+    with pytest.raises(ValueError, match=message):
+        InputValidator.validate_texts(texts)
@@ -0,0 +1,86 @@
+"""Tests for free-text symptom extraction."""
+
+import random
+
+import pytest
+
+from nlp_symptom_extractor import SymptomExtractor
+
+SYMPTOMS = ["itching", "skin_rash", "high_fever", "headache", "back_pain", "cough", "chest_pain"]
+
+TEXTS = [
+    "I have itching and a skin rash",
+    "  High-FEVER,\tsevere headache!!  ",
+    "back_pain since Monday; also coughing? cough",
+    "Chest pain — and İtching (ß) \U0001F912 headache",
+    "",
+    "---",
+]
+
+
+@pytest.fixture(scope='module')
+def extractor():
+    return SymptomExtractor(SYMPTOMS)
+
+
+def random_texts(count=300):
+    rng = random.Random(0)
+    alphabet = "abcdefghi xyz_-,.!?\t\n İßé—" + "ABC"
+    words = [s.replace('_', ' ') for s in SYMPTOMS] + ["and", "with", "very"]
+    for _ in range(count):
+        parts = [rng.choice(words) if rng.random() < 0.5 else
+                 ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 6)))
+                 for _ in range(rng.randint(0, 8))]
+        yield rng.choice([" ", "-", ", ", "  ", "\n"]).join(parts)
+
+
+@pytest.mark.parametrize('text', TEXTS)
+def test_offset_normalization_matches_plain_normalization(text):
+    norm, origin = SymptomExtractor._normalize_with_offsets(text)
+    assert norm == SymptomExtractor._normalize_text(text)
+    assert len(origin) == len(norm)
+    assert origin == sorted(origin)
+    assert all(0 <= i < len(text) for i in origin)
+
+
+def test_offset_normalization_on_random_text():
+    for text in random_texts():
+        norm, origin = SymptomExtractor._normalize_with_offsets(text)
+        assert norm == SymptomExtractor._normalize_text(text), repr(text)
+        assert len(origin) == len(norm)
+
+
+def test_spans_agree_with_extract(extractor):
+    for text in list(TEXTS) + list(random_texts()):
+        spans = extractor.extract_spans(text)
+        assert [s['symptom'] for s in spans] == extractor.extract(text), repr(text)
+        for span in spans:
+            assert span['text'] == text[span['start']:span['end']]
+            # The reported slice covers whole normalized words of the text
+            words = SymptomExtractor._normalize_text(span['text'])
+            assert words and f" {words} " in f" {SymptomExtractor._normalize_text(text)} "
+
+
+def test_spans_point_at_the_original_text(extractor):
+    text = "  High-FEVER,\tsevere headache!!  "
+    spans = {s['symptom']: s for s in extractor.extract_spans(text)}
+    assert spans['high_fever']['text'] == "High-FEVER"
+    assert spans['headache']['text'] == "headache"
+
+
+def test_cached_results_match_uncached(extractor):
+    uncached = SymptomExtractor(SYMPTOMS, cache_size=0)
+    texts = list(random_texts(100))
+    for _ in range(2):
+        for text in texts:
+            assert extractor.extract(text) == uncached.extract(text)
+    assert extractor.cache_info()['hits'] >= len(set(texts)) - 1
+    assert uncached.cache_info()['size'] == 0
+
+
+def test_incremental_preview_can_differ_from_whole_text(extractor):
+    # Why Analyze re-extracts the whole text instead of reusing the preview
+    assert extractor.extract("skin, rash") == ["skin_rash"]
+    assert extractor.extract_incremental("skin, rash") == []
+    text = "chest pain. back pain and itching"
+    assert sorted(extractor.extract_incremental(text)) == sorted(extractor.extract(text))
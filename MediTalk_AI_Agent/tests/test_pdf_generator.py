@@ -0,0 +1,48 @@
+"""Tests for the memoized PDF reports."""
+
+import pytest
+
+import pdf_generator
+from pdf_generator import PDFReportGenerator
+
+RESULT = {
+    'primary_disease': 'Migraine',
+    'confidence': 0.7,
+    'alternative_diseases': ['Hypertension '],
+    'alternative_probabilities': [0.1],
+    'description': 'A recurring headache.',
+    'precautions': ['rest'],
+}
+
+
+@pytest.fixture
+def renders(monkeypatch):
+    """Record the generation date of every report actually laid out."""
+    dates = []
+    render = pdf_generator._render
+
+    def counting(result, symptoms, template, date_str):
+        dates.append(date_str)
+        return render(result, symptoms, template, date_str)
+
+    monkeypatch.setattr(pdf_generator, '_render', counting)
+    monkeypatch.setattr(pdf_generator, '_report_cache', pdf_generator.OrderedDict())
+    return dates
+
+
+def test_identical_reports_are_laid_out_once(renders, monkeypatch):
+    monkeypatch.setattr(pdf_generator, '_generated_on', lambda: "January 01, 2026 at 10:00 AM")
+    first = PDFReportGenerator.generate_report_cached(RESULT, ['headache'])
+    assert first.startswith(b'%PDF')
+    assert PDFReportGenerator.generate_report_cached(dict(RESULT), ['headache']) is first
+    PDFReportGenerator.generate_report_cached(RESULT, ['headache', 'nausea'])
+    assert renders == ["January 01, 2026 at 10:00 AM"] * 2
+
+
+def test_cached_report_is_rebuilt_when_its_date_is_stale(renders, monkeypatch):
+    monkeypatch.setattr(pdf_generator, '_generated_on', lambda: "January 01, 2026 at 10:00 AM")
+    first = PDFReportGenerator.generate_report_cached(RESULT, ['headache'])
+    monkeypatch.setattr(pdf_generator, '_generated_on', lambda: "January 02, 2026 at 09:15 AM")
+    second = PDFReportGenerator.generate_report_cached(RESULT, ['headache'])
+    assert second is not first
+    assert renders == ["January 01, 2026 at 10:00 AM", "January 02, 2026 at 09:15 AM"]
@@ -0,0 +1,108 @@
+"""Tests for the reference-counted predictor registry."""
+
+import threading
+import time
+
+import pytest
+
+from predictor_registry import PredictorRegistry
+
+
+class FakePredictor:
+    def __init__(self, model_dir, data_dir, model_filename=None, shared=None):
+        self.model_dir = model_dir
+        self.data_dir = data_dir
+        self.model_filename = model_filename or 'disease_model.pkl'
+        self.model_version = self.model_filename
+        self.shared = shared
+
+
+def test_handles_share_one_load_and_count_references():
+    registry = PredictorRegistry(loader=FakePredictor)
+    first = registry.acquire('m', 'd')
+    second = registry.acquire('m', 'd')
+    assert first.predictor is second.predictor
+    assert registry.loads == 1
+    assert registry.stats()[0]['refs'] == 2
+
+    first.release()
+    first.release()
+    assert registry.stats()[0]['refs'] == 1
+    with pytest.raises(RuntimeError):
+        first.predictor
+    second.release()
+    # Idle but current: stays resident for the next session
+    assert registry.stats()[0]['refs'] == 0
+    registry.acquire('m', 'd').release()
+    assert registry.loads == 1
+
+
+def test_idle_models_are_evicted_least_recently_used_first():
+    registry = PredictorRegistry(loader=FakePredictor, max_resident=2)
+    held = registry.acquire('m', 'd', 'a.pkl')
+    registry.acquire('m', 'd', 'b.pkl').release()
+    registry.acquire('m', 'd', 'c.pkl').release()
+    # 'a' has a live handle, so the idle 'b' goes first
+    assert [s['model'] for s in registry.stats()] == ['a', 'c']
+
+    registry.acquire('m', 'd', 'd.pkl').release()
+    assert [s['model'] for s in registry.stats()] == ['a', 'd']
+    held.release()
+    registry.acquire('m', 'd', 'e.pkl').release()
+    assert [s['model'] for s in registry.stats()] == ['d', 'e']
+
+
+def test_shared_artifacts_come_from_a_resident_donor():
+    registry = PredictorRegistry(loader=FakePredictor)
+    base = registry.acquire('m', 'd')
+    other = registry.acquire('m', 'd', 'tuned.pkl')
+    assert other.predictor.shared is base.predictor
+
+
+def test_slow_load_runs_once_and_outside_the_lock():
+    started, finish = threading.Event(), threading.Event()
+    calls = []
+
+    def loader(model_dir, data_dir, model_filename=None, shared=None):
+        calls.append(model_filename)
+        if model_filename == 'slow.pkl':
+            started.set()
+            assert finish.wait(5)
+        return FakePredictor(model_dir, data_dir, model_filename)
+
+    registry = PredictorRegistry(loader=loader)
+    handles = []
+    threads = [threading.Thread(target=lambda: handles.append(registry.acquire('m', 'd', 'slow.pkl')))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    assert started.wait(5)
+
+    # Another model loads while the slow one is still in progress
+    start = time.monotonic()
+    registry.acquire('m', 'd', 'fast.pkl').release()
+    assert time.monotonic() - start < 1
+
+    finish.set()
+    for thread in threads:
+        thread.join()
+    assert calls.count('slow.pkl') == 1
+    assert len({id(h.predictor) for h in handles}) == 1
+    slow = [s for s in registry.stats() if s['model'] == 'slow']
+    assert slow[0]['refs'] == 4
+
+
+def test_failed_load_reaches_waiters_and_is_retried():
+    attempts = []
+
+    def loader(model_dir, data_dir, model_filename=None, shared=None):
+        attempts.append(model_filename)
+        if len(attempts) == 1:
+            raise FileNotFoundError(model_filename)
+        return FakePredictor(model_dir, data_dir, model_filename)
+
+    registry = PredictorRegistry(loader=loader)
+    with pytest.raises(FileNotFoundError):
+        registry.acquire('m', 'd')
+    assert registry.acquire('m', 'd').predictor.model_version == 'disease_model.pkl'
+    assert len(attempts) == 2
@@ -0,0 +1,70 @@
+"""Tests for shadow evaluation of a candidate model."""
+
+from predictor_registry import PredictorRegistry
+from shadow_eval import ShadowEvaluator
+
+DISEASES = ["Flu", "Cold", "Allergy", "Migraine"]
+
+
+class FakeCandidate:
+    """Predicts DISEASES[first index + shift]; `shift` is fixed per version."""
+
+    versions = {'candidate.pkl': 0}
+
+    def __init__(self, model_dir, data_dir, model_filename=None, shared=None):
+        self.model_dir = model_dir
+        self.data_dir = data_dir
+        self.model_filename = model_filename
+        self.shift = self.versions[model_filename]
+        self.model_version = f"{model_filename}:{self.shift}"
+
+    def _compute_model_version(self):
+        return f"{self.model_filename}:{self.versions[self.model_filename]}"
+
+    def predict_from_indices_batch(self, index_rows, symptoms_batch, explain=False):
+        return [{'primary_disease': DISEASES[(row[0] + self.shift) % len(DISEASES)]} for row in index_rows]
+
+
+def primary(disease, *alternatives):
+    return {'primary_disease': disease, 'alternative_diseases': list(alternatives)}
+
+
+def evaluator():
+    FakeCandidate.versions['candidate.pkl'] = 0
+    registry = PredictorRegistry(loader=FakeCandidate)
+    return ShadowEvaluator('candidate', model_dir='m', data_dir='d', sample_rate=1.0, registry=registry)
+
+
+def test_agreements_are_counted_per_input():
+    shadow = evaluator()
+    # Candidate says Flu, Cold, Allergy
+    assert shadow.submit([[0], [1], [2]], [["a"], ["b"], ["c"]],
+                         [primary("Flu", "Cold"), primary("Flu", "Cold"), primary("Flu", "Cold")], 0.01)
+    shadow.join()
+
+    stats = shadow.stats()
+    assert stats['compared'] == 3
+    assert stats['agreement_rate'] == 1 / 3
+    assert stats['top3_agreement_rate'] == 2 / 3
+    assert stats['latency']['primary_ms']['p50'] == 10
+    assert stats['candidate_version'] == "candidate.pkl:0"
+
+
+def test_replaced_candidate_is_picked_up_after_reset():
+    shadow = evaluator()
+    shadow.submit([[0]], [["a"]], [primary("Flu")], 0.01)
+    shadow.join()
+    assert shadow.stats()['agreement_rate'] == 1
+
+    # New candidate file: now predicts Cold for index 0
+    FakeCandidate.versions['candidate.pkl'] = 1
+    shadow.reset()
+    shadow.submit([[0]], [["a"]], [primary("Flu")], 0.01)
+    shadow.join()
+
+    stats = shadow.stats()
+    assert stats['compared'] == 1
+    assert stats['agreement_rate'] == 0
+    assert stats['candidate_version'] == "candidate.pkl:1"
+    # The old version's handle was released
+    assert [s['refs'] for s in shadow._registry.stats()] == [1]
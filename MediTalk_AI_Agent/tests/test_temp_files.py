@@ -0,0 +1,42 @@
+"""Tests for temporary file expiry."""
+
+import os
+import time
+
+from temp_files import ExpiringFileQueue
+
+
+def write(path, size=10, age=0.0):
+    with open(path, 'wb') as f:
+        f.write(b'x' * size)
+    if age:
+        then = time.time() - age
+        os.utime(path, (then, then))
+    return str(path)
+
+
+def test_purge_removes_expired_and_over_budget_files(tmp_path):
+    queue = ExpiringFileQueue(ttl_seconds=60, max_bytes=25)
+    paths = [write(tmp_path / f"speech_{i}.wav") for i in range(3)]
+    for path in paths:
+        queue.register(path)
+    assert queue.purge() == 1
+    assert not os.path.exists(paths[0])
+    assert queue.stats()['bytes'] == 20
+
+
+def test_adopt_removes_stale_files_and_tracks_fresh_ones(tmp_path):
+    stale = write(tmp_path / "speech_old.mp3", age=120)
+    fresh = write(tmp_path / "speech_new.mp3", age=10)
+    other = write(tmp_path / "response.mp3", age=120)
+    queue = ExpiringFileQueue(ttl_seconds=60)
+
+    assert queue.adopt(str(tmp_path), "speech_") == 1
+    assert not os.path.exists(stale)
+    assert os.path.exists(other)
+    assert queue.stats()['files'] == 1
+
+    # The adopted file keeps only its remaining lifetime
+    expires_at, _ = queue._entries[fresh]
+    assert 45 < expires_at - time.monotonic() <= 50
+    queue.stop()
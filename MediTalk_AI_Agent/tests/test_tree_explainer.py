@@ -0,0 +1,62 @@
+"""Tests for the tree-path explainer."""
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from tree_explainer import ForestExplainer
+
+SYMPTOM_SETS = [
+    ['headache', 'high_fever', 'vomiting'],
+    ['itching', 'skin_rash', 'nodal_skin_eruptions'],
+    ['cough', 'chest_pain', 'breathlessness', 'mucoid_sputum'],
+    ['joint_pain'],
+    [],
+]
+
+
+def feature_rows(predictor, symptom_sets):
+    X = np.zeros((len(symptom_sets), len(predictor.symptoms_list)), dtype=np.int64)
+    for row, symptoms in enumerate(symptom_sets):
+        X[row, [predictor.symptom_index[s] for s in symptoms]] = 1
+    return X
+
+
+def test_contributions_add_up_to_predict_proba():
+    rng = np.random.default_rng(0)
+    X = rng.integers(0, 2, size=(200, 12))
+    y = X[:, 0] + 2 * (X[:, 1] & X[:, 2])
+    model = RandomForestClassifier(n_estimators=10, random_state=0).fit(X, y)
+    explainer = ForestExplainer(model)
+
+    probabilities, contributions = explainer.explain(X[:20])
+    expected = model.predict_proba(X[:20])
+    assert contributions.shape == (20, 12, 4)
+    np.testing.assert_allclose(probabilities, expected, atol=1e-9)
+    np.testing.assert_allclose(explainer.baseline + contributions.sum(axis=1), expected, atol=1e-9)
+
+
+def test_shipped_model_contributions_add_up(predictor):
+    X = feature_rows(predictor, SYMPTOM_SETS)
+    explainer = predictor.get_explainer()
+    _, contributions = explainer.explain(X)
+    np.testing.assert_allclose(explainer.baseline + contributions.sum(axis=1),
+                               predictor.model.predict_proba(X), atol=1e-9)
+
+
+@pytest.mark.parametrize('symptoms', SYMPTOM_SETS[:-1])
+def test_explain_keeps_the_prediction(predictor, symptoms):
+    plain = predictor.predict_disease(symptoms)
+    explained = predictor.predict_disease(symptoms, explain=True)
+
+    assert explained['primary_disease'] == plain['primary_disease']
+    assert explained['alternative_diseases'] == plain['alternative_diseases']
+    assert explained['confidence'] == pytest.approx(plain['confidence'])
+    assert explained['alternative_probabilities'] == pytest.approx(plain['alternative_probabilities'])
+    assert [e['disease'] for e in explained['explanation']] == (
+        [plain['primary_disease']] + plain['alternative_diseases'])
+
+
+def test_rejects_models_without_trees():
+    with pytest.raises(ValueError):
+        ForestExplainer(object())
@@ -0,0 +1,110 @@
+"""Tests for the TTS fallback chain."""
+
+import sys
+import threading
+import time
+
+import pytest
+
+import tts_backends
+from tts_backends import FallbackTTS, Pyttsx3Backend, StubTTSBackend, TTSBackend, create_tts
+
+
+class HangingNetworkBackend(TTSBackend):
+    """Network backend that blocks until released, like a stalled request."""
+
+    name = "hanging"
+    network = True
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def write_to_fp(self, text, fp, lang="en"):
+        self.release.wait(10)
+        fp.write(b"late")
+
+
+class FailingBackend(TTSBackend):
+    name = "failing"
+
+    def write_to_fp(self, text, fp, lang="en"):
+        raise OSError("engine missing")
+
+
+@pytest.fixture
+def hanging():
+    backend = HangingNetworkBackend()
+    yield backend
+    backend.release.set()
+
+
+def test_falls_back_after_deadline(hanging):
+    tts = FallbackTTS([hanging, StubTTSBackend()], timeout=0.2)
+    start = time.monotonic()
+    data, backend = tts.synthesize("hello there")
+    assert backend.name == "stub"
+    assert data.startswith(b"RIFF")
+    assert time.monotonic() - start < 1.0
+
+
+def test_hung_network_calls_do_not_block_offline_backends(hanging):
+    tts = FallbackTTS([hanging, StubTTSBackend()], timeout=0.1)
+    # More hung calls than network workers: later calls must not queue
+    for _ in range(tts_backends.NETWORK_WORKERS + 2):
+        start = time.monotonic()
+        _, backend = tts.synthesize("hello there")
+        assert backend.name == "stub"
+        assert time.monotonic() - start < 0.5
+
+
+def test_deadline_is_shared_by_network_backends():
+    first, second = HangingNetworkBackend(), HangingNetworkBackend()
+    try:
+        tts = FallbackTTS([first, second, StubTTSBackend()], timeout=0.3)
+        start = time.monotonic()
+        _, backend = tts.synthesize("hello")
+        assert backend.name == "stub"
+        assert time.monotonic() - start < 0.6
+    finally:
+        first.release.set()
+        second.release.set()
+
+
+def test_all_backends_failing_raises():
+    with pytest.raises(RuntimeError, match="failing: engine missing"):
+        FallbackTTS([FailingBackend()]).synthesize("hello")
+
+
+def test_preferred_skips_unavailable_backends():
+    class Unavailable(FailingBackend):
+        def is_available(self):
+            return False
+
+    stub = StubTTSBackend()
+    assert FallbackTTS([Unavailable(), stub]).preferred is stub
+
+
+def test_stub_is_not_in_default_chain(monkeypatch):
+    monkeypatch.delenv('MEDITALK_TTS_BACKENDS', raising=False)
+    assert "stub" not in [b.name for b in create_tts().backends]
+    assert [b.name for b in create_tts("stub").backends] == ["stub"]
+
+
+def test_hung_pyttsx3_driver_is_killed_at_the_timeout():
+    class HangingPyttsx3(Pyttsx3Backend):
+        def is_available(self):
+            return True
+
+        def command(self, text, filepath):
+            return [sys.executable, "-c", "import time; time.sleep(30)"]
+
+    tts = FallbackTTS([HangingPyttsx3(timeout=0.3), StubTTSBackend()])
+    start = time.monotonic()
+    _, backend = tts.synthesize("hello")
+    assert backend.name == "stub"
+    assert time.monotonic() - start < 3
+
+
+def test_offline_backends_get_the_configured_timeout():
+    tts = create_tts("pyttsx3,espeak,gtts", timeout=2.5)
+    assert [b.timeout for b in tts.backends] == [2.5, 2.5, 2.5]